@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Fake Shopify
+Local stand-in for the Shopify Admin API with a fixed response latency, for the benchmarks
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import urlsplit
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_LATENCY = 0.1  # Seconds each response is held, roughly a Shopify round trip
+PRODUCTS_PER_RESPONSE = 5
+
+# =============================================================================
+# FAKE SHOPIFY
+# =============================================================================
+
+def fake_products(count: int = PRODUCTS_PER_RESPONSE) -> List[dict]:
+    """Products shaped like the Admin API's, with Markdown metacharacters in titles"""
+    return [
+        {
+            'id': i,
+            'title': f"Silk_Saree *{i}*",
+            'handle': f"silk-saree-{i}",
+            'status': 'active',
+            'variants': [{'price': '1499.00'}],
+        }
+        for i in range(count)
+    ]
+
+class FakeShopifyHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a small JSON body after the server's latency"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        time.sleep(self.server.latency)
+        path = urlsplit(self.path).path
+        if path.endswith('collections.json'):
+            body = {'collections': [{'id': 1, 'title': 'Big Offers', 'handle': 'offers'}]}
+        elif path.endswith('articles.json'):
+            body = {'articles': [{'title': 'Draping a Banarasi', 'handle': 'draping'}]}
+        else:
+            body = {'products': fake_products()}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-Shopify-Shop-Api-Call-Limit', '1/40')  # Keep the client-side bucket empty
+        self.end_headers()
+        self.wfile.write(data)
+
+class FakeShopify(ThreadingHTTPServer):
+    """Fake Admin API served from a daemon thread on 127.0.0.1"""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = DEFAULT_LATENCY, port: int = 0):
+        super().__init__(('127.0.0.1', port), FakeShopifyHandler)
+        self.latency = latency
+        self.hits: List[str] = []
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to hand to ShopifyClient"""
+        return f"http://127.0.0.1:{self.server_address[1]}/admin/api/2023-04/"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Persistence Benchmark
+State updates per second through SQLitePersistence vs a commit per update, with event loop lag
+
+Usage: python bench/persistence_bench.py [users] [rounds]
+"""
+
+import asyncio
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_persistence import SQLitePersistence  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_USERS = 20_000  # Users whose state changes each round
+DEFAULT_ROUNDS = 5  # Rounds of updates (each like one Application.update_persistence run)
+ROUND_PAUSE = 0.2  # Seconds between rounds, not counted in throughput
+NAIVE_UPDATES = 2000  # Updates committed one by one for the comparison
+LAG_PROBE_INTERVAL = 0.001  # Seconds between event loop lag probes
+YIELD_EVERY = 100  # Updates between yields to the loop, so lag reflects background work and not the producer
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+async def probe_lag(worst: list, stop: asyncio.Event) -> None:
+    """Record the worst event loop lag until stopped"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        worst[0] = max(worst[0], loop.time() - started - LAG_PROBE_INTERVAL)
+
+def user_state(user_id: int, round_number: int) -> dict:
+    return {'waiting_for_question': bool(user_id % 2), 'waiting_for_order_number': False, 'round': round_number}
+
+async def batched(path: str, users: int, rounds: int) -> None:
+    """SQLitePersistence: updates buffered and written in one transaction off the loop"""
+    persistence = SQLitePersistence(path, update_interval=1)
+    await persistence.get_user_data()
+    await persistence.get_bot_data()
+    worst, stop = [0.0], asyncio.Event()
+    prober = asyncio.create_task(probe_lag(worst, stop))
+    handler_seconds = 0.0
+    started = time.perf_counter()
+    for round_number in range(rounds):
+        tick = time.perf_counter()
+        for user_id in range(users):
+            await persistence.update_user_data(user_id, user_state(user_id, round_number))
+            if user_id % YIELD_EVERY == 0:
+                await asyncio.sleep(0)  # Let the prober see the loop between handler runs
+        await persistence.update_bot_data({'rate_limits': {str(i): time.time() for i in range(1000)}})
+        handler_seconds += time.perf_counter() - tick
+        await asyncio.sleep(ROUND_PAUSE)
+    await persistence.flush()
+    elapsed = time.perf_counter() - started - rounds * ROUND_PAUSE
+    stop.set()
+    await prober
+    updates = users * rounds
+    print(f"SQLitePersistence   {updates / elapsed:10.0f} updates/s  "
+          f"{handler_seconds / updates * 1e6:6.2f}us per update on the loop  "
+          f"worst loop lag {worst[0] * 1000:6.1f}ms  {persistence.stats()}")
+
+async def naive(path: str, updates: int) -> None:
+    """For comparison: pickle and commit each update on the event loop"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("CREATE TABLE IF NOT EXISTS user_data (user_id INTEGER PRIMARY KEY, data BLOB)")
+    worst, stop = [0.0], asyncio.Event()
+    prober = asyncio.create_task(probe_lag(worst, stop))
+    started = time.perf_counter()
+    for user_id in range(updates):
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO user_data (user_id, data) VALUES (?, ?)",
+                (user_id, pickle.dumps(user_state(user_id, 0)))
+            )
+        if user_id % YIELD_EVERY == 0:
+            await asyncio.sleep(0)  # Let the prober see the loop between handler runs
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    connection.close()
+    print(f"commit per update   {updates / elapsed:10.0f} updates/s  "
+          f"{elapsed / updates * 1e6:6.2f}us per update on the loop  worst loop lag {worst[0] * 1000:6.1f}ms")
+
+async def restart(path: str) -> None:
+    """Startup cost with every user stored, and one user's first update"""
+    persistence = SQLitePersistence(path)
+    started = time.perf_counter()
+    await persistence.get_user_data()
+    await persistence.get_bot_data()
+    startup = time.perf_counter() - started
+    user_data: dict = {}
+    started = time.perf_counter()
+    await persistence.refresh_user_data(123, user_data)
+    load = time.perf_counter() - started
+    print(f"restart: {startup * 1000:.1f}ms to list {persistence.stats()['unloaded_users']} stored users, "
+          f"{load * 1000:.2f}ms to load one on its first update ({user_data})")
+    await persistence.flush()
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_USERS
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROUNDS
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{users} users x {rounds} rounds")
+        asyncio.run(batched(os.path.join(directory, 'batched.sqlite3'), users, rounds))
+        asyncio.run(naive(os.path.join(directory, 'naive.sqlite3'), NAIVE_UPDATES))
+        asyncio.run(restart(os.path.join(directory, 'batched.sqlite3')))
+
+if __name__ == '__main__':
+    main()
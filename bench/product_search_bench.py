@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Product Search Benchmark
+Build time and query latency of the product search index over a synthetic catalog, vs a linear scan
+
+Usage: python bench/product_search_bench.py [products]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collection_index import tokenize  # noqa: E402
+from product_search import ProductSearchIndex, product_fields  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_PRODUCTS = 50_000
+QUERY_ROUNDS = 200  # Times each query is repeated
+
+COLOURS = ["red", "blue", "peach", "maroon", "mustard", "teal", "ivory", "black", "pink", "green", "wine", "rani"]
+FABRICS = ["silk", "organza", "georgette", "chiffon", "crepe", "cotton", "net", "linen", "tussar", "satin"]
+STYLES = ["kanjeevaram", "banarasi", "paithani", "chanderi", "bandhani", "patola", "kalamkari", "jamdani"]
+WORK = ["embroidered", "sequin", "zari", "printed", "handloom", "mirror", "stone", "woven"]
+TAGS = ["festive", "wedding", "party", "office", "daily", "bridal", "new arrival", "sale"]
+
+QUERIES = [
+    "silk",  # Very common word
+    "red kanjeevaram silk",  # Several words, narrowed by the rarest
+    "banarasi wedding",  # Title plus tag
+    "organza sequin peach",
+    "kanj",  # As-you-type prefix
+    "maroon paithani zari bridal",
+    "nosuchword",  # Miss
+]
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def make_catalog(count: int, seed: int = 7) -> list:
+    """Synthetic products shaped like Shopify's"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': i,
+            'title': f"{rng.choice(COLOURS).title()} {rng.choice(STYLES).title()} {rng.choice(FABRICS).title()} "
+                     f"Saree with {rng.choice(WORK).title()} Work",
+            'handle': f"saree-{i}",
+            'product_type': "Saree",
+            'tags': ", ".join(rng.sample(TAGS, 2)),
+            'variants': [{'price': f"{rng.randint(900, 25000)}.00"}],
+            'options': [{'values': ["Free Size"]}],
+        }
+        for i in range(count)
+    ]
+
+def linear_search(products: list, query: str, limit: int = 10) -> list:
+    """The obvious alternative: tokenize every product for every query"""
+    words = tokenize(query)
+    found = []
+    for product in products:
+        text = set(tokenize(" ".join(product_fields(product).values())))
+        if all(word in text for word in words):
+            found.append(product)
+            if len(found) == limit:
+                break
+    return found
+
+def percentile(samples: list, fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PRODUCTS
+    products = make_catalog(count)
+
+    index = ProductSearchIndex()
+    started = time.perf_counter()
+    index.rebuild(products)
+    print(f"Indexed {len(index)} products in {time.perf_counter() - started:.2f}s ({len(index.postings)} words)")
+
+    print(f"{'query':30s} {'hits':>5s} {'p50 ms':>8s} {'p99 ms':>8s} {'scan ms':>8s}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(QUERY_ROUNDS):
+            started = time.perf_counter()
+            hits = index.search(query)
+            timings.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        linear_search(products, query)
+        scan = time.perf_counter() - started
+        print(f"{query:30s} {len(hits):5d} {percentile(timings, 0.5) * 1000:8.3f} "
+              f"{percentile(timings, 0.99) * 1000:8.3f} {scan * 1000:8.1f}")
+
+    started = time.perf_counter()
+    for product in products[:1000]:
+        index.upsert(dict(product, title=product['title'] + " Updated"))
+    print(f"1000 upserts: {(time.perf_counter() - started) / 1000 * 1e6:.1f}us each")
+
+if __name__ == '__main__':
+    main()
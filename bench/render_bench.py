@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Render Benchmark
+CPU time per update of the static screens: rebuilt on every call (before) vs the render registry
+
+Usage: python bench/render_bench.py [calls]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['PERSISTENCE_PATH'] = ''
+os.environ['CATALOG_SNAPSHOT_PATH'] = ''
+
+import telegram_bot  # noqa: E402
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup  # noqa: E402
+from telegram_bot import BRAND_LOGO, CONTACT_INFO, STORE_URL  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_CALLS = 20_000  # Calls timed per handler
+WARMUP_CALLS = 500
+
+# =============================================================================
+# BEFORE: HANDLERS REBUILDING KEYBOARDS AND TEXT PER CALL (TODAY'S MENU LAYOUT)
+# =============================================================================
+
+def old_main_menu_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("🛍 Browse Saree Collection", callback_data="browse_collection"),
+            InlineKeyboardButton("💰 View Offers", callback_data="view_offers")
+        ],
+        [
+            InlineKeyboardButton("📝 Place an Order Online", callback_data="place_order"),
+            InlineKeyboardButton("📦 Track Your Order", callback_data="track_order")
+        ],
+        [
+            InlineKeyboardButton("❓ Ask a Question", callback_data="ask_question"),
+            InlineKeyboardButton("📰 View Blogs", callback_data="view_blogs")
+        ],
+        [
+            InlineKeyboardButton("☎️ Contact Us", callback_data="contact_us"),
+            InlineKeyboardButton("📱 Follow Us", callback_data="follow_us")
+        ]
+    ])
+
+def old_back_to_menu_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")]])
+
+async def old_show_main_menu(query, context) -> None:
+    welcome_message = (
+        f"{BRAND_LOGO} *Maa Kaali Creations* 🎉\n\n"
+        "Choose an option from the menu below:"
+    )
+    await query.edit_message_text(welcome_message, reply_markup=old_main_menu_keyboard(), parse_mode='Markdown')
+
+async def old_place_order(query, context) -> None:
+    message = (
+        f"{BRAND_LOGO} *📝 Place an Order Online*\n\n"
+        "Ready to shop? Visit our online store to browse our complete collection!\n\n"
+        "🛒 *Features:*\n"
+        "• Secure payment options\n"
+        "• Free shipping on all orders\n"
+        "• Easy returns and exchanges\n"
+        "• 24/7 customer support\n\n"
+        f"*🛍 Shop Now:* {STORE_URL}\n\n"
+        "💡 *Tip:* Use code `SAVE25` and get Upto 25% off on your first Order!"
+    )
+    await query.edit_message_text(message, reply_markup=old_back_to_menu_keyboard(), parse_mode='Markdown')
+
+async def old_contact_us(query, context) -> None:
+    message = (
+        f"{BRAND_LOGO} 📞 Contact Us\n\n"
+        "Get in touch with us through any of these channels:\n\n"
+        f"📱 Call: {CONTACT_INFO['phone']}\n"
+        f"💬 WhatsApp: {CONTACT_INFO['whatsapp']}\n"
+        f"📧 Email: {CONTACT_INFO['email']}\n"
+        f"🌐 Website: {CONTACT_INFO['website']}\n\n"
+        "📱 Social Media:\n"
+        f"• Instagram: {CONTACT_INFO['instagram']}\n"
+        f"• YouTube: {CONTACT_INFO['youtube']}\n"
+        f"• Facebook: {CONTACT_INFO['facebook']}\n"
+        f"• Twitter/X: {CONTACT_INFO['twitter']}\n"
+        f"• Pinterest: {CONTACT_INFO['pinterest']}\n"
+        f"• Threads: {CONTACT_INFO['threads']}\n\n"
+        "🕒 Business Hours:\n"
+        "24/7 Available - You can reach out to us anytime!\n\n"
+        "💝 We're here to help!"
+    )
+    await query.edit_message_text(
+        message, reply_markup=old_back_to_menu_keyboard(), parse_mode=None, disable_web_page_preview=True
+    )
+
+async def old_follow_us(query, context) -> None:
+    message = (
+        f"{BRAND_LOGO} 📱 Follow Us\n\n"
+        "Stay connected with us on social media for the latest updates, new arrivals, and exclusive offers!\n\n"
+        "🌟 Our Social Media:\n"
+        f"• Instagram: {CONTACT_INFO['instagram']}\n"
+        f"• YouTube: {CONTACT_INFO['youtube']}\n"
+        f"• Facebook: {CONTACT_INFO['facebook']}\n"
+        f"• Twitter/X: {CONTACT_INFO['twitter']}\n"
+        f"• Pinterest: {CONTACT_INFO['pinterest']}\n"
+        f"• Threads: {CONTACT_INFO['threads']}\n\n"
+        "🎯 Don't miss out on our latest updates!"
+    )
+    await query.edit_message_text(
+        message, reply_markup=old_back_to_menu_keyboard(), parse_mode=None, disable_web_page_preview=True
+    )
+
+# =============================================================================
+# STUB QUERY
+# =============================================================================
+
+class StubQuery:
+    """A callback query whose edit does nothing, or serializes the request like the Bot API call would"""
+
+    def __init__(self, serialize: bool):
+        self.serialize = serialize
+
+    async def edit_message_text(self, text, reply_markup=None, **options):
+        if self.serialize:
+            json.dumps({'text': text, 'reply_markup': reply_markup.to_dict() if reply_markup else None, **options})
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+HANDLERS = [
+    ('show_main_menu', old_show_main_menu, telegram_bot.show_main_menu),
+    ('place_order', old_place_order, telegram_bot.place_order),
+    ('contact_us', old_contact_us, telegram_bot.contact_us),
+    ('follow_us', old_follow_us, telegram_bot.follow_us),
+]
+
+async def cpu_per_call(handler, query, calls: int) -> float:
+    """Process CPU seconds per handler call"""
+    for _ in range(WARMUP_CALLS):
+        await handler(query, None)
+    started = time.process_time()
+    for _ in range(calls):
+        await handler(query, None)
+    return (time.process_time() - started) / calls
+
+async def run(calls: int) -> None:
+    print(f"CPU per call over {calls} calls; the second pair includes serializing the request as JSON")
+    print(f"{'handler':16s} {'before us':>10s} {'after us':>10s} {'before+json':>12s} {'after+json':>11s}")
+    for name, before, after in HANDLERS:
+        timings = [
+            await cpu_per_call(handler, StubQuery(serialize), calls)
+            for serialize in (False, True)
+            for handler in (before, after)
+        ]
+        print(f"{name:16s} " + " ".join(f"{seconds * 1e6:>10.2f}" for seconds in timings[:2])
+              + " " + " ".join(f"{seconds * 1e6:>11.2f}" for seconds in timings[2:]))
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(calls))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Shopify Client Benchmark
+Updates per second when every update makes one Shopify call: blocking GETs vs the shared async client
+
+Usage: python bench/shopify_client_bench.py [updates] [latency seconds]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_shopify import FakeShopify  # noqa: E402
+from shopify_client import ShopifyClient  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_UPDATES = 100  # Concurrent updates, one Shopify call each
+DEFAULT_LATENCY = 0.1  # Seconds per fake Shopify response
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+async def blocking_updates(base_url: str, updates: int) -> float:
+    """What handlers did before: a blocking GET (like requests.get) inside each async handler"""
+    with httpx.Client(base_url=base_url) as session:
+        async def handle(i: int) -> None:
+            session.get(f"collections/{i}/products.json", params={'limit': 5, 'status': 'active'}).json()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(handle(i) for i in range(updates)))
+        return time.perf_counter() - started
+
+async def async_updates(base_url: str, updates: int) -> float:
+    """Handlers awaiting the shared ShopifyClient (distinct collections, so nothing is coalesced)"""
+    client = ShopifyClient("bench", "token", base_url=base_url)
+    await client.start()
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(client.fetch_products(collection_id=str(i)) for i in range(updates)))
+        return time.perf_counter() - started
+    finally:
+        await client.close()
+
+def main() -> None:
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_UPDATES
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LATENCY
+    with FakeShopify(latency=latency) as server:
+        print(f"{updates} concurrent updates, {latency * 1000:.0f}ms per Shopify call")
+        for name, run in (('blocking GET', blocking_updates), ('ShopifyClient', async_updates)):
+            elapsed = asyncio.run(run(server.base_url, updates))
+            print(f"{name:14s} {elapsed:7.2f}s  {updates / elapsed:8.1f} updates/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Snapshot Startup Benchmark
+Time from startup to the first useful catalog answer, cold vs restored from a catalog snapshot
+
+Usage: python bench/snapshot_startup_bench.py [shopify latency seconds]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['PERSISTENCE_PATH'] = ''
+os.environ['CATALOG_SNAPSHOT_PATH'] = os.path.join(tempfile.mkdtemp(), 'catalog_snapshot.json.gz')
+
+import telegram_bot  # noqa: E402
+from catalog_cache import CatalogCache  # noqa: E402
+from catalog_pager import CatalogPager  # noqa: E402
+from collection_index import CollectionIndex  # noqa: E402
+from fake_shopify import FakeShopify  # noqa: E402
+from product_search import ProductSearchIndex  # noqa: E402
+from shopify_client import ShopifyClient  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_LATENCY = 0.3  # Seconds per fake Shopify response (a slow round trip from the bot host)
+
+# =============================================================================
+# STUB QUERY
+# =============================================================================
+
+class StubMessage:
+    chat_id = 7
+
+class StubQuery:
+    """A callback query that records when the first non-placeholder answer was shown"""
+
+    def __init__(self, started: float):
+        self.message = StubMessage()
+        self.started = started
+        self.answered_after = None
+
+    async def edit_message_text(self, text, **kwargs):
+        if "Fetching" not in text and self.answered_after is None:
+            self.answered_after = time.perf_counter() - self.started
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def reset_catalog() -> None:
+    """Forget everything in memory, as a restarted process would"""
+    telegram_bot.catalog_cache = CatalogCache(
+        ttl=telegram_bot.CATALOG_CACHE_TTL,
+        max_stale=telegram_bot.CATALOG_CACHE_MAX_STALE,
+        max_entries=telegram_bot.CATALOG_CACHE_MAX_ENTRIES
+    )
+    telegram_bot.collection_index = CollectionIndex()
+    telegram_bot.product_index = ProductSearchIndex()
+    telegram_bot.catalog_pager = CatalogPager(telegram_bot.fetch_catalog_page)
+
+async def boot(server: FakeShopify, restore: bool) -> None:
+    """Start like post_init plus the warmer, with two users tapping menu buttons at once"""
+    reset_catalog()
+    hits = len(server.hits)
+    started = time.perf_counter()
+    if restore:
+        telegram_bot.restore_catalog_snapshot()
+    warmer = asyncio.create_task(telegram_bot.warm_catalog())
+    offers, browse = StubQuery(started), StubQuery(started)
+    await asyncio.gather(telegram_bot.view_offers(offers, None), telegram_bot.browse_collection(browse, None))
+    shopify_calls = len(server.hits) - hits
+    await warmer
+    name = 'from snapshot' if restore else 'cold'
+    print(f"{name:14s} offers {offers.answered_after * 1000:7.1f}ms  browse {browse.answered_after * 1000:7.1f}ms  "
+          f"Shopify requests by then (warmer included): {shopify_calls}")
+
+async def run(server: FakeShopify) -> None:
+    telegram_bot.shopify = ShopifyClient("bench", "token", base_url=server.base_url)
+    await telegram_bot.shopify.start()
+    try:
+        reset_catalog()
+        await telegram_bot.warm_catalog()
+        await telegram_bot.save_catalog_snapshot()
+        await boot(server, restore=False)
+        await boot(server, restore=True)
+    finally:
+        await telegram_bot.shopify.close()
+
+def main() -> None:
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LATENCY
+    logging.disable(logging.CRITICAL)
+    with FakeShopify(latency=latency) as server:
+        print(f"Time to the first useful answer after startup, {latency * 1000:.0f}ms per Shopify call")
+        asyncio.run(run(server))
+
+if __name__ == '__main__':
+    main()
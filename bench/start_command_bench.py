@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - /start Benchmark
+Time per /start with a stub Bot: uploading the logo every time vs reusing its Telegram file_id
+
+Usage: python bench/start_command_bench.py [runs] [upload bytes/s]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('LOGO_PATH', os.path.join(ROOT, 'logo.png'))
+os.environ['LOGO_FILE_ID_CACHE'] = os.path.join(tempfile.mkdtemp(), 'logo_file_id.json')
+os.environ['PERSISTENCE_PATH'] = ''
+os.environ['CATALOG_SNAPSHOT_PATH'] = ''
+
+import telegram_bot  # noqa: E402
+from telegram import InputFile  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_RUNS = 20
+DEFAULT_UPLOAD_RATE = 2_000_000  # Bytes per second from the bot host to Telegram
+API_LATENCY = 0.05  # Seconds per Bot API call before any upload
+
+# =============================================================================
+# STUB BOT
+# =============================================================================
+
+class StubPhotoSize:
+    def __init__(self, file_id: str):
+        self.file_id = file_id
+
+class StubSentMessage:
+    def __init__(self, file_id: str):
+        self.photo = [StubPhotoSize(f"{file_id}-small"), StubPhotoSize(file_id)]
+
+class StubUser:
+    id = 42
+    username = "bench_user"
+    first_name = "Bench"
+
+class StubMessage:
+    """An incoming /start message whose replies cost Bot API latency plus upload time"""
+
+    from_user = StubUser()
+
+    def __init__(self, upload_rate: float):
+        self.upload_rate = upload_rate
+        self.uploaded_bytes = 0
+
+    async def reply_photo(self, photo, caption=None, parse_mode=None, **kwargs):
+        delay = API_LATENCY
+        if isinstance(photo, InputFile):
+            size = len(photo.input_file_content)
+            self.uploaded_bytes += size
+            delay += size / self.upload_rate
+        await asyncio.sleep(delay)
+        return StubSentMessage("logo-file-id")
+
+    async def reply_text(self, text, **kwargs):
+        await asyncio.sleep(API_LATENCY)
+
+class StubUpdate:
+    def __init__(self, message: StubMessage):
+        self.message = message
+        self.effective_chat = None
+        self.effective_user = message.from_user
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+async def run_starts(runs: int, upload_rate: float, reuse_file_id: bool) -> tuple:
+    """Run /start `runs` times; returns (seconds per /start, bytes uploaded)"""
+    telegram_bot.save_logo_file_id(None, None)
+    message = StubMessage(upload_rate)
+    update = StubUpdate(message)
+    elapsed = 0.0
+    for _ in range(runs):
+        if not reuse_file_id:
+            telegram_bot._logo_cache['file_id'] = None  # Before: every /start uploaded the file
+        started = time.perf_counter()
+        await telegram_bot.start_command(update, None)
+        elapsed += time.perf_counter() - started
+    return elapsed / runs, message.uploaded_bytes
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUNS
+    upload_rate = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_UPLOAD_RATE
+    logging.disable(logging.CRITICAL)
+    print(f"{runs} x /start, logo {os.path.getsize(os.environ['LOGO_PATH'])} bytes, "
+          f"{API_LATENCY * 1000:.0f}ms per API call, upload at {upload_rate / 1e6:.1f} MB/s")
+    for name, reuse in (('upload each time', False), ('cached file_id', True)):
+        per_start, uploaded = asyncio.run(run_starts(runs, upload_rate, reuse))
+        print(f"{name:17s} {per_start * 1000:8.1f}ms per /start  {uploaded / 1e6:8.2f} MB uploaded")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Webhook Benchmark
+p50/p99 latency of Telegram webhook POSTs answered by the bot's web server
+
+Usage: python bench/webhook_bench.py [requests] [connections]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update(BOT_RUN_MODE='webhook', PORT='0', WEBHOOK_SECRET_TOKEN='bench-secret')
+os.environ['PERSISTENCE_PATH'] = ''
+os.environ['CATALOG_SNAPSHOT_PATH'] = ''
+
+import telegram_bot  # noqa: E402
+from telegram.ext import Application  # noqa: E402
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_REQUESTS = 5000
+DEFAULT_CONNECTIONS = 20  # Telegram opens up to 40 (max_connections in setWebhook)
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def webhook_request(update_id: int) -> bytes:
+    """A raw HTTP POST carrying a text message update, as Telegram sends it"""
+    body = json.dumps({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': update_id % 500, 'type': 'private'},
+            'from': {'id': update_id % 500, 'is_bot': False, 'first_name': 'Bench'},
+            'text': 'red silk saree',
+        },
+    }).encode()
+    head = (
+        f"POST {telegram_bot.WEBHOOK_PATH} HTTP/1.1\r\n"
+        "Host: bot\r\n"
+        "Content-Type: application/json\r\n"
+        "X-Telegram-Bot-Api-Secret-Token: bench-secret\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    )
+    return head.encode() + body
+
+async def connection(port: int, update_ids: range, latencies: list) -> None:
+    """Post updates one after another over one keep-alive connection"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for update_id in update_ids:
+            started = time.perf_counter()
+            writer.write(webhook_request(update_id))
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.lower().split(b"content-length: ")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not head.startswith(b"HTTP/1.1 200"):
+                raise RuntimeError(f"Unexpected response: {head!r}")
+    finally:
+        writer.close()
+
+async def run(requests: int, connections: int) -> None:
+    application = Application.builder().token('1:bench').build()
+    server = telegram_bot.create_web_server(application)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+    latencies: list = []
+    per_connection = requests // connections
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            connection(port, range(i * per_connection, (i + 1) * per_connection), latencies)
+            for i in range(connections)
+        ))
+    finally:
+        await server.stop()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{len(latencies)} webhook POSTs over {connections} connections in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"p50 {p50 * 1000:.2f}ms  p99 {p99 * 1000:.2f}ms  max {latencies[-1] * 1000:.2f}ms  "
+          f"queued updates {application.update_queue.qsize()}")
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CONNECTIONS
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(requests, connections))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Callback Router
+Table-driven dispatch of inline keyboard callbacks with structured callback_data
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MAX_CALLBACK_DATA = 64  # Telegram's limit on callback_data, in bytes
+SEPARATOR = ":"  # Between the route prefix and each payload field
+
+# =============================================================================
+# CALLBACK DATA
+# =============================================================================
+
+def callback_data(prefix: str, *fields: Any) -> str:
+    """Encode a route prefix and payload fields as "prefix:field:field" """
+    data = SEPARATOR.join([prefix, *(str(field) for field in fields)])
+    if len(data.encode()) > MAX_CALLBACK_DATA:
+        raise ValueError(f"callback_data {data!r} exceeds {MAX_CALLBACK_DATA} bytes")
+    return data
+
+def non_negative_int(field: str) -> int:
+    """Payload converter for page numbers and ids: ASCII digits only ("-1", " 1", "1_0" are rejected)"""
+    if not (field.isascii() and field.isdigit()):
+        raise ValueError(f"Not a non-negative integer payload field: {field!r}")
+    return int(field)
+
+# =============================================================================
+# CALLBACK ROUTER
+# =============================================================================
+
+# handler(query, context, *payload)
+CallbackHandler = Callable[..., Awaitable[None]]
+
+class Route:
+    """A registered callback handler with its payload converters and timing"""
+
+    __slots__ = ('handler', 'converters', 'calls', 'errors', 'total_seconds', 'max_seconds')
+
+    def __init__(self, handler: CallbackHandler, converters: Sequence[Callable[[str], Any]]):
+        self.handler = handler
+        self.converters = converters
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+class CallbackRouter:
+    """Maps callback_data prefixes to handlers in one dict lookup.
+
+    callback_data is "prefix" or "prefix:field:...". Each payload field is
+    converted with the route's converters (e.g. int) before the handler is
+    called as handler(query, context, *fields).
+    """
+
+    def __init__(self, on_dispatch: Optional[Callable[[str, float, bool], None]] = None):
+        self.routes: Dict[str, Route] = {}
+        self.counters = {'unknown': 0, 'bad_payload': 0}
+        self.on_dispatch = on_dispatch  # Called with (prefix, seconds, failed) after each handler
+
+    def add(self, prefix: str, handler: CallbackHandler, *converters: Callable[[str], Any]) -> None:
+        """Register a handler for a prefix, with one converter per payload field"""
+        if SEPARATOR in prefix:
+            raise ValueError(f"Route prefix {prefix!r} must not contain {SEPARATOR!r}")
+        if prefix in self.routes:
+            raise ValueError(f"Route {prefix!r} is already registered")
+        self.routes[prefix] = Route(handler, converters)
+
+    def resolve(self, data: str) -> Optional[tuple]:
+        """Return (prefix, route, converted payload) for callback_data, or None if it doesn't match"""
+        prefix, separator, payload = data.partition(SEPARATOR)
+        route = self.routes.get(prefix)
+        if route is None:
+            self.counters['unknown'] += 1
+            return None
+        fields = payload.split(SEPARATOR) if separator else []  # "prefix:" has one (empty) field
+        if len(fields) != len(route.converters):
+            self.counters['bad_payload'] += 1
+            return None
+        try:
+            args = [convert(field) for convert, field in zip(route.converters, fields)]
+        except ValueError:
+            self.counters['bad_payload'] += 1
+            return None
+        return prefix, route, args
+
+    async def dispatch(self, query, context) -> bool:
+        """Run the handler for a callback query; returns False if no route matched"""
+        resolved = self.resolve(query.data or "")
+        if resolved is None:
+            logger.warning(f"Unrouted callback data: {query.data!r}")
+            return False
+        prefix, route, args = resolved
+        started = time.perf_counter()
+        failed = False
+        try:
+            await route.handler(query, context, *args)
+        except Exception:
+            route.errors += 1
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            route.calls += 1
+            route.total_seconds += elapsed
+            route.max_seconds = max(route.max_seconds, elapsed)
+            if self.on_dispatch is not None:
+                self.on_dispatch(prefix, elapsed, failed)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-route call counts, errors and latency"""
+        stats: Dict[str, Any] = dict(self.counters)
+        stats['routes'] = {
+            prefix: {
+                'calls': route.calls,
+                'errors': route.errors,
+                'avg_ms': round(route.total_seconds / route.calls * 1000, 2) if route.calls else 0.0,
+                'max_ms': round(route.max_seconds * 1000, 2),
+            }
+            for prefix, route in self.routes.items()
+        }
+        return stats
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Catalog Cache
+TTL + stale-while-revalidate cache in front of the Shopify catalog calls
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_TTL = 300.0  # Seconds an entry is served as fresh
+DEFAULT_MAX_STALE = 3600.0  # Seconds past the TTL an entry may still be served while refreshing
+DEFAULT_MAX_ENTRIES = 256  # LRU bound on cached (endpoint, collection_id, tag, limit) keys
+
+# =============================================================================
+# CATALOG CACHE
+# =============================================================================
+
+Loader = Callable[[], Awaitable[Any]]
+
+class CatalogCache:
+    """Bounded LRU cache with TTL expiry and stale-while-revalidate refreshes"""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_stale: float = DEFAULT_MAX_STALE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.counters = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'evictions': 0,
+        }
+
+    @staticmethod
+    def make_key(endpoint: str, collection_id: Optional[str] = None, tag: Optional[str] = None, limit: Optional[int] = None) -> Tuple:
+        """Build the cache key for a catalog request"""
+        return (endpoint, collection_id, tag, limit)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value regardless of age, without touching counters"""
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since a key's value was fetched, or None if it isn't cached"""
+        entry = self._entries.get(key)
+        return time.monotonic() - entry[0] if entry else None
+
+    def is_cached(self, key: Hashable) -> bool:
+        """Whether get() would answer key from memory (fresh, or stale and refreshed in the background)"""
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry[0] < self.ttl + self.max_stale
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """Store a value fetched age seconds ago, evicting the least recently used entry if full"""
+        self._entries[key] = (time.monotonic() - age, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def export(self) -> List[Tuple[Hashable, Any, float]]:
+        """Return (key, value, age in seconds) for every entry, least recently used first"""
+        now = time.monotonic()
+        return [(key, value, now - stored_at) for key, (stored_at, value) in self._entries.items()]
+
+    def patch(self, transform: Callable[[Hashable, Any], Any]) -> None:
+        """Replace every cached value with transform(key, value), keeping its age"""
+        for key, (stored_at, value) in list(self._entries.items()):
+            self._entries[key] = (stored_at, transform(key, value))
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or the whole cache when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get(self, key: Hashable, loader: Loader) -> Any:
+        """Return the cached value for key, loading or refreshing it through loader as needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry[1]
+            if age < self.ttl + self.max_stale:
+                self._entries.move_to_end(key)
+                self.counters['stale_hits'] += 1
+                self._schedule_refresh(key, loader)
+                return entry[1]
+
+        # Missing or too old to serve: load inline, sharing any refresh already running
+        self.counters['misses'] += 1
+        task = self._refreshing.get(key)
+        if task is not None:
+            return await asyncio.shield(task)
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: Hashable, loader: Loader) -> None:
+        """Start a background refresh for key unless one is already running"""
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: Hashable, loader: Loader) -> Any:
+        """Reload key in the background, keeping the stale value on failure"""
+        self.counters['refreshes'] += 1
+        try:
+            value = await loader()
+        except Exception as e:
+            self.counters['refresh_errors'] += 1
+            logger.warning(f"Background refresh failed for {key}: {e}")
+            return self.peek(key)
+        self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/refresh counters plus the current size"""
+        stats = dict(self.counters)
+        stats['entries'] = len(self._entries)
+        stats['refreshing'] = len(self._refreshing)
+        return stats
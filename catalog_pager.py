@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Catalog Pager
+Per-chat cursor pagination state with bounded page caches and next-page prefetch
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_MAX_CHATS = 1000  # Chats whose browsing state is kept (least recently used dropped)
+DEFAULT_MAX_PAGES_PER_CHAT = 10  # Pages cached per chat (least recently used dropped)
+
+# =============================================================================
+# CATALOG PAGER
+# =============================================================================
+
+PageFetcher = Callable[[Optional[str]], Awaitable[Dict[str, Any]]]
+
+class ChatPages:
+    """Browsing state of one chat: cursors to each seen page and cached page contents"""
+
+    def __init__(self):
+        self.cursors: List[Optional[str]] = [None]  # cursors[n] fetches page n; page 0 needs none
+        self.pages: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.tasks: Dict[int, asyncio.Task] = {}
+
+class CatalogPager:
+    """Serves numbered catalog pages per chat on top of a cursor-based page fetcher"""
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        max_chats: int = DEFAULT_MAX_CHATS,
+        max_pages_per_chat: int = DEFAULT_MAX_PAGES_PER_CHAT,
+    ):
+        self.fetch_page = fetch_page
+        self.max_chats = max_chats
+        self.max_pages_per_chat = max_pages_per_chat
+        self._chats: "OrderedDict[int, ChatPages]" = OrderedDict()
+        self.counters = {'page_hits': 0, 'page_fetches': 0, 'prefetches': 0}
+
+    def _chat(self, chat_id: int) -> ChatPages:
+        """Return (creating if needed) the state of a chat, marking it recently used"""
+        state = self._chats.get(chat_id)
+        if state is None:
+            state = self._chats[chat_id] = ChatPages()
+            while len(self._chats) > self.max_chats:
+                _, dropped = self._chats.popitem(last=False)
+                for task in dropped.tasks.values():
+                    task.cancel()
+        self._chats.move_to_end(chat_id)
+        return state
+
+    def reset(self, chat_id: int) -> None:
+        """Forget a chat's browsing state"""
+        state = self._chats.pop(chat_id, None)
+        if state is not None:
+            for task in state.tasks.values():
+                task.cancel()
+
+    def is_cached(self, chat_id: int, page: int) -> bool:
+        """Whether a page is already in the chat's cache"""
+        state = self._chats.get(chat_id)
+        return state is not None and page in state.pages
+
+    def has_next(self, chat_id: int, page: int) -> bool:
+        """Whether a page after the given one is known to exist"""
+        state = self._chats.get(chat_id)
+        return state is not None and len(state.cursors) > page + 1
+
+    async def get_page(self, chat_id: int, page: int) -> Optional[Dict[str, Any]]:
+        """Return a page ({"products", "next", "previous"}), or None if it can't be reached"""
+        state = self._chat(chat_id)
+        if page in state.pages:
+            state.pages.move_to_end(page)
+            self.counters['page_hits'] += 1
+            return state.pages[page]
+        if page >= len(state.cursors):
+            return None
+        return await asyncio.shield(self._start_fetch(state, page))
+
+    def prefetch(self, chat_id: int, page: int) -> None:
+        """Fetch a page in the background if it is reachable and not cached yet"""
+        state = self._chat(chat_id)
+        if page in state.pages or page in state.tasks or page >= len(state.cursors):
+            return
+        self.counters['prefetches'] += 1
+        self._start_fetch(state, page)
+
+    def _start_fetch(self, state: ChatPages, page: int) -> asyncio.Task:
+        """Start (or join) the fetch of a page"""
+        task = state.tasks.get(page)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(state, page))
+            state.tasks[page] = task
+            task.add_done_callback(lambda done: self._finish_fetch(state, page, done))
+        return task
+
+    def _finish_fetch(self, state: ChatPages, page: int, task: asyncio.Task) -> None:
+        """Forget a completed fetch, logging failures nobody awaited"""
+        state.tasks.pop(page, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Fetching catalog page {page} failed: {task.exception()}")
+
+    async def _fetch(self, state: ChatPages, page: int) -> Dict[str, Any]:
+        """Fetch a page, cache it and record the cursor to the page after it"""
+        self.counters['page_fetches'] += 1
+        data = await self.fetch_page(state.cursors[page])
+        state.pages[page] = data
+        while len(state.pages) > self.max_pages_per_chat:
+            state.pages.popitem(last=False)
+        if data.get('next') and len(state.cursors) == page + 1:
+            state.cursors.append(data['next'])
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        """Return page cache counters"""
+        stats = dict(self.counters)
+        stats['chats'] = len(self._chats)
+        return stats
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Catalog Snapshot
+Versioned on-disk copy of the catalog so a restarted bot can answer immediately
+"""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SNAPSHOT_VERSION = 1  # Bump when the snapshot layout changes; other versions are ignored
+
+# =============================================================================
+# SNAPSHOT FILE
+# =============================================================================
+
+def save_snapshot(path: str, data: Dict[str, Any]) -> None:
+    """Write a gzipped JSON snapshot atomically (temp file + rename).
+
+    Each write gets its own temp file, so concurrent writers never remove
+    each other's; the last rename wins.
+    """
+    document = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), **data}
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory or ".")
+    try:
+        with os.fdopen(fd, 'wb') as raw_file, \
+                gzip.open(raw_file, 'wt', encoding='utf-8', compresslevel=6) as snapshot_file:
+            json.dump(document, snapshot_file, separators=(',', ':'))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """Read a snapshot, or None if it is missing, unreadable or from another version"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as snapshot_file:
+            document = json.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable catalog snapshot {path}: {e}")
+        return None
+    if document.get('version') != SNAPSHOT_VERSION:
+        logger.info(f"Ignoring catalog snapshot {path} with version {document.get('version')}")
+        return None
+    return document
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Collection Index
+In-memory lookup of Shopify collections by title, handle and title word prefixes
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into casefolded word tokens"""
+    return _TOKEN_RE.findall(text.casefold())
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for comparison: casefolded words joined by single spaces"""
+    return " ".join(tokenize(title))
+
+# =============================================================================
+# COLLECTION INDEX
+# =============================================================================
+
+class CollectionIndex:
+    """Collection id lookup by normalized title, handle or word prefixes"""
+
+    def __init__(self):
+        self.by_title: Dict[str, str] = {}
+        self.by_handle: Dict[str, str] = {}
+        self.by_prefix: Dict[str, Set[str]] = {}
+        self.order: Dict[str, int] = {}  # Collection id -> position in the Shopify listing
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def rebuild(self, collections: Iterable[Dict]) -> None:
+        """Replace the index contents with the given collections"""
+        by_title: Dict[str, str] = {}
+        by_handle: Dict[str, str] = {}
+        by_prefix: Dict[str, Set[str]] = {}
+        order: Dict[str, int] = {}
+
+        for position, collection in enumerate(collections):
+            if 'id' not in collection:
+                continue
+            collection_id = str(collection['id'])
+            order[collection_id] = position
+            title = collection.get('title', '')
+            by_title.setdefault(normalize_title(title), collection_id)
+            if collection.get('handle'):
+                by_handle.setdefault(collection['handle'].casefold(), collection_id)
+            for token in tokenize(title):
+                for end in range(1, len(token) + 1):
+                    by_prefix.setdefault(token[:end], set()).add(collection_id)
+
+        # Swap in one step so readers never see a half-built index
+        self.by_title, self.by_handle, self.by_prefix, self.order = by_title, by_handle, by_prefix, order
+        self.built_at = time.time()
+
+    def find(self, title: str) -> Optional[str]:
+        """Resolve a title to a collection id.
+
+        Tries an exact normalized title, then a handle, then collections whose
+        title has a word starting with each query word (first listed wins).
+        """
+        normalized = normalize_title(title)
+        if normalized in self.by_title:
+            return self.by_title[normalized]
+        handle = title.strip().casefold()
+        if handle in self.by_handle:
+            return self.by_handle[handle]
+
+        tokens = normalized.split()
+        if not tokens:
+            return None
+        candidates = self.by_prefix.get(tokens[0], set())
+        for token in tokens[1:]:
+            candidates = candidates & self.by_prefix.get(token, set())
+        if not candidates:
+            return None
+        return min(candidates, key=self.order.__getitem__)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Fan-out Helpers
+Run independent awaitables concurrently under one shared deadline
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# FAN-OUT
+# =============================================================================
+
+async def gather_with_deadline(calls: Dict[str, Awaitable], timeout: float, default: Any = None) -> Dict[str, Any]:
+    """Run named awaitables in parallel and collect whatever finishes in time.
+
+    Calls still running when the deadline passes are cancelled, and calls that
+    time out or raise yield ``default`` so the caller can render a partial result.
+    """
+    tasks = {name: asyncio.ensure_future(call) for name, call in calls.items()}
+    if not tasks:
+        return {}
+
+    done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    results: Dict[str, Any] = {}
+    for name, task in tasks.items():
+        if task not in done:
+            logger.warning(f"Fan-out call '{name}' missed the {timeout:.1f}s deadline")
+            results[name] = default
+        elif task.cancelled() or task.exception() is not None:
+            logger.warning(f"Fan-out call '{name}' failed: {'cancelled' if task.cancelled() else task.exception()}")
+            results[name] = default
+        else:
+            results[name] = task.result()
+    return results
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Message Builder
+Collects list replies and splits them between items into messages under Telegram's size limit
+"""
+
+import re
+from typing import List
+from urllib.parse import quote
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit on one text message, in UTF-16 code units
+TRUNCATION_MARK = "…\n"
+_MARKDOWN_SPECIAL = re.compile(r"([_*`\[])")  # Characters with meaning in Telegram's legacy Markdown
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def markdown_bold(text: str) -> str:
+    """Bold text in legacy Markdown, escaping metacharacters between bold runs.
+
+    Telegram ignores escapes inside an entity, so "Silk_Saree" becomes
+    "*Silk*\\_*Saree*" rather than "*Silk\\_Saree*".
+    """
+    return "".join(
+        "\\" + piece if _MARKDOWN_SPECIAL.fullmatch(piece) else f"*{piece}*"
+        for piece in _MARKDOWN_SPECIAL.split(text) if piece
+    )
+
+def markdown_link_url(url: str) -> str:
+    """Percent-encode what would end or break the URL of a legacy Markdown [text](url) link.
+
+    Telegram ignores backslash escapes inside the link, so ")" and spaces
+    are encoded instead; URL syntax characters are left as they are.
+    """
+    return quote(url, safe="/:?#[]@!$&'*+,;=%~")
+
+def message_length(text: str) -> int:
+    """Length of text as Telegram counts it (UTF-16 code units; most emoji count twice)"""
+    return len(text.encode('utf-16-le')) // 2
+
+def truncate_item(item: str, limit: int) -> str:
+    """Cut an item that can't fit in any message, preferring a line boundary"""
+    limit -= message_length(TRUNCATION_MARK)
+    cut = item[:limit]
+    while message_length(cut) > limit:
+        cut = cut[:-1]
+    if "\n" in cut:
+        cut = cut[:cut.rindex("\n") + 1]  # Keep Markdown entities on the lines before intact
+    return cut + TRUNCATION_MARK
+
+# =============================================================================
+# MESSAGE BUILDER
+# =============================================================================
+
+class MessageBuilder:
+    """A header, items and a footer, joined once and split on item boundaries.
+
+    Items are collected in a list and each message is joined in one pass,
+    so building a reply stays linear in the number of items. The header
+    opens the first message and the footer closes the last; an item is
+    never split across messages.
+    """
+
+    def __init__(self, header: str = "", footer: str = "", limit: int = MAX_MESSAGE_LENGTH):
+        self.header = header
+        self.footer = footer
+        self.limit = limit
+        self.items: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item: str) -> None:
+        """Append an item"""
+        self.items.append(item)
+
+    def build(self) -> List[str]:
+        """Return the message texts, each within the limit"""
+        messages: List[str] = []
+        parts: List[str] = [self.header] if self.header else []
+        length = message_length(self.header)
+        for item in self.items:
+            size = message_length(item)
+            if size > self.limit:
+                item = truncate_item(item, self.limit)
+                size = message_length(item)
+            if length + size > self.limit:
+                messages.append("".join(parts))
+                parts, length = [], 0
+            parts.append(item)
+            length += size
+        if self.footer:
+            size = message_length(self.footer)
+            if length + size > self.limit and parts:
+                messages.append("".join(parts))
+                parts = []
+            parts.append(self.footer)
+        if parts:
+            messages.append("".join(parts))
+        return messages
+
+    async def edit(self, query, reply_markup=None, **options) -> None:
+        """Show the first message in place of a callback query's message and send the rest after it.
+
+        The keyboard goes on the last message so it stays below the list.
+        Nothing is sent when there is no header, item or footer.
+        """
+        messages = self.build()
+        if not messages:
+            return
+        await query.edit_message_text(
+            messages[0],
+            reply_markup=reply_markup if len(messages) == 1 else None,
+            **options
+        )
+        await self._send_rest(query.message, messages[1:], reply_markup, options)
+
+    async def reply(self, message, reply_markup=None, **options) -> None:
+        """Send the messages in reply to a message, the keyboard on the last (nothing if there are none)"""
+        messages = self.build()
+        if not messages:
+            return
+        await message.reply_text(
+            messages[0],
+            reply_markup=reply_markup if len(messages) == 1 else None,
+            **options
+        )
+        await self._send_rest(message, messages[1:], reply_markup, options)
+
+    @staticmethod
+    async def _send_rest(message, texts: List[str], reply_markup, options) -> None:
+        """Send follow-up messages in order"""
+        for i, text in enumerate(texts, 1):
+            await message.reply_text(
+                text,
+                reply_markup=reply_markup if i == len(texts) else None,
+                **options
+            )
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Metrics
+Counters, gauges and histograms exported in the Prometheus text format
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Histogram bucket upper bounds in seconds (a +Inf bucket is always added)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_INTERVAL = 0.1  # Seconds between event loop lag samples (a stall shorter than this may fall between samples)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    """Render {name="value",...}, or nothing without labels"""
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    """Render a sample value"""
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class Metric:
+    """A named metric with one value per combination of label values"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Sequence[Any]) -> Tuple[str, ...]:
+        """Label values as a dict key"""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> Iterator[Tuple[str, List[Tuple[str, str]], float]]:
+        """Yield (sample name, label pairs, value) for rendering"""
+        for key, value in self.values.items():
+            yield self.name, list(zip(self.labelnames, key)), value
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    type = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        """Add to the counter for the given label values"""
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """A value that is set, or read from a function at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), function: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labelnames)
+        self.function = function
+
+    def set(self, value: float, *labels: Any) -> None:
+        """Set the gauge for the given label values"""
+        self.values[self._key(labels)] = value
+
+    def samples(self) -> Iterator[Tuple[str, List[Tuple[str, str]], float]]:
+        if self.function is not None:
+            yield self.name, [], self.function()
+            return
+        yield from super().samples()
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: Any) -> None:
+        """Record one observation for the given label values"""
+        key = self._key(labels)
+        state = self.values.get(key)
+        if state is None:
+            # Per-bucket counts (the last is +Inf), then the sum
+            state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def samples(self) -> Iterator[Tuple[str, List[Tuple[str, str]], float]]:
+        for key, state in self.values.items():
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", pairs + [('le', _format_value(float(bound)))], cumulative
+            yield f"{self.name}_sum", pairs, state[-1]
+            yield f"{self.name}_count", pairs, cumulative
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class Registry:
+    """The metrics exported on /metrics"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def add(self, metric: Metric) -> Metric:
+        """Register a metric"""
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register a counter"""
+        return self.add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), function: Optional[Callable[[], float]] = None) -> Gauge:
+        """Register a gauge"""
+        return self.add(Gauge(name, help, labelnames, function))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Register a histogram"""
+        return self.add(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, pairs, value in metric.samples():
+                lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# =============================================================================
+# EVENT LOOP LAG
+# =============================================================================
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a sleeping task (time other work held the loop).
+
+    last_wake (time.monotonic() of the latest wakeup) doubles as the loop's
+    heartbeat for StallDetector, which reads it from its watchdog thread.
+    """
+
+    def __init__(self, histogram: Histogram, gauge: Gauge, interval: float = LOOP_LAG_INTERVAL):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self.last_wake = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start sampling on the running loop"""
+        if self._task is None:
+            self.last_wake = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        """Sleep for the interval and record the overshoot"""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.last_wake = time.monotonic()
+            lag = max(0.0, self.last_wake - started - self.interval)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
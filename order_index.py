@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Order Index
+In-memory index of recent Shopify orders by order name/number for status lookups
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_MAX_ORDERS = 5000  # Orders kept in memory (least recently updated dropped)
+
+# Order fields requested from Shopify (everything the status reply and verification need)
+ORDER_FIELDS = (
+    "id,name,order_number,email,phone,created_at,updated_at,cancelled_at,"
+    "financial_status,fulfillment_status,fulfillments,customer,shipping_address,billing_address"
+)
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d{10,13}|(?:\+\d{1,3}[\s-]?)?\d{5}[\s-]?\d{5}")  # "+91 98765 43210", "9876543210"
+_ORDER_NUMBER_RE = re.compile(r"#?\s*([a-z]*\d+[a-z]*)")
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def phone_digits(phone: Optional[str]) -> str:
+    """Last 10 digits of a phone number (drops country codes and formatting)"""
+    return re.sub(r"\D", "", phone or "")[-10:]
+
+def parse_order_query(text: str) -> Tuple[Optional[str], Optional[str], str]:
+    """Split a user's message into (order number, email, phone digits)"""
+    text = text.casefold()
+    email_match = _EMAIL_RE.search(text)
+    email = email_match.group(0) if email_match else None
+    if email_match:
+        text = text.replace(email_match.group(0), " ")
+    phone_match = _PHONE_RE.search(text)
+    phone = phone_digits(phone_match.group(0)) if phone_match else ""
+    if phone_match:
+        text = text.replace(phone_match.group(0), " ")
+    number_match = _ORDER_NUMBER_RE.search(text)
+    return (number_match.group(1) if number_match else None), email, phone
+
+def order_keys(number: str) -> List[str]:
+    """Index keys for an order name or number: as given (without "#") and its digits alone"""
+    key = number.casefold().lstrip('#').strip()
+    digits = re.sub(r"\D", "", key)
+    return [key, digits] if digits and digits != key else [key]
+
+def slim_order(order: Dict) -> Dict:
+    """Keep only the order fields the bot needs for status replies and verification"""
+    customer = order.get('customer') or {}
+    phones = [
+        order.get('phone'),
+        customer.get('phone'),
+        (order.get('shipping_address') or {}).get('phone'),
+        (order.get('billing_address') or {}).get('phone'),
+    ]
+    return {
+        'id': order['id'],
+        'name': order.get('name', ''),
+        'order_number': order.get('order_number'),
+        'created_at': order.get('created_at'),
+        'updated_at': order.get('updated_at'),
+        'cancelled_at': order.get('cancelled_at'),
+        'financial_status': order.get('financial_status'),
+        'fulfillment_status': order.get('fulfillment_status'),
+        'fulfillments': [slim_fulfillment(fulfillment) for fulfillment in order.get('fulfillments') or []],
+        'email': (order.get('email') or customer.get('email') or '').casefold(),
+        'phones': sorted({phone_digits(phone) for phone in phones if phone_digits(phone)}),
+    }
+
+def slim_fulfillment(fulfillment: Dict) -> Dict:
+    """Keep the shipment fields of a fulfillment"""
+    return {
+        'id': fulfillment.get('id'),
+        'status': fulfillment.get('status'),
+        'shipment_status': fulfillment.get('shipment_status'),
+        'tracking_company': fulfillment.get('tracking_company'),
+        'tracking_number': fulfillment.get('tracking_number'),
+        'tracking_url': fulfillment.get('tracking_url'),
+    }
+
+def order_matches_contact(order: Dict, email: Optional[str], phone: str) -> bool:
+    """Whether the email or phone number given by the user belongs to the order"""
+    if email and order['email'] and email == order['email']:
+        return True
+    return bool(phone) and phone in order['phones']
+
+# =============================================================================
+# ORDER INDEX
+# =============================================================================
+
+class OrderIndex:
+    """Recent orders by id, name and number, bounded to the most recently updated"""
+
+    def __init__(self, max_orders: int = DEFAULT_MAX_ORDERS):
+        self.max_orders = max_orders
+        self.orders: "OrderedDict[int, Dict]" = OrderedDict()
+        self.by_number: Dict[str, int] = {}
+        self.synced_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def rebuild(self, orders: Iterable[Dict]) -> None:
+        """Replace the index contents with the given orders"""
+        self.orders.clear()
+        self.by_number.clear()
+        for order in sorted(orders, key=lambda order: order.get('updated_at') or ''):
+            self.upsert(order)
+        self.synced_at = time.time()
+
+    def upsert(self, order: Dict) -> Dict:
+        """Add or replace an order unless the indexed copy is newer; returns the indexed copy"""
+        existing = self.orders.get(order['id'])
+        if existing and (existing.get('updated_at') or '') > (order.get('updated_at') or ''):
+            return existing  # Webhooks may arrive out of order
+        slim = slim_order(order)
+        self.remove(order['id'])
+        self.orders[slim['id']] = slim
+        for number in (slim['name'], str(slim['order_number'] or '')):
+            for key in order_keys(number) if number else []:
+                self.by_number[key] = slim['id']
+        while len(self.orders) > self.max_orders:
+            self.remove(next(iter(self.orders)))
+        return slim
+
+    def remove(self, order_id: int) -> None:
+        """Drop an order if indexed"""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return
+        for number in (order['name'], str(order['order_number'] or '')):
+            for key in order_keys(number) if number else []:
+                if self.by_number.get(key) == order_id:
+                    del self.by_number[key]
+
+    def update_fulfillment(self, fulfillment: Dict) -> bool:
+        """Apply a fulfillments/* webhook to its order; False if the order is not indexed"""
+        order = self.orders.get(fulfillment.get('order_id'))
+        if order is None:
+            return False
+        slim = slim_fulfillment(fulfillment)
+        others = [item for item in order['fulfillments'] if item['id'] != slim['id']]
+        order['fulfillments'] = others + [slim]
+        return True
+
+    def find(self, number: str) -> Optional[Dict]:
+        """Look up an order by name ("#1001", "MKC1001") or number ("1001")"""
+        for key in order_keys(number):
+            order_id = self.by_number.get(key)
+            if order_id is not None:
+                return self.orders[order_id]
+        return None
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Product Photo Cards
+Sends product images as Telegram media groups, uploading each image once and reusing its file_id
+"""
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from telegram import InputMediaPhoto
+from telegram.error import BadRequest
+
+from message_builder import message_length, truncate_item
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_MAX_ENTRIES = 5000  # file_ids remembered (least recently used dropped)
+DEFAULT_IMAGE_WIDTH = 1024  # Width requested from Shopify's CDN (Telegram shrinks photos past 1280px anyway)
+DOWNLOAD_TIMEOUT = 15.0  # Seconds per image download
+MEDIA_GROUP_LIMIT = 10  # Telegram's maximum photos per media group
+MAX_CAPTION_LENGTH = 1024  # Telegram's limit on a photo caption, in UTF-16 code units
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def image_key(image: Optional[Dict]) -> Optional[str]:
+    """Cache key of a Shopify product image: its id and updated_at (a replaced image gets a new key)"""
+    if not image or not image.get('src'):
+        return None
+    return f"{image.get('id') or image['src']}:{image.get('updated_at') or ''}"
+
+# =============================================================================
+# PHOTO CARDS
+# =============================================================================
+
+class PhotoCards:
+    """Product photo cards with a cache of Telegram file_ids by Shopify image.
+
+    An image is downloaded only when its key has no file_id yet; the
+    file_id Telegram returns for the upload is reused for every later
+    view, so repeat views send no image bytes at all. Concurrent views of
+    the same new image share one download.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, image_width: Optional[int] = DEFAULT_IMAGE_WIDTH):
+        self.max_entries = max_entries
+        self.image_width = image_width
+        self.file_ids: "OrderedDict[str, str]" = OrderedDict()
+        self._session: Optional[httpx.AsyncClient] = None
+        self._downloads: Dict[str, asyncio.Task] = {}
+        self.counters = {
+            'cards_sent': 0,
+            'file_id_hits': 0,
+            'downloads': 0,
+            'download_bytes': 0,
+            'download_errors': 0,
+            'stale_file_ids': 0,
+        }
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Return the HTTP session for image downloads, creating it on first use"""
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the download session (called from Application.post_shutdown)"""
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+
+    def remember(self, key: str, file_id: str) -> None:
+        """Store a file_id, dropping the least recently used past max_entries"""
+        self.file_ids[key] = file_id
+        self.file_ids.move_to_end(key)
+        while len(self.file_ids) > self.max_entries:
+            self.file_ids.popitem(last=False)
+
+    def _cached(self, key: str) -> Optional[str]:
+        """Return a remembered file_id, marking it recently used"""
+        file_id = self.file_ids.get(key)
+        if file_id is not None:
+            self.file_ids.move_to_end(key)
+        return file_id
+
+    async def _download(self, key: str, url: str) -> Optional[bytes]:
+        """Download an image, sharing one request between concurrent callers"""
+        task = self._downloads.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url))
+            self._downloads[key] = task
+            task.add_done_callback(lambda done: self._downloads.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str) -> Optional[bytes]:
+        """GET an image from Shopify's CDN at the configured width"""
+        params = {'width': self.image_width} if self.image_width else None
+        try:
+            response = await self.session.get(url, params=params)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.counters['download_errors'] += 1
+            logger.warning(f"Could not download product image {url}: {e}")
+            return None
+        self.counters['downloads'] += 1
+        self.counters['download_bytes'] += len(response.content)
+        return response.content
+
+    async def _media(self, key: str, url: str, caption: str, use_cache: bool) -> Tuple[Optional[InputMediaPhoto], bool]:
+        """Build one photo for a media group; returns (media, whether a cached file_id was used)"""
+        if message_length(caption) > MAX_CAPTION_LENGTH:
+            caption = truncate_item(caption, MAX_CAPTION_LENGTH)  # Cut at a line end so Markdown entities stay whole
+        file_id = self._cached(key) if use_cache else None
+        if file_id is not None:
+            self.counters['file_id_hits'] += 1
+            return InputMediaPhoto(file_id, caption=caption, parse_mode='Markdown'), True
+        content = await self._download(key, url)
+        if content is None:
+            return None, False
+        filename = os.path.basename(urlsplit(url).path) or "product.jpg"
+        return InputMediaPhoto(content, caption=caption, parse_mode='Markdown', filename=filename), False
+
+    async def send(self, bot, chat_id: Any, products: Sequence[Dict], captions: Sequence[str]) -> int:
+        """Send products with images as media groups of up to 10; returns the number of cards sent"""
+        cards = [
+            (image_key(product.get('image')), product['image']['src'], caption)
+            for product, caption in zip(products, captions)
+            if image_key(product.get('image'))
+        ]
+        sent = 0
+        for start in range(0, len(cards), MEDIA_GROUP_LIMIT):
+            sent += await self._send_group(bot, chat_id, cards[start:start + MEDIA_GROUP_LIMIT])
+        self.counters['cards_sent'] += sent
+        return sent
+
+    async def _send_group(self, bot, chat_id: Any, cards: List[Tuple[str, str, str]], use_cache: bool = True) -> int:
+        """Send one media group, uploading new images and remembering their file_ids"""
+        built = await asyncio.gather(*(self._media(key, url, caption, use_cache) for key, url, caption in cards))
+        group = [(card[0], media) for card, (media, _) in zip(cards, built) if media is not None]
+        if not group:
+            return 0
+        try:
+            if len(group) == 1:
+                # Media groups need at least two items
+                media = group[0][1]
+                messages = [await bot.send_photo(
+                    chat_id, media.media, caption=media.caption, parse_mode=media.parse_mode
+                )]
+            else:
+                messages = await bot.send_media_group(chat_id, [media for _, media in group])
+        except BadRequest as e:
+            if not use_cache or not any(used_cache for _, used_cache in built):
+                raise
+            # A cached file_id Telegram no longer accepts: forget them and upload again
+            logger.warning(f"Cached photo file_ids rejected, re-uploading: {e}")
+            for key, _, _ in cards:
+                if self.file_ids.pop(key, None) is not None:
+                    self.counters['stale_file_ids'] += 1
+            return await self._send_group(bot, chat_id, cards, use_cache=False)
+        for (key, _), message in zip(group, messages):
+            if message.photo:
+                self.remember(key, message.photo[-1].file_id)
+        return len(group)
+
+    def export(self) -> Dict[str, str]:
+        """Return the file_ids for persisting (e.g. in bot_data)"""
+        return dict(self.file_ids)
+
+    def load(self, file_ids: Optional[Dict[str, str]]) -> None:
+        """Restore file_ids saved by export()"""
+        if not isinstance(file_ids, dict):
+            return
+        for key, file_id in file_ids.items():
+            self.remember(key, file_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and download counters"""
+        stats: Dict[str, Any] = dict(self.counters)
+        stats['file_ids'] = len(self.file_ids)
+        return stats
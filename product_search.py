@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Product Search
+In-memory inverted index over the product catalog for /search and inline queries
+"""
+
+import heapq
+import math
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from collection_index import tokenize
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Score weight of a query word matching each product field
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'product_type': 2.0,
+    'tags': 2.0,
+    'options': 1.0,
+}
+PREFIX_MATCH_FACTOR = 0.5  # Score factor for a prefix (not whole word) match of the last query word
+MAX_PREFIX_EXPANSIONS = 50  # Index words a query prefix may expand to
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def slim_product(product: Dict) -> Dict:
+    """Keep only the product fields the bot displays or searches"""
+    variants = product.get('variants') or [{}]
+    image = product.get('image') or {}
+    return {
+        'id': product['id'],
+        'title': product.get('title', ''),
+        'handle': product.get('handle', ''),
+        'product_type': product.get('product_type', ''),
+        'tags': product.get('tags', ''),
+        'variants': [{'price': variants[0].get('price', '0.00')}],
+        'image': {'id': image.get('id'), 'src': image['src'], 'updated_at': image.get('updated_at')} if image.get('src') else None,
+        'options': [{'values': option.get('values', [])} for option in product.get('options', [])],
+        'updated_at': product.get('updated_at'),
+    }
+
+def product_fields(product: Dict) -> Dict[str, str]:
+    """Return the searchable text of a product by field"""
+    tags = product.get('tags', '')
+    if isinstance(tags, list):
+        tags = " ".join(tags)
+    options = " ".join(
+        " ".join(str(value) for value in option.get('values', []))
+        for option in product.get('options', [])
+    )
+    return {
+        'title': product.get('title', ''),
+        'product_type': product.get('product_type', ''),
+        'tags': tags.replace(',', ' '),
+        'options': options,
+    }
+
+# =============================================================================
+# PRODUCT SEARCH INDEX
+# =============================================================================
+
+class ProductSearchIndex:
+    """Weighted inverted index over product titles, tags, types and variant options"""
+
+    def __init__(self):
+        self.products: Dict[int, Dict] = {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self._terms: Dict[int, List[str]] = {}  # Product id -> words it is posted under
+        self._vocabulary: List[str] = []  # Sorted words, rebuilt lazily for prefix lookups
+        self._vocabulary_dirty = False
+        self.synced_at: Optional[float] = None
+        self.rebuilt_at: Optional[float] = None  # Last full listing; deltas never drop deleted products
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @classmethod
+    def build(cls, products: Iterable[Dict]) -> "ProductSearchIndex":
+        """Return a new index of the given products (touches nothing shared, so it may run in a worker thread)"""
+        index = cls()
+        for product in products:
+            index._add(product)
+        index._vocabulary_dirty = True
+        return index
+
+    def rebuild(self, products: Iterable[Dict]) -> None:
+        """Replace the index contents with the given products"""
+        self.replace(ProductSearchIndex.build(products))
+        self.synced_at = time.time()
+
+    def replace(self, other: "ProductSearchIndex") -> None:
+        """Take over another index's contents.
+
+        Call on the thread that searches (the event loop): search() never
+        awaits, so it sees either the old contents or the new, never a mix.
+        """
+        self.products, self.postings, self._terms = other.products, other.postings, other._terms
+        self._vocabulary_dirty = True
+
+    def upsert(self, product: Dict) -> None:
+        """Add or replace one product"""
+        self.remove(product['id'])
+        self._add(product)
+        self._vocabulary_dirty = True
+
+    def remove(self, product_id: int) -> None:
+        """Drop one product if indexed"""
+        self.products.pop(product_id, None)
+        for term in self._terms.pop(product_id, []):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(product_id, None)
+            if not posting:
+                del self.postings[term]
+                self._vocabulary_dirty = True
+
+    def _add(self, product: Dict) -> None:
+        """Index a product that is not in the index yet"""
+        product_id = product['id']
+        weights: Dict[str, float] = {}
+        for field, text in product_fields(product).items():
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0.0), FIELD_WEIGHTS[field])
+        for term, weight in weights.items():
+            self.postings.setdefault(term, {})[product_id] = weight
+        self._terms[product_id] = list(weights)
+        self.products[product_id] = slim_product(product)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Index words starting with prefix (bounded)"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, prefix)
+        words = []
+        for word in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        return words
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Return products matching every query word, best first.
+
+        The last word also matches as a prefix so as-you-type inline queries work.
+        """
+        words = tokenize(query)
+        if not words or not self.products:
+            return []
+
+        # Each query word matches a list of (index word, score factor, idf)
+        total = len(self.products)
+        word_matches = []
+        for position, word in enumerate(words):
+            terms = [(word, 1.0)] if word in self.postings else []
+            if position == len(words) - 1:
+                terms += [(term, PREFIX_MATCH_FACTOR) for term in self._expand_prefix(word) if term != word]
+            if not terms:
+                return []
+            word_matches.append([(term, factor, math.log(1 + total / len(self.postings[term]))) for term, factor in terms])
+
+        # Score the rarest query word over its full postings, then only look up survivors for the rest
+        word_matches.sort(key=lambda matches: sum(len(self.postings[term]) for term, _, _ in matches))
+        scores: Dict[int, float] = {}
+        for term, factor, idf in word_matches[0]:
+            for product_id, weight in self.postings[term].items():
+                score = weight * idf * factor
+                if score > scores.get(product_id, 0.0):
+                    scores[product_id] = score
+        for matches in word_matches[1:]:
+            postings = [(self.postings[term], factor * idf) for term, factor, idf in matches]
+            next_scores: Dict[int, float] = {}
+            for product_id, score in scores.items():
+                best = max((posting.get(product_id, 0.0) * scale for posting, scale in postings), default=0.0)
+                if best > 0.0:
+                    next_scores[product_id] = score + best
+            scores = next_scores
+            if not scores:
+                return []
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.products[product_id] for product_id, _ in ranked]
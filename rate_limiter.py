@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Rate Limiter
+Per-user, per-action GCRA rate limits with bounded, self-expiring storage
+"""
+
+import time
+from itertools import islice
+from typing import Dict, Optional, Tuple
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_MAX_USERS = 100_000  # Users tracked per action before the oldest entries are dropped
+EVICT_TO = 0.9  # Fraction of max_users kept after a full store is shrunk (amortizes the sweep)
+
+# =============================================================================
+# RATE LIMIT
+# =============================================================================
+
+class RateLimit:
+    """GCRA limit of `limit` hits per `period` seconds for each user.
+
+    Each user costs one float: the theoretical arrival time (TAT) of their next
+    hit. A TAT in the past means the user has their full burst again, so such
+    entries carry no information and are dropped by sweep().
+    """
+
+    def __init__(self, limit: int, period: float, max_users: int = DEFAULT_MAX_USERS):
+        self.limit = limit
+        self.period = period
+        self.interval = period / limit  # Seconds one hit takes to drain
+        self.max_users = max_users
+        self._tats: Dict[int, float] = {}  # user_id -> TAT (wall clock, so it survives restarts)
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def _next_tat(self, user_id: int, now: float) -> Tuple[float, float]:
+        """Return (TAT after one more hit, seconds until that hit would be allowed)"""
+        tat = max(self._tats.get(user_id, now), now) + self.interval
+        return tat, max(0.0, tat - self.period - now)
+
+    def retry_after(self, user_id: int, now: Optional[float] = None) -> float:
+        """Seconds until the user may hit again (0 if allowed now), without counting a hit"""
+        now = time.time() if now is None else now
+        return self._next_tat(user_id, now)[1]
+
+    def hit(self, user_id: int, now: Optional[float] = None) -> bool:
+        """Count a hit if the user is within the limit; return whether it was allowed"""
+        now = time.time() if now is None else now
+        tat, wait = self._next_tat(user_id, now)
+        if wait > 0:
+            return False
+        # Re-insert so dict order tracks recent activity and eviction drops idle users first
+        self._tats.pop(user_id, None)
+        self._tats[user_id] = tat
+        if len(self._tats) > self.max_users:
+            self._shrink(now)
+        return True
+
+    def _shrink(self, now: float) -> None:
+        """Expire recovered users, then drop the least recently active down to EVICT_TO of the bound"""
+        self.sweep(now)
+        excess = len(self._tats) - int(self.max_users * EVICT_TO)
+        if excess > 0:
+            # Dropping a user only forgets their recent hits, so the limit errs on the lenient side
+            for user_id in list(islice(self._tats, excess)):
+                del self._tats[user_id]
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop users whose limit has fully recovered; return how many were dropped"""
+        now = time.time() if now is None else now
+        expired = [user_id for user_id, tat in self._tats.items() if tat <= now]
+        for user_id in expired:
+            del self._tats[user_id]
+        return len(expired)
+
+    def export(self) -> Dict[int, float]:
+        """Return the live entries (for persisting across restarts)"""
+        now = time.time()
+        return {user_id: tat for user_id, tat in self._tats.items() if tat > now}
+
+    def load(self, tats: Dict[int, float]) -> None:
+        """Restore entries saved by export()"""
+        now = time.time()
+        self._tats.update((int(user_id), float(tat)) for user_id, tat in tats.items() if tat > now)
+
+# =============================================================================
+# RATE LIMITER
+# =============================================================================
+
+class RateLimiter:
+    """Named per-action limits, e.g. {"question": RateLimit(5, 3600)}"""
+
+    def __init__(self, limits: Dict[str, RateLimit]):
+        self.limits = limits
+
+    def hit(self, action: str, user_id: int) -> bool:
+        """Count a hit of an action; return whether the user was within its limit"""
+        return self.limits[action].hit(user_id)
+
+    def retry_after(self, action: str, user_id: int) -> float:
+        """Seconds until the user may perform the action again (0 if allowed now)"""
+        return self.limits[action].retry_after(user_id)
+
+    def sweep(self) -> int:
+        """Expire recovered entries of every action"""
+        return sum(limit.sweep() for limit in self.limits.values())
+
+    def export(self) -> Dict[str, Dict[int, float]]:
+        """Return the live entries of every action"""
+        return {action: limit.export() for action, limit in self.limits.items()}
+
+    def load(self, data: Optional[Dict]) -> None:
+        """Restore entries saved by export(), ignoring unknown actions or formats"""
+        if not isinstance(data, dict):
+            return
+        for action, tats in data.items():
+            if action in self.limits and isinstance(tats, dict):
+                self.limits[action].load(tats)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of tracked users per action"""
+        return {action: len(limit) for action, limit in self.limits.items()}
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Render Layer
+Registry of prebuilt keyboards and static screens shared by every update
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+# =============================================================================
+# KEYBOARDS
+# =============================================================================
+
+# A button is (label, callback_data) or (label, None, url)
+ButtonSpec = Tuple
+KeyboardSpec = Sequence[Sequence[ButtonSpec]]
+
+def build_keyboard(rows: KeyboardSpec) -> InlineKeyboardMarkup:
+    """Build an inline keyboard from rows of button specs"""
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(button[0], url=button[2]) if len(button) > 2
+            else InlineKeyboardButton(button[0], callback_data=button[1])
+            for button in row
+        ]
+        for row in rows
+    ])
+
+# =============================================================================
+# SCREENS
+# =============================================================================
+
+class Screen:
+    """A static message body with its keyboard and send options, built once"""
+
+    __slots__ = ('text', 'reply_markup', 'options')
+
+    def __init__(self, text: str, reply_markup: Optional[InlineKeyboardMarkup], parse_mode: Optional[str], disable_web_page_preview: bool):
+        self.text = text
+        self.reply_markup = reply_markup
+        self.options = {'parse_mode': parse_mode}
+        if disable_web_page_preview:
+            self.options['disable_web_page_preview'] = True
+
+    async def edit(self, query) -> None:
+        """Show the screen in place of a callback query's message"""
+        await query.edit_message_text(self.text, reply_markup=self.reply_markup, **self.options)
+
+    async def reply(self, message) -> None:
+        """Send the screen in reply to a message"""
+        await message.reply_text(self.text, reply_markup=self.reply_markup, **self.options)
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class Renderer:
+    """Named keyboards and screens, declared once at import and shared read-only.
+
+    InlineKeyboardMarkup objects are immutable in python-telegram-bot 20, so
+    the same instance can be sent with any number of concurrent updates.
+    """
+
+    def __init__(self):
+        self.keyboards: Dict[str, InlineKeyboardMarkup] = {}
+        self.screens: Dict[str, Screen] = {}
+
+    def add_keyboard(self, name: str, rows: KeyboardSpec) -> InlineKeyboardMarkup:
+        """Declare a keyboard"""
+        if name in self.keyboards:
+            raise ValueError(f"Keyboard {name!r} is already declared")
+        self.keyboards[name] = build_keyboard(rows)
+        return self.keyboards[name]
+
+    def add_screen(
+        self,
+        name: str,
+        text: str,
+        keyboard: Optional[str] = None,
+        parse_mode: Optional[str] = 'Markdown',
+        disable_web_page_preview: bool = False,
+    ) -> Screen:
+        """Declare a screen, optionally with a declared keyboard"""
+        if name in self.screens:
+            raise ValueError(f"Screen {name!r} is already declared")
+        reply_markup = self.keyboards[keyboard] if keyboard else None
+        self.screens[name] = Screen(text, reply_markup, parse_mode, disable_web_page_preview)
+        return self.screens[name]
+
+    def keyboard(self, name: str) -> InlineKeyboardMarkup:
+        """Return a declared keyboard"""
+        return self.keyboards[name]
+
+    def screen(self, name: str) -> Screen:
+        """Return a declared screen"""
+        return self.screens[name]
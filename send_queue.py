@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Send Queue
+Background outbound message queue with per-chat/global rate limits, retries and digests
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+from message_builder import MAX_MESSAGE_LENGTH, message_length
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_GLOBAL_RATE = 25.0  # Messages per second across all chats (Telegram allows ~30)
+DEFAULT_CHAT_INTERVAL = 1.0  # Seconds between messages to one chat (Telegram allows ~1/s, 20/min in groups)
+DEFAULT_MAX_QUEUED = 1000  # Messages waiting before enqueue() refuses new ones
+MAX_SEND_ATTEMPTS = 5  # Attempts per message on network errors
+RETRY_BACKOFF = 2.0  # Seconds before the first network retry, doubled per attempt
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+# =============================================================================
+# SEND QUEUE
+# =============================================================================
+
+class OutboundMessage:
+    """A queued text message"""
+
+    __slots__ = ('chat_id', 'text', 'kwargs', 'digest', 'enqueued_at', 'attempts')
+
+    def __init__(self, chat_id: Any, text: str, kwargs: Dict[str, Any], digest: bool):
+        self.chat_id = chat_id
+        self.text = text
+        self.kwargs = kwargs
+        self.digest = digest
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+class SendQueue:
+    """Sends messages in the background so handlers never wait on (or trip) Telegram's flood limits.
+
+    Messages to one chat go out in order, at most one per chat_interval, and
+    at most global_rate per second overall. RetryAfter pauses the queue for
+    the time Telegram asks. With a digest_window, messages enqueued with
+    digest=True are held that long and merged with any others waiting for
+    the same chat into one message.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = DEFAULT_GLOBAL_RATE,
+        chat_interval: float = DEFAULT_CHAT_INTERVAL,
+        digest_window: float = 0.0,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+    ):
+        self.global_interval = 1.0 / global_rate
+        self.chat_interval = chat_interval
+        self.digest_window = digest_window
+        self.max_queued = max_queued
+        self.bot = None
+        self._queues: Dict[Any, Deque[OutboundMessage]] = {}
+        self._chat_ready_at: Dict[Any, float] = {}  # chat_id -> earliest next send
+        self._global_ready_at = 0.0
+        self._queued = 0
+        self._sending = False  # A taken batch is waiting on send_message (no longer counted in _queued)
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self.counters = {'enqueued': 0, 'sent': 0, 'digested': 0, 'retries': 0, 'retry_after': 0, 'dropped': 0}
+
+    def __len__(self) -> int:
+        return self._queued
+
+    def enqueue(self, chat_id: Any, text: str, digest: bool = False, **kwargs: Any) -> bool:
+        """Queue a send_message call; returns False if the queue is full"""
+        if self._queued >= self.max_queued:
+            self.counters['dropped'] += 1
+            logger.error(f"Send queue full, dropping message to {chat_id}")
+            return False
+        self._queues.setdefault(chat_id, deque()).append(OutboundMessage(chat_id, text, kwargs, digest))
+        self._queued += 1
+        self.counters['enqueued'] += 1
+        self._wakeup.set()
+        return True
+
+    async def start(self, bot) -> None:
+        """Start the background sender for a bot"""
+        self.bot = bot
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Give queued messages up to timeout seconds to go out, then stop the sender"""
+        if self._worker is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._queued or self._sending) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self._queued:
+            logger.warning(f"Send queue stopped with {self._queued} unsent messages")
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    def _ready_at(self, chat_id: Any) -> float:
+        """When the head of a chat's queue may be sent"""
+        head = self._queues[chat_id][0]
+        ready_at = max(self._chat_ready_at.get(chat_id, 0.0), self._global_ready_at)
+        if head.digest and self.digest_window:
+            ready_at = max(ready_at, head.enqueued_at + self.digest_window)
+        return ready_at
+
+    async def _run(self) -> None:
+        """Send queued messages as the rate limits allow"""
+        while True:
+            if not self._queued:
+                now = time.monotonic()
+                self._chat_ready_at = {chat_id: at for chat_id, at in self._chat_ready_at.items() if at > now}
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            chat_id = min(self._queues, key=self._ready_at)
+            delay = self._ready_at(chat_id) - time.monotonic()
+            if delay > 0:
+                # Sleep until then, unless a message for another chat arrives first
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._send_next(chat_id)
+
+    def _take_batch(self, chat_id: Any) -> List[OutboundMessage]:
+        """Pop the head of a chat's queue, merged with following digest messages that fit"""
+        queue = self._queues[chat_id]
+        batch = [queue.popleft()]
+        if batch[0].digest and self.digest_window:
+            length = message_length(batch[0].text)
+            while queue and queue[0].digest and queue[0].kwargs == batch[0].kwargs:
+                length += message_length(DIGEST_SEPARATOR) + message_length(queue[0].text)
+                if length > MAX_MESSAGE_LENGTH:
+                    break
+                batch.append(queue.popleft())
+        if not queue:
+            del self._queues[chat_id]
+        self._queued -= len(batch)
+        return batch
+
+    def _requeue(self, batch: List[OutboundMessage]) -> None:
+        """Put a batch back at the front of its chat's queue"""
+        queue = self._queues.setdefault(batch[0].chat_id, deque())
+        queue.extendleft(reversed(batch))
+        self._queued += len(batch)
+
+    async def _send_next(self, chat_id: Any) -> None:
+        """Send one message (or digest) to a chat, handling Telegram errors"""
+        batch = self._take_batch(chat_id)
+        head = batch[0]
+        text = DIGEST_SEPARATOR.join(message.text for message in batch)
+        now = time.monotonic()
+        self._chat_ready_at[chat_id] = now + self.chat_interval
+        self._global_ready_at = now + self.global_interval
+        head.attempts += 1
+        self._sending = True
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text, **head.kwargs)
+        except RetryAfter as e:
+            retry_after = float(e.retry_after)
+            logger.warning(f"Telegram flood limit sending to {chat_id}, pausing {retry_after:.0f}s")
+            self.counters['retry_after'] += 1
+            self._global_ready_at = time.monotonic() + retry_after
+            head.attempts -= 1  # Flood waits do not use up attempts
+            self._requeue(batch)
+            return
+        except BadRequest as e:
+            if head.kwargs.get('parse_mode'):
+                # Usually unbalanced Markdown in user-provided text; deliver it as plain text instead
+                logger.warning(f"Resending message to {chat_id} without formatting: {e}")
+                for message in batch:
+                    message.kwargs = {key: value for key, value in message.kwargs.items() if key != 'parse_mode'}
+                self._requeue(batch)
+                return
+            self._drop(batch, e)
+            return
+        except Forbidden as e:
+            self._drop(batch, e)
+            return
+        except NetworkError as e:
+            if head.attempts >= MAX_SEND_ATTEMPTS:
+                self._drop(batch, e)
+                return
+            self.counters['retries'] += 1
+            self._chat_ready_at[chat_id] = time.monotonic() + RETRY_BACKOFF * 2 ** (head.attempts - 1)
+            self._requeue(batch)
+            return
+        except Exception as e:
+            self._drop(batch, e)
+            return
+        finally:
+            self._sending = False
+        self.counters['sent'] += 1
+        self.counters['digested'] += len(batch) - 1
+
+    def _drop(self, batch: List[OutboundMessage], error: Exception) -> None:
+        """Give up on a batch"""
+        self.counters['dropped'] += len(batch)
+        logger.error(f"Error sending message to {batch[0].chat_id}, dropped {len(batch)}: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return send counters and the queue depth"""
+        stats: Dict[str, Any] = dict(self.counters)
+        stats['queued'] = self._queued
+        stats['chats'] = len(self._queues)
+        return stats
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Async Shopify Client
+Non-blocking access to the Shopify Admin API for the Telegram bot
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_API_VERSION = "2023-04"
+DEFAULT_TIMEOUT = 10.0  # Seconds per Shopify request
+MAX_CONNECTIONS = 20  # Upper bound on concurrent Shopify connections
+MAX_KEEPALIVE_CONNECTIONS = 10  # Idle connections kept open for reuse
+BUCKET_CAPACITY = 40  # Shopify REST leaky bucket size (standard plans)
+BUCKET_LEAK_RATE = 2.0  # Requests per second the bucket drains
+BUCKET_RESERVE = 4  # Bucket slots left free for other apps sharing the store's limit
+MAX_429_RETRIES = 3  # Retries of a request Shopify answered with 429
+DEFAULT_RETRY_AFTER = 2.0  # Seconds to wait on a 429 without a Retry-After header
+MAX_PAGE_SIZE = 250  # Largest page Shopify returns for list endpoints
+
+# =============================================================================
+# RATE LIMITER
+# =============================================================================
+
+class ShopifyRateLimiter:
+    """Client-side mirror of Shopify's leaky bucket that queues requests near the limit"""
+
+    def __init__(self, capacity: int = BUCKET_CAPACITY, leak_rate: float = BUCKET_LEAK_RATE, reserve: int = BUCKET_RESERVE):
+        self.capacity = capacity
+        self.leak_rate = leak_rate
+        self.reserve = reserve
+        self.used = 0.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+        self.counters = {
+            'requests': 0,
+            'throttled': 0,
+            'throttle_wait_seconds': 0.0,
+            'max_queue_depth': 0,
+            'retries_429': 0,
+        }
+
+    def _leak(self, now: float) -> None:
+        """Drain the bucket for the time elapsed since the last update"""
+        self.used = max(0.0, self.used - (now - self.updated) * self.leak_rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait (FIFO) until a request fits in the bucket, then take a slot"""
+        self.waiting += 1
+        self.counters['max_queue_depth'] = max(self.counters['max_queue_depth'], self.waiting)
+        throttled_since: Optional[float] = None  # Time spent queued behind the lock is not throttling
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._leak(now)
+                    if now < self.blocked_until:
+                        delay = self.blocked_until - now
+                    else:
+                        delay = (self.used + 1 - (self.capacity - self.reserve)) / self.leak_rate
+                        if delay <= 0:
+                            self.used += 1
+                            break
+                    if throttled_since is None:
+                        throttled_since = now
+                    await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+        self.counters['requests'] += 1
+        if throttled_since is not None:
+            self.counters['throttled'] += 1
+            self.counters['throttle_wait_seconds'] += time.monotonic() - throttled_since
+
+    def observe(self, call_limit: Optional[str]) -> None:
+        """Sync the bucket with an X-Shopify-Shop-Api-Call-Limit header ("used/capacity")"""
+        if not call_limit:
+            return
+        try:
+            used, capacity = (int(part) for part in call_limit.split('/'))
+        except ValueError:
+            return
+        self._leak(time.monotonic())
+        self.capacity = capacity
+        # Requests started since Shopify counted this one are not in the header yet
+        self.used = max(self.used, float(used))
+
+    def pause(self, seconds: float) -> None:
+        """Hold all requests for the given time (after a 429)"""
+        self.counters['retries_429'] += 1
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, throttling and retry counters"""
+        self._leak(time.monotonic())
+        stats: Dict[str, Any] = dict(self.counters)
+        stats['queue_depth'] = self.waiting
+        stats['bucket_used'] = round(self.used, 2)
+        stats['bucket_capacity'] = self.capacity
+        return stats
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Seconds to wait from a Retry-After header"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+def parse_page_cursors(response: httpx.Response) -> Dict[str, str]:
+    """Extract page_info cursors from a response's Link header, keyed by rel"""
+    cursors = {}
+    for rel, link in response.links.items():
+        page_info = parse_qs(urlsplit(link.get('url', '')).query).get('page_info')
+        if page_info:
+            cursors[rel] = page_info[0]
+    return cursors
+
+# =============================================================================
+# SHOPIFY CLIENT
+# =============================================================================
+
+class ShopifyClient:
+    """Async Shopify Admin API client sharing one pooled keep-alive session"""
+
+    def __init__(
+        self,
+        store_domain: str,
+        access_token: str,
+        api_version: str = DEFAULT_API_VERSION,
+        timeout: float = DEFAULT_TIMEOUT,
+        base_url: Optional[str] = None,
+        on_request: Optional[Callable[[str, str, float], None]] = None,
+    ):
+        self.store_domain = store_domain
+        self.access_token = access_token
+        self.api_version = api_version
+        self.timeout = timeout
+        self.base_url = base_url or f"https://{store_domain}.myshopify.com/admin/api/{api_version}/"
+        self._session: Optional[httpx.AsyncClient] = None
+        self.limiter = ShopifyRateLimiter()
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        self.counters = {'calls': 0, 'coalesced': 0}
+        self.on_request = on_request  # Called with (endpoint, status code or "error", seconds) per HTTP request
+
+    def get_headers(self) -> Dict[str, str]:
+        """Get headers for Shopify API requests"""
+        return {
+            'X-Shopify-Access-Token': self.access_token,
+            'Content-Type': 'application/json'
+        }
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Return the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.get_headers(),
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        return self._session
+
+    async def start(self) -> None:
+        """Open the shared HTTP session (called from Application.post_init)"""
+        _ = self.session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session (called from Application.post_shutdown)"""
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+
+    async def get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+        """GET an Admin API endpoint and return the decoded JSON body"""
+        data, _ = await self.get(endpoint, params)
+        return data
+
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict, Dict[str, str]]:
+        """GET an Admin API endpoint, returning the JSON body and pagination cursors.
+
+        The cursors map Link header rels ("next", "previous") to page_info values.
+        Identical calls already in flight share that call's result instead of
+        sending another request (single-flight). Callers must not mutate it.
+        """
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        self.counters['calls'] += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get(endpoint, params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_in_flight(key, done))
+        else:
+            self.counters['coalesced'] += 1
+        # Shield so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _finish_in_flight(self, key: Tuple, task: asyncio.Task) -> None:
+        """Forget a completed in-flight call"""
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved in case every caller gave up
+
+    async def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict, Dict[str, str]]:
+        """Send one GET through the rate limiter.
+
+        Requests wait for room in the rate limiter, and 429 responses are
+        retried after Retry-After up to MAX_429_RETRIES times.
+        """
+        for attempt in range(MAX_429_RETRIES + 1):
+            await self.limiter.acquire()
+            response = await self._request(endpoint, params)
+            self.limiter.observe(response.headers.get('X-Shopify-Shop-Api-Call-Limit'))
+            if response.status_code == 429 and attempt < MAX_429_RETRIES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                logger.warning(f"Shopify rate limit hit on {endpoint}, retrying in {retry_after:.1f}s")
+                self.limiter.pause(retry_after)
+                continue
+            response.raise_for_status()
+            return response.json(), parse_page_cursors(response)
+
+    async def _request(self, endpoint: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
+        """Send one HTTP GET, reporting its status and latency to on_request"""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.session.get(endpoint, params=params)
+            status = str(response.status_code)
+            return response
+        finally:
+            if self.on_request is not None:
+                self.on_request(endpoint, status, time.perf_counter() - started)
+
+    async def fetch_products(self, limit: int = 5, collection_id: Optional[str] = None, tag: Optional[str] = None) -> List[Dict]:
+        """Fetch active products, optionally restricted to a collection or tag"""
+        endpoint = "products.json"
+        params: Dict[str, Any] = {
+            'limit': limit,
+            'status': 'active'
+        }
+
+        if collection_id:
+            endpoint = f"collections/{collection_id}/products.json"
+        elif tag:
+            params['tag'] = tag
+
+        data = await self.get_json(endpoint, params=params)
+        return data.get('products', [])
+
+    async def fetch_products_page(
+        self,
+        limit: int = 5,
+        page_info: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Fetch one page of products using cursor pagination.
+
+        Only active products are listed unless filters override "status"
+        (a None value drops the filter). Returns a dict with "products" and
+        the "next"/"previous" page_info cursors (None at either end).
+        """
+        if page_info:
+            # Shopify rejects other filters alongside page_info; they are encoded in the cursor
+            params: Dict[str, Any] = {'limit': limit, 'page_info': page_info}
+        else:
+            params = {'limit': limit, 'status': 'active', **(filters or {})}
+            params = {key: value for key, value in params.items() if value is not None}
+
+        data, cursors = await self.get("products.json", params=params)
+        return {
+            'products': data.get('products', []),
+            'next': cursors.get('next'),
+            'previous': cursors.get('previous')
+        }
+
+    async def fetch_all_products(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Fetch every product matching filters, following all cursor pages"""
+        products: List[Dict] = []
+        page_info = None
+        while True:
+            page = await self.fetch_products_page(limit=MAX_PAGE_SIZE, page_info=page_info, filters=filters)
+            products.extend(page['products'])
+            page_info = page['next']
+            if not page_info:
+                return products
+
+    async def fetch_collections(self) -> List[Dict]:
+        """Fetch collections"""
+        data = await self.get_json("collections.json")
+        return data.get('collections', [])
+
+    async def fetch_blog_articles(self, blog_id: str = "1", limit: int = 3) -> List[Dict]:
+        """Fetch articles of a blog"""
+        data = await self.get_json(f"blogs/{blog_id}/articles.json", params={'limit': limit})
+        return data.get('articles', [])
+
+    async def fetch_orders(self, name: str, fields: Optional[str] = None) -> List[Dict]:
+        """Fetch orders (any status) whose name matches, e.g. "1001" for order #1001"""
+        params: Dict[str, Any] = {'name': name, 'status': 'any'}
+        if fields:
+            params['fields'] = fields
+        data = await self.get_json("orders.json", params=params)
+        return data.get('orders', [])
+
+    async def fetch_all_orders(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[str] = None) -> List[Dict]:
+        """Fetch every order (any status) matching filters, following all cursor pages"""
+        orders: List[Dict] = []
+        params: Dict[str, Any] = {'limit': MAX_PAGE_SIZE, 'status': 'any', **(filters or {})}
+        if fields:
+            params['fields'] = fields
+        while True:
+            data, cursors = await self.get("orders.json", params=params)
+            orders.extend(data.get('orders', []))
+            if not cursors.get('next'):
+                return orders
+            # Other filters are encoded in the cursor; Shopify only accepts limit and fields alongside it
+            params = {key: value for key, value in params.items() if key in ('limit', 'fields')}
+            params['page_info'] = cursors['next']
+
+    def stats(self) -> Dict[str, Any]:
+        """Return single-flight counters merged with the rate limiter's"""
+        stats = self.limiter.stats()
+        stats.update(self.counters)
+        stats['in_flight'] = len(self._in_flight)
+        return stats
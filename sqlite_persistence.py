@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - SQLite Persistence
+Application persistence for user_data and bot_data with batched, debounced writes
+"""
+
+import asyncio
+import logging
+import pickle
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_UPDATE_INTERVAL = 10.0  # Seconds between the Application handing changed data to the persistence
+DEFAULT_WRITE_DELAY = 0.5  # Seconds updates are buffered so one transaction covers a whole batch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_data (user_id INTEGER PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS bot_data (id INTEGER PRIMARY KEY CHECK (id = 0), data BLOB NOT NULL);
+"""
+
+# =============================================================================
+# SQLITE PERSISTENCE
+# =============================================================================
+
+class SQLitePersistence(BasePersistence):
+    """Stores user_data and bot_data in a SQLite file.
+
+    Users are loaded on their first update instead of all at startup, and the
+    Application's periodic updates are buffered and written in one transaction
+    on a dedicated thread, so handlers never wait for the disk.
+    """
+
+    def __init__(self, path: str, update_interval: float = DEFAULT_UPDATE_INTERVAL, write_delay: float = DEFAULT_WRITE_DELAY):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=True, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.path = path
+        self.write_delay = write_delay
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")  # One thread owns the connection
+        self._connection: Optional[sqlite3.Connection] = None
+        self._stored_user_ids: Set[int] = set()  # Users on disk not loaded into memory yet
+        self._pending_users: Dict[int, Optional[Dict]] = {}  # user_id -> data to write (None deletes)
+        self._pending_bot_data: Optional[Dict] = None
+        self._last_bot_data: Optional[bytes] = None
+        self._write_task: Optional[asyncio.Task] = None
+        self.counters = {'user_loads': 0, 'writes': 0, 'rows_written': 0, 'write_errors': 0}
+
+    async def _run(self, function, *args) -> Any:
+        """Run a database function on the persistence thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (persistence thread only)"""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def _read_user_ids(self) -> Set[int]:
+        return {row[0] for row in self._connect().execute("SELECT user_id FROM user_data")}
+
+    def _read_user(self, user_id: int) -> Optional[Dict]:
+        row = self._connect().execute("SELECT data FROM user_data WHERE user_id = ?", (user_id,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def _read_bot_data(self) -> Dict:
+        row = self._connect().execute("SELECT data FROM bot_data WHERE id = 0").fetchone()
+        self._last_bot_data = row[0] if row else None
+        return pickle.loads(row[0]) if row else {}
+
+    async def get_user_data(self) -> Dict[int, Dict]:
+        """Only note which users are stored; their data is loaded by refresh_user_data"""
+        self._stored_user_ids = await self._run(self._read_user_ids)
+        logger.info(f"Persistence has {len(self._stored_user_ids)} stored users in {self.path}")
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict) -> None:
+        """Load a stored user the first time one of their updates is processed"""
+        if user_id not in self._stored_user_ids:
+            return
+        self._stored_user_ids.discard(user_id)
+        try:
+            stored = await self._run(self._read_user, user_id)
+        except Exception as e:
+            logger.error(f"Error loading user data for {user_id}: {e}")
+            return
+        self.counters['user_loads'] += 1
+        if stored:
+            for key, value in stored.items():
+                user_data.setdefault(key, value)
+
+    async def get_bot_data(self) -> Dict:
+        return await self._run(self._read_bot_data)
+
+    async def refresh_bot_data(self, bot_data: Dict) -> None:
+        pass
+
+    async def get_chat_data(self) -> Dict[int, Dict]:
+        return {}
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict) -> None:
+        pass
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        return {}
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    async def update_user_data(self, user_id: int, data: Dict) -> None:
+        self._stored_user_ids.discard(user_id)
+        self._pending_users[user_id] = data
+        self._schedule_write()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._stored_user_ids.discard(user_id)
+        self._pending_users[user_id] = None
+        self._schedule_write()
+
+    async def update_bot_data(self, data: Dict) -> None:
+        self._pending_bot_data = data
+        self._schedule_write()
+
+    async def update_chat_data(self, chat_id: int, data: Dict) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def update_conversation(self, name: str, key: Any, new_state: Optional[object]) -> None:
+        pass
+
+    def _schedule_write(self) -> None:
+        """Write buffered updates shortly, unless a write is already scheduled"""
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.create_task(self._write_later())
+
+    async def _write_later(self) -> None:
+        # Updates buffered while a batch is being written go out in the next one
+        while self._pending_users or self._pending_bot_data is not None:
+            await asyncio.sleep(self.write_delay)
+            await self._write_pending()
+
+    async def _write_pending(self) -> None:
+        """Write everything buffered so far in one transaction"""
+        users, self._pending_users = self._pending_users, {}
+        bot_data, self._pending_bot_data = self._pending_bot_data, None
+        if not users and bot_data is None:
+            return
+        try:
+            await self._run(self._write, users, bot_data)
+        except Exception as e:
+            self.counters['write_errors'] += 1
+            logger.error(f"Error writing persistence: {e}")
+            # Keep failed rows for the next write unless newer data arrived meanwhile
+            for user_id, data in users.items():
+                self._pending_users.setdefault(user_id, data)
+            if self._pending_bot_data is None:
+                self._pending_bot_data = bot_data
+
+    def _write(self, users: Dict[int, Optional[Dict]], bot_data: Optional[Dict]) -> None:
+        """Serialize and commit a batch (persistence thread only)"""
+        upserts = [(user_id, pickle.dumps(data)) for user_id, data in users.items() if data is not None]
+        deletes = [(user_id,) for user_id, data in users.items() if data is None]
+        bot_blob = pickle.dumps(bot_data) if bot_data is not None else None
+        if bot_blob == self._last_bot_data:
+            bot_blob = None  # bot_data is handed over on every run; skip unchanged copies
+
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO user_data (user_id, data) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+                upserts
+            )
+            connection.executemany("DELETE FROM user_data WHERE user_id = ?", deletes)
+            if bot_blob is not None:
+                connection.execute("INSERT OR REPLACE INTO bot_data (id, data) VALUES (0, ?)", (bot_blob,))
+        if bot_blob is not None:
+            self._last_bot_data = bot_blob
+        self.counters['writes'] += 1
+        self.counters['rows_written'] += len(upserts) + len(deletes) + (bot_blob is not None)
+
+    async def flush(self) -> None:
+        """Write anything still buffered and close the database (on shutdown)"""
+        if self._write_task is not None and not self._write_task.done():
+            # A batch already handed to the thread still commits before the final one below
+            self._write_task.cancel()
+            await asyncio.gather(self._write_task, return_exceptions=True)
+        await self._write_pending()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return load/write counters and the size of the write buffer"""
+        stats = dict(self.counters)
+        stats['pending_users'] = len(self._pending_users)
+        stats['unloaded_users'] = len(self._stored_user_ids)
+        return stats
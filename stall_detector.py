@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Event Loop Stall Detector
+Watchdog thread that catches blocking calls in async handlers and reports where the loop was stuck
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from metrics import LoopLagMonitor
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_THRESHOLD = 0.5  # Seconds without a heartbeat before the loop counts as stalled
+MAX_STACK_FRAMES = 30  # Innermost frames of the blocked stack that are logged
+
+# =============================================================================
+# STALL DETECTOR
+# =============================================================================
+
+class StallDetector:
+    """Reports event loop stalls with the stack that was blocking the loop.
+
+    The heartbeat is the LoopLagMonitor's last wakeup, so the loop is
+    sampled once for both lag metrics and stall detection. A daemon
+    thread checks it every monitor interval and, once it is older than
+    the threshold, logs the loop thread's current stack and the handler
+    that was running (as labelled with track()). When the loop recovers,
+    on_stall is called on the loop with (seconds stalled, handler label)
+    for metrics.
+    """
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        threshold: float = DEFAULT_THRESHOLD,
+        on_stall: Optional[Callable[[float, str], None]] = None,
+    ):
+        self.monitor = monitor
+        self.threshold = threshold
+        self.on_stall = on_stall
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._labels: Dict[asyncio.Task, str] = {}  # Running task -> what it is handling
+        self._watcher: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.counters = {'stalls': 0, 'stalled_seconds': 0.0, 'longest_stall': 0.0}
+        self.last_stall: Optional[Dict[str, Any]] = None
+
+    @contextmanager
+    def track(self, label: str) -> Iterator[None]:
+        """Label the current task (e.g. "handle_callback_query/callback_query") while it runs"""
+        task = asyncio.current_task()
+        self._labels[task] = label
+        try:
+            yield
+        finally:
+            self._labels.pop(task, None)
+
+    async def start(self) -> None:
+        """Start the watchdog thread (and the lag monitor it reads, if it isn't running)"""
+        if self._watcher is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        await self.monitor.start()
+        self._stopping.clear()
+        self._watcher = threading.Thread(target=self._watch, name="stall-detector", daemon=True)
+        self._watcher.start()
+
+    async def stop(self) -> None:
+        """Stop the watchdog thread (before the lag monitor, or its silence looks like a stall)"""
+        if self._watcher is None:
+            return
+        self._stopping.set()
+        await asyncio.to_thread(self._watcher.join)
+        self._watcher = None
+
+    def _watch(self) -> None:
+        """Watchdog thread: report a stall once per occurrence while the heartbeat is late"""
+        interval = self.monitor.interval
+        stalled_since: Optional[float] = None
+        label = ""
+        while not self._stopping.wait(interval):
+            heartbeat = self.monitor.last_wake
+            late = time.monotonic() - heartbeat
+            if stalled_since is None and late > self.threshold + interval:
+                stalled_since = heartbeat
+                label = self._report(late - interval)
+            elif stalled_since is not None and heartbeat > stalled_since:
+                duration = heartbeat - stalled_since - interval
+                stalled_since = None
+                self._loop.call_soon_threadsafe(self._record, duration, label)
+
+    def _report(self, late: float) -> str:
+        """Log the blocked loop thread's stack and the handler it was running"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)[-MAX_STACK_FRAMES:]) if frame else "(no stack)\n"
+        task = asyncio.current_task(self._loop)
+        label = self._labels.get(task, "") if task is not None else ""
+        if not label:
+            label = task.get_name() if task is not None else "loop callback"
+        logger.warning(
+            f"Event loop blocked for {late:.2f}s in {label}; blocking stack:\n{stack.rstrip()}"
+        )
+        self.last_stall = {'at': time.time(), 'handler': label, 'stack': stack}
+        return label
+
+    def _record(self, duration: float, label: str) -> None:
+        """Count a finished stall (runs on the loop)"""
+        duration = max(duration, self.threshold)
+        self.counters['stalls'] += 1
+        self.counters['stalled_seconds'] += duration
+        self.counters['longest_stall'] = max(self.counters['longest_stall'], duration)
+        logger.warning(f"Event loop recovered after a {duration:.2f}s stall in {label}")
+        if self.on_stall is not None:
+            self.on_stall(duration, label)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return stall counters and the handler of the last stall"""
+        stats: Dict[str, Any] = dict(self.counters)
+        stats['stalled_seconds'] = round(stats['stalled_seconds'], 3)
+        stats['longest_stall'] = round(stats['longest_stall'], 3)
+        stats['last_stall_handler'] = self.last_stall['handler'] if self.last_stall else None
+        return stats
@@ -5,14 +5,50 @@ A fully functional bot for the Maa Kaali Creations Shopify store
 """
 
 import os
+import json
+import time
+import asyncio
+import hashlib
+import hmac
+import base64
 import logging
-import requests
 import re
-from typing import Dict, List, Optional
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
+import signal
+from functools import lru_cache, wraps
+from typing import Any, Dict, List, Optional
+from telegram import (
+    Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile,
+    InlineQueryResultArticle, InputTextMessageContent
+)
+from telegram.error import BadRequest
+from telegram.helpers import escape_markdown
+from telegram.ext import (
+    Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler,
+    MessageHandler, TypeHandler, filters, ContextTypes
+)
+from telegram.request import HTTPXRequest
+
+import httpx
+
+from callback_router import CallbackRouter, callback_data, non_negative_int
+from catalog_cache import CatalogCache
+from catalog_pager import CatalogPager
+from catalog_snapshot import load_snapshot, save_snapshot
+from collection_index import CollectionIndex
+from fanout import gather_with_deadline
+from message_builder import MessageBuilder, markdown_bold, markdown_link_url
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, LoopLagMonitor, Registry
+from order_index import ORDER_FIELDS, OrderIndex, order_keys, order_matches_contact, parse_order_query
+from photo_cards import PhotoCards
+from product_search import ProductSearchIndex
+from render import Renderer
+from rate_limiter import RateLimit, RateLimiter
+from send_queue import SendQueue
+from shopify_client import ShopifyClient, parse_retry_after
+from sqlite_persistence import SQLitePersistence
+from stall_detector import StallDetector
+from update_processor import ChatOrderedUpdateProcessor
+from web_server import Request, Response, WebServer
 
 # =============================================================================
 # CONFIGURATION
@@ -26,6 +62,35 @@ ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID", "YOUR_ADMIN_CHAT_ID_HERE")  # Your ad
 SHOPIFY_STORE_DOMAIN = os.getenv("SHOPIFY_STORE_DOMAIN", "maakaalicreations")  # Your Shopify store name (without .myshopify.com)
 SHOPIFY_API_ACCESS_TOKEN = os.getenv("SHOPIFY_API_ACCESS_TOKEN", "YOUR_SHOPIFY_API_ACCESS_TOKEN_HERE")  # Your Shopify API access token
 SHOPIFY_API_VERSION = "2023-04"  # Latest stable API version
+SHOPIFY_WEBHOOK_SECRET = os.getenv("SHOPIFY_WEBHOOK_SECRET", "")  # Signs catalog webhooks; enables /shopify/webhooks when set
+SHOPIFY_WEBHOOK_PATH = "/shopify/webhooks"  # Path Shopify posts products/* and collections/* webhooks to
+
+# Catalog Cache Configuration (refreshes are only a safety net when webhooks keep the catalog current)
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 3600 if SHOPIFY_WEBHOOK_SECRET else 300))  # Seconds catalog data is served as fresh
+CATALOG_CACHE_MAX_STALE = float(os.getenv("CATALOG_CACHE_MAX_STALE", 3600))  # Extra seconds stale data is served while refreshing
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 256))  # LRU bound on cached catalog requests
+CATALOG_WARM_INTERVAL = float(os.getenv("CATALOG_WARM_INTERVAL", 3000 if SHOPIFY_WEBHOOK_SECRET else 240))  # Seconds between background catalog refreshes
+CATALOG_WARM_MAX_BACKOFF = float(os.getenv("CATALOG_WARM_MAX_BACKOFF", 1800))  # Upper bound on the warmer's 429 backoff
+FEATURED_PRODUCTS_LIMIT = 5  # Products shown by browse_collection and view_offers
+BLOG_ARTICLES_LIMIT = 3  # Articles shown by view_blogs
+PRODUCT_SYNC_INTERVAL = float(os.getenv("PRODUCT_SYNC_INTERVAL", 3600 if SHOPIFY_WEBHOOK_SECRET else 900))  # Seconds between incremental search index syncs
+PRODUCT_SYNC_OVERLAP = 300  # Seconds of overlap between incremental syncs (covers clock skew and sync duration)
+PRODUCT_FULL_SYNC_INTERVAL = float(os.getenv("PRODUCT_FULL_SYNC_INTERVAL", 86400))  # Seconds between full index rebuilds, which drop deleted products
+SEARCH_RESULTS_LIMIT = 5  # Products shown for /search and free-text searches
+INLINE_RESULTS_LIMIT = 20  # Products returned to inline queries
+INLINE_CACHE_TIME = 60  # Seconds Telegram may cache inline query answers
+ORDER_INDEX_DAYS = int(os.getenv("ORDER_INDEX_DAYS", 60))  # Days of recent orders kept in the local order index
+ORDER_INDEX_MAX_ORDERS = int(os.getenv("ORDER_INDEX_MAX_ORDERS", 5000))  # Upper bound on indexed orders
+ORDER_SYNC_INTERVAL = float(os.getenv("ORDER_SYNC_INTERVAL", 3600 if SHOPIFY_WEBHOOK_SECRET else 300))  # Seconds between incremental order index syncs
+ORDER_SYNC_OVERLAP = 300  # Seconds of overlap between incremental order syncs
+ORDER_CACHE_TTL = float(os.getenv("ORDER_CACHE_TTL", 60))  # Seconds a Shopify lookup of an unindexed order is reused
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "catalog_snapshot.json.gz")  # On-disk catalog copy for fast restarts ("" disables)
+PERSISTENCE_PATH = os.getenv("PERSISTENCE_PATH", "bot_state.sqlite3")  # SQLite file keeping user_data/bot_data across restarts ("" disables)
+PERSISTENCE_UPDATE_INTERVAL = float(os.getenv("PERSISTENCE_UPDATE_INTERVAL", 10))  # Seconds between batched persistence writes
+HANDLER_FETCH_DEADLINE = float(os.getenv("HANDLER_FETCH_DEADLINE", 8))  # Seconds a view waits for Shopify before rendering what it has
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", 16))  # Updates handled at once across chats, each chat still in order (1 handles one at a time)
+MAX_PENDING_UPDATES = int(os.getenv("MAX_PENDING_UPDATES", 1000))  # Unfinished updates before intake pauses and the rest wait in the update queue
+UPDATE_DRAIN_TIMEOUT = 10  # Seconds shutdown waits for updates already being handled
 
 # Store URLs
 STORE_URL = "https://maakaalicreations.in/"
@@ -48,12 +113,38 @@ CONTACT_INFO = {
 
 # Brand Logo (Unicode representation)
 BRAND_LOGO = "🪔"  # Diya/light emoji representing Maa Kaali
+LOGO_PATH = os.getenv("LOGO_PATH", "logo.png")  # Logo image sent with /start
+LOGO_FILE_ID_CACHE = os.getenv("LOGO_FILE_ID_CACHE", ".logo_file_id.json")  # Persisted Telegram file_id of the uploaded logo
+
+# Product Photo Card Configuration
+PHOTO_CARD_WIDTH = int(os.getenv("PHOTO_CARD_WIDTH", 1024))  # Image width requested from Shopify's CDN (0 for the original)
+PHOTO_CACHE_MAX_ENTRIES = 5000  # Telegram file_ids of product images remembered
+
+# Admin Notification Configuration
+ADMIN_DIGEST_WINDOW = float(os.getenv("ADMIN_DIGEST_WINDOW", 0))  # Seconds questions are held to be merged into one admin message (0 sends each at once)
+ADMIN_SEND_INTERVAL = float(os.getenv("ADMIN_SEND_INTERVAL", 3))  # Seconds between messages to the admin chat
 
 # Security Configuration
 MAX_MESSAGE_LENGTH = 1000  # Maximum length for user messages
 MAX_QUESTIONS_PER_HOUR = 5  # Rate limiting for questions
+MAX_ORDER_LOOKUPS_PER_HOUR = 10  # Rate limiting for order status lookups
+MAX_SEARCHES_PER_MINUTE = 20  # Rate limiting for /search and free-text searches
+MAX_INLINE_QUERIES_PER_MINUTE = 60  # Rate limiting for inline queries (sent as the user types)
+RATE_LIMIT_SWEEP_INTERVAL = 600  # Seconds between dropping users whose limits have recovered
 BLOCKED_WORDS = ['spam', 'advertisement', 'promote']  # Words to filter out
 
+# Server Configuration
+PORT = int(os.getenv("PORT", 8080))  # Port for the web server (health checks and webhook)
+BOT_RUN_MODE = os.getenv("BOT_RUN_MODE", "polling").lower()  # "polling" or "webhook"
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", os.getenv("RENDER_EXTERNAL_URL", ""))  # Public base URL Telegram posts updates to
+WEBHOOK_PATH = "/telegram/webhook"  # Path of the Telegram webhook endpoint
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")  # Checked against X-Telegram-Bot-Api-Secret-Token
+LIVENESS_MAX_POLL_AGE = float(os.getenv("LIVENESS_MAX_POLL_AGE", 120))  # Seconds without a getUpdates response before polling counts as dead
+LIVENESS_MAX_QUEUE_WAIT = float(os.getenv("LIVENESS_MAX_QUEUE_WAIT", 120))  # Seconds updates may sit queued with none processed before the bot counts as wedged
+READINESS_MAX_SHOPIFY_OUTAGE = float(os.getenv("READINESS_MAX_SHOPIFY_OUTAGE", 900))  # Seconds Shopify calls may fail without a success before /readyz fails
+READINESS_MAX_QUEUE_FILL = 0.9  # Fraction of the admin queue in use before /readyz fails
+STALL_THRESHOLD = float(os.getenv("STALL_THRESHOLD", 0.5))  # Seconds the event loop may be blocked before the blocking stack is logged (0 disables)
+
 # =============================================================================
 # LOGGING SETUP
 # =============================================================================
@@ -64,6 +155,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# METRICS
+# =============================================================================
+
+# Exported in the Prometheus text format on /metrics
+metrics = Registry()
+handler_seconds = metrics.histogram("bot_handler_seconds", "Time spent handling an update, by handler", ["handler"])
+handler_errors = metrics.counter("bot_handler_errors_total", "Handler calls that raised, by handler", ["handler"])
+callback_seconds = metrics.histogram("bot_callback_route_seconds", "Time spent in an inline button handler, by route", ["route"])
+callback_errors = metrics.counter("bot_callback_route_errors_total", "Inline button handler calls that raised, by route", ["route"])
+static_fallbacks = metrics.counter("bot_static_fallbacks_total", "Replies served from static content because Shopify data was unavailable", ["screen"])
+shopify_requests = metrics.counter("shopify_requests_total", "Shopify Admin API requests by endpoint and HTTP status", ["endpoint", "status"])
+shopify_seconds = metrics.histogram("shopify_request_seconds", "Shopify Admin API request latency by endpoint", ["endpoint"])
+telegram_requests = metrics.counter("telegram_requests_total", "Telegram Bot API requests by method and HTTP status", ["method", "status"])
+telegram_seconds = metrics.histogram("telegram_request_seconds", "Telegram Bot API request latency by method", ["method"])
+loop_lag_seconds = metrics.histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+loop_lag = metrics.gauge("event_loop_lag_last_seconds", "Event loop lag of the latest sample")
+metrics.gauge("admin_queue_depth", "Admin notifications waiting to be sent", function=lambda: len(admin_queue))
+metrics.gauge(
+    "bot_updates_pending", "Updates accepted by the update processor and not finished",
+    function=lambda: update_processor.pending if update_processor is not None else 0
+)
+loop_stalls = metrics.counter("event_loop_stalls_total", "Times the event loop was blocked past STALL_THRESHOLD, by handler", ["handler"])
+loop_stall_seconds = metrics.histogram(
+    "event_loop_stall_seconds", "Duration of event loop stalls",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+loop_lag_monitor = LoopLagMonitor(loop_lag_seconds, loop_lag)
+
+# Timestamps behind /livez and /readyz, updated as work happens so probes make no network calls
+health_state: Dict[str, Optional[float]] = {
+    'started_at': time.time(),
+    'last_update': None,
+    'last_poll': None,
+    'shopify_last_success': None,
+    'shopify_last_failure': None,
+}
+
+def record_loop_stall(seconds: float, handler: str) -> None:
+    """Record an event loop stall (StallDetector hook)"""
+    loop_stalls.inc(handler)
+    loop_stall_seconds.observe(seconds)
+
+# Watchdog logging the stack of whatever blocks the event loop
+stall_detector = StallDetector(loop_lag_monitor, threshold=STALL_THRESHOLD, on_stall=record_loop_stall)
+
+def get_update_type(update) -> str:
+    """Name of the field an update carries ("message", "callback_query", ...)"""
+    for update_type in Update.ALL_TYPES:
+        if getattr(update, update_type, None) is not None:
+            return update_type
+    return "unknown"
+
+def timed_handler(function):
+    """Record a handler's latency and errors under its function name, and label it for the stall detector"""
+    name = function.__name__
+    
+    @wraps(function)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            with stall_detector.track(f"{name}/{get_update_type(update)}"):
+                return await function(update, context)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            handler_seconds.observe(time.perf_counter() - started, name)
+    return wrapper
+
+def record_callback_route(route: str, seconds: float, failed: bool) -> None:
+    """Record an inline button handler call (CallbackRouter hook)"""
+    callback_seconds.observe(seconds, route)
+    if failed:
+        callback_errors.inc(route)
+
+def record_shopify_request(endpoint: str, status: str, seconds: float) -> None:
+    """Record a Shopify HTTP request (ShopifyClient hook), with ids folded out of the endpoint"""
+    health_state['shopify_last_success' if status.startswith('2') else 'shopify_last_failure'] = time.time()
+    endpoint = re.sub(r"\d+", ":id", endpoint)
+    shopify_requests.inc(endpoint, status)
+    shopify_seconds.observe(seconds, endpoint)
+
+class InstrumentedRequest(HTTPXRequest):
+    """Bot API transport recording each request's method, status and latency"""
+    
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        status = "error"
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+            status = str(code)
+            if api_method == 'getUpdates' and code == 200:
+                health_state['last_poll'] = time.time()
+            return code, payload
+        finally:
+            telegram_requests.inc(api_method, status)
+            telegram_seconds.observe(time.perf_counter() - started, api_method)
+
 # =============================================================================
 # SECURITY FUNCTIONS
 # =============================================================================
@@ -98,124 +292,439 @@ def is_valid_user(user) -> bool:
     
     return True
 
-def rate_limit_check(user_id: int, context) -> bool:
-    """Check if user has exceeded rate limits"""
-    current_time = context.bot_data.get('rate_limits', {}).get(str(user_id), 0)
-    import time
-    
-    if time.time() - current_time < 3600:  # 1 hour
-        return False
-    
-    # Update rate limit
-    if 'rate_limits' not in context.bot_data:
-        context.bot_data['rate_limits'] = {}
-    context.bot_data['rate_limits'][str(user_id)] = time.time()
-    
-    return True
+# Per-user limits by action, kept in bot_data across restarts (see post_init/post_shutdown)
+rate_limiter = RateLimiter({
+    'question': RateLimit(MAX_QUESTIONS_PER_HOUR, 3600),
+    'order_lookup': RateLimit(MAX_ORDER_LOOKUPS_PER_HOUR, 3600),
+    'search': RateLimit(MAX_SEARCHES_PER_MINUTE, 60),
+    'inline_search': RateLimit(MAX_INLINE_QUERIES_PER_MINUTE, 60),
+})
+
+def rate_limit_check(user_id: int, action: str = 'question') -> bool:
+    """Count an action against the user's rate limit; False if the limit is exceeded"""
+    return rate_limiter.hit(action, user_id)
+
+def is_rate_limited(user_id: int, action: str = 'question') -> bool:
+    """Check if the user has exhausted an action's limit, without counting a hit"""
+    return rate_limiter.retry_after(action, user_id) > 0
+
+async def rate_limit_sweep_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Drop rate limit entries of users whose limits have fully recovered"""
+    dropped = rate_limiter.sweep()
+    if dropped:
+        logger.info(f"Rate limiter expired {dropped} idle entries")
 
 # =============================================================================
 # SHOPIFY API FUNCTIONS
 # =============================================================================
 
-def get_shopify_headers() -> Dict[str, str]:
-    """Get headers for Shopify API requests"""
-    return {
-        'X-Shopify-Access-Token': SHOPIFY_API_ACCESS_TOKEN,
-        'Content-Type': 'application/json'
-    }
+# Shared async Shopify client, opened and closed with the Application
+shopify = ShopifyClient(SHOPIFY_STORE_DOMAIN, SHOPIFY_API_ACCESS_TOKEN, SHOPIFY_API_VERSION, on_request=record_shopify_request)
 
-def get_shopify_api_url(endpoint: str) -> str:
-    """Generate Shopify API URL"""
-    # Use the store name to create the correct Shopify API URL
-    return f"https://{SHOPIFY_STORE_DOMAIN}.myshopify.com/admin/api/{SHOPIFY_API_VERSION}/{endpoint}"
+# Catalog cache in front of the Shopify fetch functions
+catalog_cache = CatalogCache(
+    ttl=CATALOG_CACHE_TTL,
+    max_stale=CATALOG_CACHE_MAX_STALE,
+    max_entries=CATALOG_CACHE_MAX_ENTRIES
+)
+
+# Title/handle index over the collections, rebuilt by the catalog warmer
+collection_index = CollectionIndex()
 
-def fetch_products(limit: int = 5, collection_id: Optional[str] = None, tag: Optional[str] = None) -> List[Dict]:
-    """Fetch products from Shopify API"""
+async def fetch_products(limit: int = 5, collection_id: Optional[str] = None, tag: Optional[str] = None) -> List[Dict]:
+    """Fetch products from Shopify API (cached)"""
     try:
-        url = get_shopify_api_url("products.json")
-        params = {
-            'limit': limit,
-            'status': 'active'
-        }
-        
-        if collection_id:
-            url = get_shopify_api_url(f"collections/{collection_id}/products.json")
-        elif tag:
-            params['tag'] = tag
-            
-        response = requests.get(url, headers=get_shopify_headers(), params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('products', [])
+        key = CatalogCache.make_key("products", collection_id, tag, limit)
+        return await catalog_cache.get(
+            key, lambda: shopify.fetch_products(limit=limit, collection_id=collection_id, tag=tag)
+        )
     except Exception as e:
         logger.error(f"Error fetching products: {e}")
         return []
 
-def fetch_collections() -> List[Dict]:
-    """Fetch collections from Shopify API"""
+async def fetch_catalog_page(page_info: Optional[str] = None) -> Dict[str, Any]:
+    """Fetch a page of the product catalog (first page cached for everyone)"""
+    if page_info is None:
+        key = CatalogCache.make_key("products_page", limit=FEATURED_PRODUCTS_LIMIT)
+        return await catalog_cache.get(key, lambda: shopify.fetch_products_page(limit=FEATURED_PRODUCTS_LIMIT))
+    return await shopify.fetch_products_page(limit=FEATURED_PRODUCTS_LIMIT, page_info=page_info)
+
+# Per-chat catalog pages for Next/Prev browsing
+catalog_pager = CatalogPager(fetch_catalog_page)
+
+async def fetch_collections() -> List[Dict]:
+    """Fetch collections from Shopify API (cached)"""
     try:
-        url = get_shopify_api_url("collections.json")
-        response = requests.get(url, headers=get_shopify_headers(), timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('collections', [])
+        key = CatalogCache.make_key("collections")
+        return await catalog_cache.get(key, shopify.fetch_collections)
     except Exception as e:
         logger.error(f"Error fetching collections: {e}")
         return []
 
-def fetch_blog_articles(blog_id: str = "1", limit: int = 3) -> List[Dict]:
-    """Fetch blog articles from Shopify API"""
+async def fetch_blog_articles(blog_id: str = "1", limit: int = 3) -> List[Dict]:
+    """Fetch blog articles from Shopify API (cached)"""
     try:
-        url = get_shopify_api_url(f"blogs/{blog_id}/articles.json")
-        params = {'limit': limit}
-        response = requests.get(url, headers=get_shopify_headers(), params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('articles', [])
+        key = CatalogCache.make_key(f"blogs/{blog_id}/articles", limit=limit)
+        return await catalog_cache.get(
+            key, lambda: shopify.fetch_blog_articles(blog_id=blog_id, limit=limit)
+        )
     except Exception as e:
         logger.error(f"Error fetching blog articles: {e}")
         return []
 
-def find_collection_by_title(title: str) -> Optional[str]:
-    """Find collection ID by title"""
-    collections = fetch_collections()
-    for collection in collections:
-        if title.lower() in collection.get('title', '').lower():
-            return str(collection['id'])
-    return None
+async def find_collection_by_title(title: str) -> Optional[str]:
+    """Find collection ID by title using the collection index"""
+    if collection_index.built_at is None:
+        # Index not built yet (warmer hasn't run): build it from the cached collections
+        collection_index.rebuild(await fetch_collections())
+    return collection_index.find(title)
+
+# =============================================================================
+# CATALOG WARMER
+# =============================================================================
+
+# Last outcome of the background catalog warmer, reported on /readyz
+warmer_state: Dict[str, Any] = {'last_success': None, 'last_error': None, 'failures': 0}
+
+async def warm_catalog() -> None:
+    """Fetch everything the menu handlers show straight into the catalog cache"""
+    first_page = await shopify.fetch_products_page(limit=FEATURED_PRODUCTS_LIMIT)
+    catalog_cache.set(CatalogCache.make_key("products_page", limit=FEATURED_PRODUCTS_LIMIT), first_page)
+    
+    collections = await shopify.fetch_collections()
+    catalog_cache.set(CatalogCache.make_key("collections"), collections)
+    collection_index.rebuild(collections)
+    
+    offers_collection_id = await find_collection_by_title("offers")
+    if offers_collection_id:
+        offers = await shopify.fetch_products(limit=FEATURED_PRODUCTS_LIMIT, collection_id=offers_collection_id)
+        catalog_cache.set(
+            CatalogCache.make_key("products", offers_collection_id, limit=FEATURED_PRODUCTS_LIMIT), offers
+        )
+    
+    articles = await shopify.fetch_blog_articles(limit=BLOG_ARTICLES_LIMIT)
+    catalog_cache.set(CatalogCache.make_key("blogs/1/articles", limit=BLOG_ARTICLES_LIMIT), articles)
+
+def get_warmer_backoff(error: Exception) -> float:
+    """Delay before the next warm attempt after a failure"""
+    delay = min(CATALOG_WARM_INTERVAL * 2 ** warmer_state['failures'], CATALOG_WARM_MAX_BACKOFF)
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        delay = max(delay, parse_retry_after(error.response.headers.get('Retry-After')))
+    return delay
+
+async def catalog_warmer_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Job queue callback: warm the catalog, then schedule the next run"""
+    delay = CATALOG_WARM_INTERVAL
+    try:
+        await warm_catalog()
+    except Exception as e:
+        warmer_state['failures'] += 1
+        warmer_state['last_error'] = str(e)
+        delay = get_warmer_backoff(e)
+        logger.warning(f"Catalog warm failed ({warmer_state['failures']} in a row), retrying in {delay:.0f}s: {e}")
+    else:
+        warmer_state['failures'] = 0
+        warmer_state['last_error'] = None
+        warmer_state['last_success'] = time.time()
+        await save_catalog_snapshot()
+    finally:
+        # Always reschedule, even if saving the snapshot raised, so the warmer never stops
+        context.job_queue.run_once(catalog_warmer_job, when=delay, name="catalog_warmer")
+
+def schedule_catalog_warmer(application: Application) -> None:
+    """Warm the catalog on boot and periodically afterwards"""
+    if application.job_queue is None:
+        logger.warning("Job queue unavailable (install python-telegram-bot[job-queue]); catalog warmer disabled")
+        return
+    application.job_queue.run_once(catalog_warmer_job, when=0, name="catalog_warmer")
+
+# =============================================================================
+# PRODUCT SEARCH INDEX
+# =============================================================================
+
+# Full-text index over the whole catalog, answering /search and inline queries from memory
+product_index = ProductSearchIndex()
+
+# Product webhooks received while a full rebuild is fetching and building ('events' is a list only then)
+product_rebuild_state: Dict[str, Any] = {'events': None}
+
+async def sync_product_index() -> None:
+    """Load the whole catalog on the first run and every PRODUCT_FULL_SYNC_INTERVAL, else only changed products.
+
+    Deltas by updated_at_min never list deleted products, so without
+    webhooks only the periodic full rebuild drops them from the index.
+    """
+    started = time.time()
+    if product_index.rebuilt_at is None or started - product_index.rebuilt_at >= PRODUCT_FULL_SYNC_INTERVAL:
+        # Searches and webhooks keep using the old index until the new one is swapped in below
+        product_rebuild_state['events'] = events = []
+        try:
+            products = await shopify.fetch_all_products()
+            fresh = await asyncio.to_thread(ProductSearchIndex.build, products)
+            for topic, payload in events:  # Replayed onto the new index, which the fetch may predate
+                apply_product_event(fresh, topic, payload)
+        finally:
+            product_rebuild_state['events'] = None
+        product_index.replace(fresh)
+        product_index.synced_at = started
+        product_index.rebuilt_at = started
+        logger.info(f"Product search index rebuilt with {len(product_index)} products")
+        return
+    
+    since = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(product_index.synced_at - PRODUCT_SYNC_OVERLAP))
+    changed = await shopify.fetch_all_products(filters={'status': None, 'updated_at_min': since})
+    for product in changed:
+        if product.get('status', 'active') == 'active':
+            product_index.upsert(product)
+        else:
+            product_index.remove(product['id'])
+    product_index.synced_at = started
+
+async def product_sync_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Job queue callback: keep the product search index in sync"""
+    try:
+        await sync_product_index()
+    except Exception as e:
+        logger.warning(f"Product search index sync failed: {e}")
+    else:
+        await save_catalog_snapshot()
+
+def schedule_product_sync(application: Application) -> None:
+    """Build the search index on boot and sync it periodically afterwards"""
+    if application.job_queue is None:
+        logger.warning("Job queue unavailable (install python-telegram-bot[job-queue]); product search disabled")
+        return
+    application.job_queue.run_repeating(product_sync_job, interval=PRODUCT_SYNC_INTERVAL, first=0, name="product_sync")
+
+# =============================================================================
+# ORDER STATUS
+# =============================================================================
+
+# Recent orders by name/number, kept fresh by order webhooks or polling
+order_index = OrderIndex(max_orders=ORDER_INDEX_MAX_ORDERS)
+
+# Short-lived cache of Shopify lookups for orders outside the index (misses included)
+order_cache = CatalogCache(ttl=ORDER_CACHE_TTL, max_stale=0, max_entries=1000)
+
+async def lookup_order(number: str) -> Optional[Dict]:
+    """Find an order by name/number in the index, else with one Shopify call"""
+    order = order_index.find(number)
+    if order is not None:
+        return order
+    key = ("order", order_keys(number)[0])
+    orders = await order_cache.get(key, lambda: shopify.fetch_orders(name=number, fields=ORDER_FIELDS))
+    for found in orders:
+        order_index.upsert(found)
+    return order_index.find(number)
+
+async def sync_order_index() -> None:
+    """Load recent orders on the first run, then only orders changed since the last sync"""
+    started = time.time()
+    if order_index.synced_at is None:
+        since = started - ORDER_INDEX_DAYS * 86400
+    else:
+        since = order_index.synced_at - ORDER_SYNC_OVERLAP
+    orders = await shopify.fetch_all_orders(
+        filters={'updated_at_min': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(since))},
+        fields=ORDER_FIELDS
+    )
+    if order_index.synced_at is None:
+        order_index.rebuild(orders)
+        logger.info(f"Order index built with {len(order_index)} orders")
+    else:
+        for order in orders:
+            order_index.upsert(order)
+    order_index.synced_at = started
+
+async def order_sync_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Job queue callback: keep the order index in sync"""
+    try:
+        await sync_order_index()
+    except Exception as e:
+        logger.warning(f"Order index sync failed: {e}")
+
+def schedule_order_sync(application: Application) -> None:
+    """Build the order index on boot and sync it periodically afterwards"""
+    if application.job_queue is None:
+        logger.warning("Job queue unavailable (install python-telegram-bot[job-queue]); orders are looked up on demand")
+        return
+    application.job_queue.run_repeating(order_sync_job, interval=ORDER_SYNC_INTERVAL, first=0, name="order_sync")
+
+def apply_order_event(topic: str, payload: Dict) -> None:
+    """Patch the order index from one Shopify orders/* or fulfillments/* webhook"""
+    if topic == 'orders/delete':
+        order_index.remove(payload['id'])
+    elif topic.startswith('orders/'):
+        order_index.upsert(payload)
+    elif topic.startswith('fulfillments/'):
+        order_index.update_fulfillment(payload)
+
+# =============================================================================
+# SHOPIFY CATALOG WEBHOOKS
+# =============================================================================
+
+def verify_shopify_hmac(body: bytes, signature: str) -> bool:
+    """Check a webhook's X-Shopify-Hmac-Sha256 header against the shared secret"""
+    if not SHOPIFY_WEBHOOK_SECRET or not signature:
+        return False
+    digest = hmac.new(SHOPIFY_WEBHOOK_SECRET.encode(), body, hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), signature)
+
+def _patch_cached_products(product_id: int, product: Optional[Dict]) -> None:
+    """Replace (or drop, when product is None) a product in every cached product list"""
+    def patch_list(products: List[Dict]) -> List[Dict]:
+        if not any(item.get('id') == product_id for item in products):
+            return products
+        if product is None:
+            return [item for item in products if item.get('id') != product_id]
+        return [product if item.get('id') == product_id else item for item in products]
+    
+    def transform(key, value):
+        if key[0] == "products":
+            return patch_list(value)
+        if key[0] == "products_page":
+            return {**value, 'products': patch_list(value['products'])}
+        return value
+    
+    catalog_cache.patch(transform)
+
+def _patch_cached_collections(collection_id: int, collection: Optional[Dict]) -> None:
+    """Replace, add or drop (when collection is None) a collection and reindex titles"""
+    key = CatalogCache.make_key("collections")
+    collections = catalog_cache.peek(key)
+    if collections is None:
+        return
+    collections = [item for item in collections if item.get('id') != collection_id]
+    if collection is not None:
+        collections.append(collection)
+    catalog_cache.patch(lambda cache_key, value: collections if cache_key == key else value)
+    collection_index.rebuild(collections)
+
+def apply_product_event(index: ProductSearchIndex, topic: str, payload: Dict) -> Optional[bool]:
+    """Apply a products/* webhook to a search index; returns whether the product is listed now, or None if the payload is out of date"""
+    if topic == 'products/delete':
+        index.remove(payload['id'])
+        return False
+    existing = index.products.get(payload['id'])
+    if existing and (existing.get('updated_at') or '') > (payload.get('updated_at') or ''):
+        return None  # Older than what we have; webhooks may arrive out of order
+    if payload.get('status', 'active') == 'active':
+        index.upsert(payload)
+        return True
+    index.remove(payload['id'])
+    return False
+
+def apply_catalog_event(topic: str, payload: Dict) -> None:
+    """Patch the in-memory catalog from one Shopify webhook"""
+    if topic in ('products/create', 'products/update', 'products/delete'):
+        if product_rebuild_state['events'] is not None:
+            product_rebuild_state['events'].append((topic, payload))
+        listed = apply_product_event(product_index, topic, payload)
+        if listed is not None:
+            _patch_cached_products(payload['id'], payload if listed else None)
+    elif topic in ('collections/create', 'collections/update'):
+        _patch_cached_collections(payload['id'], payload)
+    elif topic == 'collections/delete':
+        _patch_cached_collections(payload['id'], None)
+    else:
+        logger.info(f"Ignoring Shopify webhook topic {topic}")
+
+async def shopify_webhook(request: Request) -> Response:
+    """Receive Shopify catalog and order webhooks"""
+    if not verify_shopify_hmac(request.body, request.headers.get('x-shopify-hmac-sha256', '')):
+        return Response.text("Unauthorized", 401)
+    try:
+        payload = request.json()
+    except ValueError:
+        return Response.text("Bad Request", 400)
+    topic = request.headers.get('x-shopify-topic', '')
+    if topic.startswith(('orders/', 'fulfillments/')):
+        apply_order_event(topic, payload)
+    else:
+        apply_catalog_event(topic, payload)
+    return Response.text("OK")
+
+# =============================================================================
+# CATALOG SNAPSHOT
+# =============================================================================
+
+def restore_catalog_snapshot() -> None:
+    """Load the on-disk catalog snapshot into the cache and indexes"""
+    if not CATALOG_SNAPSHOT_PATH:
+        return
+    snapshot = load_snapshot(CATALOG_SNAPSHOT_PATH)
+    if snapshot is None:
+        return
+    
+    # Entries keep their real age, so stale ones are served while they refresh
+    elapsed = max(0.0, time.time() - snapshot['saved_at'])
+    for key, value, age in snapshot.get('cache', []):
+        catalog_cache.set(tuple(key), value, age=age + elapsed)
+    collections = catalog_cache.peek(CatalogCache.make_key("collections"))
+    if collections:
+        collection_index.rebuild(collections)
+    
+    # The next index sync then only fetches products changed since the snapshot
+    if snapshot.get('products_synced_at'):
+        product_index.rebuild(snapshot.get('products', []))
+        product_index.synced_at = snapshot['products_synced_at']
+        product_index.rebuilt_at = snapshot['products_rebuilt_at']
+    logger.info(f"Restored catalog snapshot from {elapsed:.0f}s ago ({len(catalog_cache)} cached requests, {len(product_index)} products)")
+
+# The warmer and the product sync both save; one write at a time, each with the latest data
+_snapshot_lock = asyncio.Lock()
+
+async def save_catalog_snapshot() -> None:
+    """Write the cached catalog and search index to disk in a worker thread"""
+    if not CATALOG_SNAPSHOT_PATH:
+        return
+    async with _snapshot_lock:
+        data = {
+            'cache': [[list(key), value, age] for key, value, age in catalog_cache.export()],
+            'products': list(product_index.products.values()),
+            'products_synced_at': product_index.synced_at,
+            'products_rebuilt_at': product_index.rebuilt_at
+        }
+        try:
+            await asyncio.to_thread(save_snapshot, CATALOG_SNAPSHOT_PATH, data)
+        except OSError as e:
+            logger.warning(f"Could not write catalog snapshot: {e}")
 
 # =============================================================================
 # KEYBOARD CREATION FUNCTIONS
 # =============================================================================
 
+# Static keyboards and screens, built once at startup and shared by every update
+renderer = Renderer()
+
+renderer.add_keyboard('main_menu', [
+    [("🛍 Browse Saree Collection", "browse_collection"), ("💰 View Offers", "view_offers")],
+    [("📝 Place an Order Online", "place_order"), ("📦 Track Your Order", "track_order")],
+    [("❓ Ask a Question", "ask_question"), ("📰 View Blogs", "view_blogs")],
+    [("☎️ Contact Us", "contact_us"), ("📱 Follow Us", "follow_us")],
+])
+renderer.add_keyboard('back_to_menu', [[("🔙 Back to Menu", "back_to_menu")]])
+
 def create_main_menu_keyboard() -> InlineKeyboardMarkup:
-    """Create the main menu keyboard"""
-    keyboard = [
-        [
-            InlineKeyboardButton("🛍 Browse Saree Collection", callback_data="browse_collection"),
-            InlineKeyboardButton("💰 View Offers", callback_data="view_offers")
-        ],
-        [
-            InlineKeyboardButton("📝 Place an Order Online", callback_data="place_order")
-        ],
-        [
-            InlineKeyboardButton("❓ Ask a Question", callback_data="ask_question"),
-            InlineKeyboardButton("📰 View Blogs", callback_data="view_blogs")
-        ],
-        [
-            InlineKeyboardButton("☎️ Contact Us", callback_data="contact_us"),
-            InlineKeyboardButton("📱 Follow Us", callback_data="follow_us")
-        ]
-    ]
+    """Return the main menu keyboard"""
+    return renderer.keyboard('main_menu')
+
+@lru_cache(maxsize=64)
+def create_browse_keyboard(page: int, has_next: bool) -> InlineKeyboardMarkup:
+    """Create the catalog paging keyboard (cached per page)"""
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton("⬅️ Prev", callback_data=callback_data("browse_page", page - 1)))
+    if has_next:
+        navigation.append(InlineKeyboardButton("Next ➡️", callback_data=callback_data("browse_page", page + 1)))
+    keyboard = [navigation] if navigation else []
+    keyboard.append([InlineKeyboardButton("🖼 View Photos", callback_data=callback_data("photo_cards", page))])
+    keyboard.append([InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")])
     return InlineKeyboardMarkup(keyboard)
 
 def create_back_to_menu_keyboard() -> InlineKeyboardMarkup:
-    """Create back to menu keyboard"""
-    keyboard = [[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")]]
-    return InlineKeyboardMarkup(keyboard)
+    """Return the back to menu keyboard"""
+    return renderer.keyboard('back_to_menu')
 
 # =============================================================================
 # MESSAGE FORMATTING FUNCTIONS
@@ -223,11 +732,11 @@ def create_back_to_menu_keyboard() -> InlineKeyboardMarkup:
 
 def format_product_message(product: Dict) -> str:
     """Format a product for display"""
-    title = product.get('title', 'Unknown Product')
+    title = markdown_bold(product.get('title', 'Unknown Product'))
     price = product.get('variants', [{}])[0].get('price', '0.00')
     url = f"{STORE_URL}products/{product.get('handle', '')}"
     
-    message = f"*{title}*\n"
+    message = f"{title}\n"
     message += f"💰 Price: ₹{price}\n"
     message += f"🔗 [View Product]({url})\n"
     
@@ -235,24 +744,319 @@ def format_product_message(product: Dict) -> str:
 
 def format_blog_message(article: Dict) -> str:
     """Format a blog article for display"""
-    title = article.get('title', 'Unknown Article')
+    title = markdown_bold(article.get('title', 'Unknown Article'))
     summary = article.get('summary', 'No summary available')
     url = f"{STORE_URL}blogs/news/{article.get('handle', '')}"
     
     # Truncate summary if too long
     if len(summary) > 100:
         summary = summary[:97] + "..."
+    summary = escape_markdown(summary)
     
-    message = f"*{title}*\n"
+    message = f"{title}\n"
     message += f"📝 {summary}\n"
     message += f"🔗 [Read More]({url})\n"
     
     return message
 
+# Shipment statuses Shopify reports on fulfillments, as shown to customers
+SHIPMENT_STATUS_LABELS = {
+    'label_printed': "🏷 Label printed",
+    'label_purchased': "🏷 Label printed",
+    'confirmed': "📦 Handed to courier",
+    'ready_for_pickup': "📍 Ready for pickup",
+    'in_transit': "🚚 In transit",
+    'out_for_delivery': "🚚 Out for delivery",
+    'attempted_delivery': "⚠️ Delivery attempted",
+    'delivered': "✅ Delivered",
+    'failure': "⚠️ Delivery problem",
+}
+
+def format_order_status(order: Dict) -> str:
+    """Format an order's payment and fulfillment status for display"""
+    if order.get('cancelled_at'):
+        status = "❌ Cancelled"
+    elif order.get('fulfillment_status') == 'fulfilled':
+        status = "📦 Shipped"
+    elif order.get('fulfillment_status') == 'partial':
+        status = "📦 Partially shipped"
+    else:
+        status = "🧵 Being prepared"
+    
+    message = f"{markdown_bold('Order ' + order['name'])}\n"
+    message += f"*Status:* {status}\n"
+    if order.get('financial_status'):
+        message += f"*Payment:* {order['financial_status'].replace('_', ' ').title()}\n"
+    for fulfillment in order.get('fulfillments', []):
+        if fulfillment.get('status') == 'cancelled':
+            continue
+        shipment = SHIPMENT_STATUS_LABELS.get(fulfillment.get('shipment_status'), "📦 Shipped")
+        message += f"\n{shipment}\n"
+        if fulfillment.get('tracking_company'):
+            message += f"🚛 {escape_markdown(fulfillment['tracking_company'])}\n"
+        if fulfillment.get('tracking_number'):
+            message += f"🔢 `{fulfillment['tracking_number'].replace('`', '')}`\n"
+        if (fulfillment.get('tracking_url') or '').startswith(('https://', 'http://')):
+            message += f"🔗 [Track Shipment]({markdown_link_url(fulfillment['tracking_url'])})\n"
+    
+    return message
+
+# =============================================================================
+# STATIC SCREENS
+# =============================================================================
+
+renderer.add_screen('main_menu', (
+    f"{BRAND_LOGO} *Maa Kaali Creations* 🎉\n\n"
+    "Choose an option from the menu below:"
+), keyboard='main_menu')
+
+renderer.add_screen('help', (
+    f"{BRAND_LOGO} *Maa Kaali Creations Bot Help* 📚\n\n"
+    "*Available Commands:*\n"
+    "• /start - Show main menu\n"
+    "• /help - Show this help message\n"
+    "• /search <words> - Search our sarees\n"
+    "• /order <number> <email or phone> - Check your order status\n\n"
+    "*Features:*\n"
+    "• Browse our saree collection\n"
+    "• View current offers and discounts\n"
+    "• Place orders online\n"
+    "• Track your order\n"
+    "• Ask questions\n"
+    "• Read our blog articles\n"
+    "• Contact us\n"
+    "• Follow us on social media\n\n"
+    "For any issues, contact our support team."
+), keyboard='back_to_menu')
+
+renderer.add_screen('place_order', (
+    f"{BRAND_LOGO} *📝 Place an Order Online*\n\n"
+    "Ready to shop? Visit our online store to browse our complete collection!\n\n"
+    "🛒 *Features:*\n"
+    "• Secure payment options\n"
+    "• Free shipping on all orders\n"
+    "• Easy returns and exchanges\n"
+    "• 24/7 customer support\n\n"
+    f"*🛍 Shop Now:* {STORE_URL}\n\n"
+    "💡 *Tip:* Use code `SAVE25` and get Upto 25% off on your first Order!"
+), keyboard='back_to_menu')
+
+renderer.add_screen('track_order', (
+    f"{BRAND_LOGO} *📦 Track Your Order*\n\n"
+    "Send your order number together with the email or phone number used for the order, for example:\n"
+    "`#1001 you@example.com`\n\n"
+    f"You can also track your order on our website: {TRACKING_URL}"
+), keyboard='back_to_menu', disable_web_page_preview=True)
+
+renderer.add_screen('ask_question', (
+    f"{BRAND_LOGO} *❓ Ask a Question*\n\n"
+    "Have a question about our products or services?\n\n"
+    "Simply type your question below and we'll get back to you soon!\n\n"
+    "📝 *You can ask about:*\n"
+    "• Product details and availability\n"
+    "• Sizing and measurements\n"
+    "• Shipping and delivery\n"
+    "• Returns and exchanges\n"
+    "• Payment options\n"
+    "• Any other queries\n\n"
+    "💡 *Just type your question in the chat below!*\n\n"
+    "⚠️ *Note:* Please be respectful and avoid spam."
+), keyboard='back_to_menu')
+
+renderer.add_screen('contact_us', (
+    f"{BRAND_LOGO} 📞 Contact Us\n\n"
+    "Get in touch with us through any of these channels:\n\n"
+    f"📱 Call: {CONTACT_INFO['phone']}\n"
+    f"💬 WhatsApp: {CONTACT_INFO['whatsapp']}\n"
+    f"📧 Email: {CONTACT_INFO['email']}\n"
+    f"🌐 Website: {CONTACT_INFO['website']}\n\n"
+    "📱 Social Media:\n"
+    f"• Instagram: {CONTACT_INFO['instagram']}\n"
+    f"• YouTube: {CONTACT_INFO['youtube']}\n"
+    f"• Facebook: {CONTACT_INFO['facebook']}\n"
+    f"• Twitter/X: {CONTACT_INFO['twitter']}\n"
+    f"• Pinterest: {CONTACT_INFO['pinterest']}\n"
+    f"• Threads: {CONTACT_INFO['threads']}\n\n"
+    "🕒 Business Hours:\n"
+    "24/7 Available - You can reach out to us anytime!\n\n"
+    "💝 We're here to help!"
+), keyboard='back_to_menu', parse_mode=None, disable_web_page_preview=True)
+
+renderer.add_screen('follow_us', (
+    f"{BRAND_LOGO} 📱 Follow Us\n\n"
+    "Stay connected with us on social media for the latest updates, new arrivals, and exclusive offers!\n\n"
+    "🌟 Our Social Media:\n"
+    f"• Instagram: {CONTACT_INFO['instagram']}\n"
+    f"• YouTube: {CONTACT_INFO['youtube']}\n"
+    f"• Facebook: {CONTACT_INFO['facebook']}\n"
+    f"• Twitter/X: {CONTACT_INFO['twitter']}\n"
+    f"• Pinterest: {CONTACT_INFO['pinterest']}\n"
+    f"• Threads: {CONTACT_INFO['threads']}\n\n"
+    "🎯 Don't miss out on our latest updates!"
+), keyboard='back_to_menu', parse_mode=None, disable_web_page_preview=True)
+
+renderer.add_screen('default_offers', (
+    f"{BRAND_LOGO} *💰 Special Offers*\n\n"
+    "🎁 *EXCLUSIVE DISCOUNTS FOR YOU!*\n\n"
+    "🔥 *Get Up To 5% OFF*\n"
+    "• On prepaid orders\n"
+    "• Minimum purchase of ₹300.00\n"
+    "• Automatic discount applied\n\n"
+    "🎯 *Up To 25% OFF*\n"
+    "• For first purchase only\n"
+    "• New customers exclusive\n"
+    "• One-time use per customer\n"
+    "• Use code: `SAVE25`\n\n"
+    "🚚 *FREE SHIPPING*\n"
+    "• Free shipping on all orders\n"
+    "• No minimum purchase required\n"
+    "• Fast and reliable delivery\n\n"
+    "💎 *Premium Silk Sarees* at affordable prices\n"
+    "✨ *Limited time offers - Shop now!*\n\n"
+    f"*Shop now:* {ALL_PRODUCTS_URL}"
+), keyboard='back_to_menu', disable_web_page_preview=True)
+
+renderer.add_screen('fallback_catalog', (
+    f"{BRAND_LOGO} *🛍 Our Saree Collection*\n\n"
+    f"{BRAND_LOGO} *Featured Products:*\n\n"
+    f"{BRAND_LOGO} *1.* **Aqua Blue Embroidered Twill Net Saree**\n"
+    "💰 Price: ₹385 (Sale from ₹925)\n"
+    "🔗 [View Product](https://maakaalicreations.in/products/aqua-blue-embroidered-twill-net-saree-with-running-blouse)\n\n"
+    
+    f"{BRAND_LOGO} *2.* **Beautiful Digital Printed Crepe Silk Saree**\n"
+    "💰 Price: ₹405 (Sale from ₹1,005)\n"
+    "🔗 [View Product](https://maakaalicreations.in/products/beautiful-digital-printed-crepe-silk-saree)\n\n"
+    
+    f"{BRAND_LOGO} *3.* **Crimson Bloom Net Saree with Embroidered Work**\n"
+    "💰 Price: ₹345 (Sale from ₹1,025)\n"
+    "🔗 [View Product](https://maakaalicreations.in/products/crimson-bloom-net-saree-with-embroidered-work)\n\n"
+    
+    f"{BRAND_LOGO} *4.* **Designer Kanjeevaram Silk Saree**\n"
+    "💰 Price: ₹515\n"
+    "🔗 [View Product](https://maakaalicreations.in/products/designer-kanjeevaram-silk-saree-with-golden-zari-work)\n\n"
+    
+    f"{BRAND_LOGO} *5.* **Designer Twill Net Saree with Sequin Work**\n"
+    "💰 Price: ₹655 (Sale from ₹1,825)\n"
+    "🔗 [View Product](https://maakaalicreations.in/products/designer-twill-net-saree-with-shimmering-sequin-all-over)\n\n"
+    
+    f"*View all products:* {ALL_PRODUCTS_URL}"
+), keyboard='back_to_menu', disable_web_page_preview=True)
+
+renderer.add_screen('fallback_blogs', (
+    f"{BRAND_LOGO} *📰 Latest Blog Articles*\n\n"
+    f"{BRAND_LOGO} *1.* **Why Fast Fashion's Impact on the Environment is a Big Deal**\n"
+    "📅 July 9, 2025\n"
+    "In recent years, the fashion industry has come under significant scrutiny for its role in environmental degradation...\n"
+    "🔗 [Read More](https://maakaalicreations.in/blogs/news/why-fast-fashions-impact-on-the-environment-is-a-big-deal)\n\n"
+    
+    f"{BRAND_LOGO} *2.* **How to Identify Quality Fabrics for Your Wardrobe**\n"
+    "📅 June 30, 2025\n"
+    "Selecting the right fabrics for your wardrobe is not just an essential skill for fashion enthusiasts but also for anyone who desires durable and stylish clothing...\n"
+    "🔗 [Read More](https://maakaalicreations.in/blogs/news/how-to-identify-quality-fabrics-for-your-wardrobe)\n\n"
+    
+    f"{BRAND_LOGO} *3.* **The Art of Saree Draping: Traditional Techniques**\n"
+    "📅 June 15, 2025\n"
+    "Discover the beautiful art of saree draping with traditional techniques that have been passed down through generations...\n"
+    "🔗 [Read More](https://maakaalicreations.in/blogs/news/the-art-of-saree-draping)\n\n"
+    
+    f"*Visit our blog:* {STORE_URL}blogs/news"
+), keyboard='back_to_menu', disable_web_page_preview=True)
+
+# =============================================================================
+# LOGO FILE_ID CACHE
+# =============================================================================
+
+# Telegram file_id of the uploaded logo, keyed by the logo's content hash
+_logo_cache: Dict[str, Optional[str]] = {'sha256': None, 'file_id': None}
+_logo_stat: Dict[str, Any] = {'signature': None, 'sha256': None}
+
+def _hash_logo_file() -> Optional[str]:
+    """Return the SHA-256 of the logo file, rehashing only when its size/mtime change"""
+    try:
+        stat = os.stat(LOGO_PATH)
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_size, stat.st_mtime_ns)
+    if _logo_stat['signature'] != signature:
+        with open(LOGO_PATH, 'rb') as logo_file:
+            _logo_stat['sha256'] = hashlib.sha256(logo_file.read()).hexdigest()
+        _logo_stat['signature'] = signature
+    return _logo_stat['sha256']
+
+def _read_logo_file() -> bytes:
+    """Read the logo file for upload"""
+    with open(LOGO_PATH, 'rb') as logo_file:
+        return logo_file.read()
+
+def load_logo_file_id() -> None:
+    """Load the persisted logo file_id from disk"""
+    try:
+        with open(LOGO_FILE_ID_CACHE, 'r') as cache_file:
+            data = json.load(cache_file)
+        _logo_cache['sha256'] = data.get('sha256')
+        _logo_cache['file_id'] = data.get('file_id')
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read logo file_id cache: {e}")
+
+def save_logo_file_id(sha256: Optional[str], file_id: Optional[str]) -> None:
+    """Remember the logo file_id in memory and persist it to disk"""
+    _logo_cache['sha256'] = sha256
+    _logo_cache['file_id'] = file_id
+    try:
+        with open(LOGO_FILE_ID_CACHE, 'w') as cache_file:
+            json.dump(_logo_cache, cache_file)
+    except OSError as e:
+        logger.warning(f"Could not write logo file_id cache: {e}")
+
+async def reply_with_logo(message, caption: str) -> bool:
+    """Send the logo with a caption, reusing the cached file_id when possible.
+
+    Returns False if there is no logo file to send.
+    """
+    sha256 = await asyncio.to_thread(_hash_logo_file)
+    if sha256 is None:
+        return False
+    
+    # Reuse the uploaded file while the logo on disk is unchanged
+    if _logo_cache['file_id'] and _logo_cache['sha256'] == sha256:
+        try:
+            await message.reply_photo(
+                photo=_logo_cache['file_id'],
+                caption=caption,
+                parse_mode='Markdown'
+            )
+            return True
+        except BadRequest as e:
+            logger.warning(f"Cached logo file_id rejected, re-uploading: {e}")
+    
+    logo_bytes = await asyncio.to_thread(_read_logo_file)
+    sent = await message.reply_photo(
+        photo=InputFile(logo_bytes, filename=os.path.basename(LOGO_PATH)),
+        caption=caption,
+        parse_mode='Markdown'
+    )
+    if sent.photo:
+        await asyncio.to_thread(save_logo_file_id, sha256, sent.photo[-1].file_id)
+    return True
+
+# =============================================================================
+# PRODUCT PHOTO CARDS
+# =============================================================================
+
+# Telegram file_ids of uploaded product images, kept in bot_data across restarts (see post_init/post_shutdown)
+photo_cards = PhotoCards(max_entries=PHOTO_CACHE_MAX_ENTRIES, image_width=PHOTO_CARD_WIDTH)
+
+def format_product_caption(product: Dict, number: int) -> str:
+    """Format a product as a photo caption"""
+    return f"*{number}.* {format_product_message(product)}"
+
 # =============================================================================
 # COMMAND HANDLERS
 # =============================================================================
 
+@timed_handler
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle the /start command"""
     # Validate user
@@ -277,15 +1081,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         "• Secure payment options\n\n"
     )
     
-    # Try to send logo image if it exists
-    try:
-        with open('logo.png', 'rb') as logo_file:
-            await update.message.reply_photo(
-                photo=logo_file,
-                caption=welcome_message,
-                parse_mode='Markdown'
-            )
-    except FileNotFoundError:
+    # Send logo image if it exists, reusing the uploaded file_id
+    if not await reply_with_logo(update.message, welcome_message):
         # If logo file doesn't exist, just send the welcome message
         await update.message.reply_text(
             welcome_message,
@@ -298,6 +1095,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         reply_markup=create_main_menu_keyboard()
     )
 
+@timed_handler
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle the /help command"""
     # Validate user
@@ -305,32 +1103,171 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         await update.message.reply_text("❌ Invalid user. Please try again.")
         return
     
-    help_message = (
-        f"{BRAND_LOGO} *Maa Kaali Creations Bot Help* 📚\n\n"
-        "*Available Commands:*\n"
-        "• /start - Show main menu\n"
-        "• /help - Show this help message\n\n"
-        "*Features:*\n"
-        "• Browse our saree collection\n"
-        "• View current offers and discounts\n"
-        "• Place orders online\n"
-        "• Ask questions\n"
-        "• Read our blog articles\n"
-        "• Contact us\n"
-        "• Follow us on social media\n\n"
-        "For any issues, contact our support team."
+    await renderer.screen('help').reply(update.message)
+
+async def reply_with_order_status(message, user, text: str) -> bool:
+    """Reply with the status of the order in text; returns False if text lacks an order number and contact"""
+    number, email, phone = parse_order_query(text)
+    if not number or not (email or phone):
+        return False
+    
+    try:
+        order = await asyncio.wait_for(lookup_order(number), HANDLER_FETCH_DEADLINE)
+    except Exception as e:
+        # Shopify unavailable: hand the request to the admin instead
+        logger.error(f"Error looking up order {number}: {e}")
+        admin_message = (
+            f"{BRAND_LOGO} *📦 Order Tracking Request*\n\n"
+            f"*User:* {user.first_name} (@{user.username})\n"
+            f"*User ID:* {user.id}\n"
+            f"*Order Number:* {text}"
+        )
+        admin_queue.enqueue(ADMIN_CHAT_ID, admin_message, digest=True, parse_mode='Markdown')
+        await message.reply_text(
+            f"{BRAND_LOGO} *✅ Order Number Received!*\n\n"
+            "We'll check your order status and get back to you soon!\n\n"
+            f"You can also track your order directly: {TRACKING_URL}",
+            reply_markup=create_back_to_menu_keyboard(),
+            parse_mode='Markdown'
+        )
+        return True
+    
+    # Same reply for unknown orders and wrong contacts, so order numbers can't be probed
+    if order is None or not order_matches_contact(order, email, phone):
+        await message.reply_text(
+            f"{BRAND_LOGO} *🔍 Order Not Found*\n\n"
+            "We couldn't find an order with that number and email/phone. Please check them and try again.\n\n"
+            f"You can also track your order on our website: {TRACKING_URL}",
+            reply_markup=create_back_to_menu_keyboard(),
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+        return True
+    
+    await message.reply_text(
+        f"{BRAND_LOGO} *📦 Order Status*\n\n{format_order_status(order)}",
+        reply_markup=create_back_to_menu_keyboard(),
+        parse_mode='Markdown',
+        disable_web_page_preview=True
+    )
+    return True
+
+@timed_handler
+async def order_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle the /order command"""
+    # Validate user
+    if not is_valid_user(update.message.from_user):
+        await update.message.reply_text("❌ Invalid user. Please try again.")
+        return
+    
+    user = update.message.from_user
+    text = sanitize_input(" ".join(context.args or []))
+    if text and not rate_limit_check(user.id, 'order_lookup'):
+        await update.message.reply_text(
+            f"{BRAND_LOGO} *⚠️ Rate Limit Exceeded*\n\n"
+            "You've checked orders too often recently. Please wait a bit before trying again.\n\n"
+            f"You can also track your order directly: {TRACKING_URL}",
+            reply_markup=create_back_to_menu_keyboard(),
+            parse_mode='Markdown'
+        )
+        return
+    
+    if not text or not await reply_with_order_status(update.message, user, text):
+        context.user_data['waiting_for_order_number'] = True
+        await renderer.screen('track_order').reply(update.message)
+
+async def reply_with_search_results(message, text: str) -> bool:
+    """Reply with products matching text; returns False if nothing matched"""
+    products = product_index.search(text, limit=SEARCH_RESULTS_LIMIT)
+    if not products:
+        return False
+    
+    reply = MessageBuilder(
+        header=f"{BRAND_LOGO} *🔍 Matching Sarees*\n\n",
+        footer=f"\n*View all products:* {ALL_PRODUCTS_URL}"
     )
+    for i, product in enumerate(products, 1):
+        reply.add(f"*{i}.* {format_product_message(product)}\n")
     
-    await update.message.reply_text(
-        help_message,
+    await reply.reply(
+        message,
         reply_markup=create_back_to_menu_keyboard(),
-        parse_mode='Markdown'
+        parse_mode='Markdown',
+        disable_web_page_preview=True
     )
+    return True
+
+@timed_handler
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle the /search command"""
+    # Validate user
+    if not is_valid_user(update.message.from_user):
+        await update.message.reply_text("❌ Invalid user. Please try again.")
+        return
+    
+    text = sanitize_input(" ".join(context.args or []))
+    if not text:
+        await update.message.reply_text(
+            f"{BRAND_LOGO} *🔍 Search*\n\n"
+            "Type what you are looking for after the command, for example:\n"
+            "`/search red kanjeevaram`",
+            reply_markup=create_back_to_menu_keyboard(),
+            parse_mode='Markdown'
+        )
+        return
+    
+    if not rate_limit_check(update.message.from_user.id, 'search'):
+        await update.message.reply_text(
+            f"{BRAND_LOGO} *⚠️ Rate Limit Exceeded*\n\n"
+            "You've searched a lot in the last minute. Please wait a moment and try again.",
+            reply_markup=create_back_to_menu_keyboard(),
+            parse_mode='Markdown'
+        )
+        return
+    
+    if not await reply_with_search_results(update.message, text):
+        await update.message.reply_text(
+            f"{BRAND_LOGO} *🔍 No Matches*\n\n"
+            "We couldn't find sarees matching your search. Try other words or browse everything:\n"
+            f"{ALL_PRODUCTS_URL}",
+            reply_markup=create_back_to_menu_keyboard(),
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+
+@timed_handler
+async def handle_inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer inline queries (@bot red saree) from the search index"""
+    if not rate_limit_check(update.inline_query.from_user.id, 'inline_search'):
+        return
+    
+    text = sanitize_input(update.inline_query.query)
+    products = product_index.search(text, limit=INLINE_RESULTS_LIMIT) if text else []
+    
+    results = []
+    for product in products:
+        url = f"{STORE_URL}products/{product['handle']}"
+        results.append(InlineQueryResultArticle(
+            id=str(product['id']),
+            title=product['title'],
+            description=f"₹{product['variants'][0]['price']}",
+            url=url,
+            thumbnail_url=product['image']['src'] if product['image'] else None,
+            input_message_content=InputTextMessageContent(
+                format_product_message(product),
+                parse_mode='Markdown'
+            )
+        ))
+    await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME)
 
 # =============================================================================
 # CALLBACK QUERY HANDLERS
 # =============================================================================
 
+# Inline button routes by callback_data prefix, registered after the handlers below
+callback_router = CallbackRouter(on_dispatch=record_callback_route)
+
+@timed_handler
 async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle callback queries from inline keyboards"""
     query = update.callback_query
@@ -352,154 +1289,146 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
             logger.error(f"Error answering callback query: {e}")
             return
     
-    if query.data == "back_to_menu":
-        await show_main_menu(query)
-    elif query.data == "browse_collection":
-        await browse_collection(query)
-    elif query.data == "view_offers":
-        await view_offers(query)
-    elif query.data == "place_order":
-        await place_order(query)
-    elif query.data == "ask_question":
-        await ask_question(query, context)
-    elif query.data == "view_blogs":
-        await view_blogs(query)
-    elif query.data == "contact_us":
-        await contact_us(query)
-    elif query.data == "follow_us":
-        await follow_us(query)
-
-async def show_main_menu(query) -> None:
+    # Look up the handler for the button's callback_data prefix
+    await callback_router.dispatch(query, context)
+
+async def show_main_menu(query, context) -> None:
     """Show the main menu"""
-    welcome_message = (
-        f"{BRAND_LOGO} *Maa Kaali Creations* 🎉\n\n"
-        "Choose an option from the menu below:"
-    )
-    await query.edit_message_text(
-        welcome_message,
-        reply_markup=create_main_menu_keyboard(),
-        parse_mode='Markdown'
-    )
+    await renderer.screen('main_menu').edit(query)
 
-async def browse_collection(query) -> None:
-    """Handle browse collection request"""
-    await query.edit_message_text(
-        f"{BRAND_LOGO} *🛍 Fetching our saree collection...*",
-        parse_mode='Markdown'
-    )
+async def start_browsing(query, context) -> None:
+    """Handle browse collection request from the menu, starting at the first page"""
+    catalog_pager.reset(query.message.chat_id)
+    await browse_collection(query, context)
+
+async def browse_collection(query, context, page: int = 0) -> None:
+    """Handle browse collection request for one page of the catalog"""
+    chat_id = query.message.chat_id
+    calls = {'page': catalog_pager.get_page(chat_id, page)}
+    if not catalog_pager.is_cached(chat_id, page):
+        # Show the placeholder while the page loads, under one deadline
+        calls['placeholder'] = query.edit_message_text(
+            f"{BRAND_LOGO} *🛍 Fetching our saree collection...*",
+            parse_mode='Markdown'
+        )
+    results = await gather_with_deadline(calls, timeout=HANDLER_FETCH_DEADLINE)
+    catalog_page = results['page']
     
-    products = fetch_products(limit=5)
+    if catalog_page is None and page > 0:
+        # Page no longer reachable (e.g. after a restart): start over
+        catalog_pager.reset(chat_id)
+        await browse_collection(query, context)
+        return
+    
+    products = catalog_page['products'] if catalog_page else []
     
     if not products:
         # Fallback to static product list based on your website
-        message = (
-            f"{BRAND_LOGO} *🛍 Our Saree Collection*\n\n"
-            f"{BRAND_LOGO} *Featured Products:*\n\n"
-            f"{BRAND_LOGO} *1.* **Aqua Blue Embroidered Twill Net Saree**\n"
-            "💰 Price: ₹385 (Sale from ₹925)\n"
-            "🔗 [View Product](https://maakaalicreations.in/products/aqua-blue-embroidered-twill-net-saree-with-running-blouse)\n\n"
-            
-            f"{BRAND_LOGO} *2.* **Beautiful Digital Printed Crepe Silk Saree**\n"
-            "💰 Price: ₹405 (Sale from ₹1,005)\n"
-            "🔗 [View Product](https://maakaalicreations.in/products/beautiful-digital-printed-crepe-silk-saree)\n\n"
-            
-            f"{BRAND_LOGO} *3.* **Crimson Bloom Net Saree with Embroidered Work**\n"
-            "💰 Price: ₹345 (Sale from ₹1,025)\n"
-            "🔗 [View Product](https://maakaalicreations.in/products/crimson-bloom-net-saree-with-embroidered-work)\n\n"
-            
-            f"{BRAND_LOGO} *4.* **Designer Kanjeevaram Silk Saree**\n"
-            "💰 Price: ₹515\n"
-            "🔗 [View Product](https://maakaalicreations.in/products/designer-kanjeevaram-silk-saree-with-golden-zari-work)\n\n"
-            
-            f"{BRAND_LOGO} *5.* **Designer Twill Net Saree with Sequin Work**\n"
-            "💰 Price: ₹655 (Sale from ₹1,825)\n"
-            "🔗 [View Product](https://maakaalicreations.in/products/designer-twill-net-saree-with-shimmering-sequin-all-over)\n\n"
-            
-            f"*View all products:* {ALL_PRODUCTS_URL}"
-        )
-    else:
-        message = f"{BRAND_LOGO} *🛍 Our Saree Collection*\n\n"
-        for i, product in enumerate(products, 1):
-            message += f"*{i}.* {format_product_message(product)}\n"
-        message += f"\n*View all products:* {ALL_PRODUCTS_URL}"
+        static_fallbacks.inc('catalog')
+        await renderer.screen('fallback_catalog').edit(query)
+        return
     
-    await query.edit_message_text(
-        message,
-        reply_markup=create_back_to_menu_keyboard(),
+    message = MessageBuilder(
+        header=f"{BRAND_LOGO} *🛍 Our Saree Collection* (page {page + 1})\n\n",
+        footer=f"\n*View all products:* {ALL_PRODUCTS_URL}"
+    )
+    first_number = page * FEATURED_PRODUCTS_LIMIT + 1
+    for i, product in enumerate(products, first_number):
+        message.add(f"*{i}.* {format_product_message(product)}\n")
+    
+    await message.edit(
+        query,
+        reply_markup=create_browse_keyboard(page, has_next=bool(catalog_page.get('next'))),
         parse_mode='Markdown',
         disable_web_page_preview=True
     )
+    
+    # Load the next page while the user reads this one
+    if catalog_page and catalog_page.get('next'):
+        catalog_pager.prefetch(chat_id, page + 1)
 
-async def view_offers(query) -> None:
+async def show_photo_cards(query, context, page: int) -> None:
+    """Send the products of a catalog page as photo cards"""
+    chat_id = query.message.chat_id
+    results = await gather_with_deadline(
+        {'page': catalog_pager.get_page(chat_id, page)}, timeout=HANDLER_FETCH_DEADLINE
+    )
+    products = results['page']['products'] if results['page'] else []
+    first_number = page * FEATURED_PRODUCTS_LIMIT + 1
+    captions = [format_product_caption(product, i) for i, product in enumerate(products, first_number)]
+    
+    try:
+        sent = await photo_cards.send(context.bot, chat_id, products, captions)
+    except Exception as e:
+        logger.error(f"Error sending photo cards: {e}")
+        sent = 0
+    if not sent:
+        await query.message.reply_text(
+            f"{BRAND_LOGO} Photos aren't available right now. See them all at {ALL_PRODUCTS_URL}",
+            disable_web_page_preview=True
+        )
+
+async def view_offers(query, context) -> None:
     """Handle view offers request"""
-    # Try to find offers collection
-    offers_collection_id = find_collection_by_title("offers")
+    calls = {'products': fetch_offer_products()}
+    if not offer_products_cached():
+        # Show the placeholder while the offers load, under one deadline
+        calls['placeholder'] = query.edit_message_text(
+            f"{BRAND_LOGO} *💰 Fetching current offers...*",
+            parse_mode='Markdown'
+        )
+    results = await gather_with_deadline(calls, timeout=HANDLER_FETCH_DEADLINE)
+    products = results['products']
     
-    if offers_collection_id:
-        products = fetch_products(limit=5, collection_id=offers_collection_id)
-        if products:
-            message = f"{BRAND_LOGO} *💰 Current Offers*\n\n"
-            for i, product in enumerate(products, 1):
-                message += f"*{i}.* {format_product_message(product)}\n"
-        else:
-            message = get_default_offers_message()
-    else:
-        message = get_default_offers_message()
+    if not products:
+        static_fallbacks.inc('offers')
+        await renderer.screen('default_offers').edit(query)
+        return
     
-    await query.edit_message_text(
-        message,
+    message = MessageBuilder(header=f"{BRAND_LOGO} *💰 Current Offers*\n\n")
+    for i, product in enumerate(products, 1):
+        message.add(f"*{i}.* {format_product_message(product)}\n")
+    
+    await message.edit(
+        query,
         reply_markup=create_back_to_menu_keyboard(),
         parse_mode='Markdown',
         disable_web_page_preview=True
     )
 
-def get_default_offers_message() -> str:
-    """Get default offers message"""
-    return (
-        f"{BRAND_LOGO} *💰 Special Offers*\n\n"
-        "🎁 *EXCLUSIVE DISCOUNTS FOR YOU!*\n\n"
-        "🔥 *Get Up To 5% OFF*\n"
-        "• On prepaid orders\n"
-        "• Minimum purchase of ₹300.00\n"
-        "• Automatic discount applied\n\n"
-        "🎯 *Up To 25% OFF*\n"
-        "• For first purchase only\n"
-        "• New customers exclusive\n"
-        "• One-time use per customer\n"
-        "• Use code: `SAVE25`\n\n"
-        "🚚 *FREE SHIPPING*\n"
-        "• Free shipping on all orders\n"
-        "• No minimum purchase required\n"
-        "• Fast and reliable delivery\n\n"
-        "💎 *Premium Silk Sarees* at affordable prices\n"
-        "✨ *Limited time offers - Shop now!*\n\n"
-        f"*Shop now:* {ALL_PRODUCTS_URL}"
+async def fetch_offer_products() -> List[Dict]:
+    """Fetch products of the offers collection, if there is one"""
+    offers_collection_id = await find_collection_by_title("offers")
+    if not offers_collection_id:
+        return []
+    return await fetch_products(limit=FEATURED_PRODUCTS_LIMIT, collection_id=offers_collection_id)
+
+def offer_products_cached() -> bool:
+    """Whether fetch_offer_products() can answer from memory without calling Shopify"""
+    if collection_index.built_at is None:
+        return False
+    offers_collection_id = collection_index.find("offers")
+    if not offers_collection_id:
+        return True
+    return catalog_cache.is_cached(
+        CatalogCache.make_key("products", offers_collection_id, limit=FEATURED_PRODUCTS_LIMIT)
     )
 
-async def place_order(query) -> None:
+async def place_order(query, context) -> None:
     """Handle place order request"""
-    message = (
-        f"{BRAND_LOGO} *📝 Place an Order Online*\n\n"
-        "Ready to shop? Visit our online store to browse our complete collection!\n\n"
-        "🛒 *Features:*\n"
-        "• Secure payment options\n"
-        "• Free shipping on all orders\n"
-        "• Easy returns and exchanges\n"
-        "• 24/7 customer support\n\n"
-        f"*🛍 Shop Now:* {STORE_URL}\n\n"
-        "💡 *Tip:* Use code `SAVE25` and get Upto 25% off on your first Order!"
-    )
+    await renderer.screen('place_order').edit(query)
+
+async def track_order(query, context) -> None:
+    """Handle track order request"""
+    # Set user state to waiting for order number
+    context.user_data['waiting_for_order_number'] = True
     
-    await query.edit_message_text(
-        message,
-        reply_markup=create_back_to_menu_keyboard(),
-        parse_mode='Markdown'
-    )
+    await renderer.screen('track_order').edit(query)
 
 async def ask_question(query, context) -> None:
     """Handle ask question request"""
-    # Check rate limiting
-    if not rate_limit_check(query.from_user.id, context):
+    # Check rate limiting (the hit is counted when the question is sent)
+    if is_rate_limited(query.from_user.id):
         await query.edit_message_text(
             f"{BRAND_LOGO} *⚠️ Rate Limit Exceeded*\n\n"
             "You've asked too many questions recently. Please wait a bit before asking another question.",
@@ -511,123 +1440,62 @@ async def ask_question(query, context) -> None:
     # Set user state to waiting for question
     context.user_data['waiting_for_question'] = True
     
-    message = (
-        f"{BRAND_LOGO} *❓ Ask a Question*\n\n"
-        "Have a question about our products or services?\n\n"
-        "Simply type your question below and we'll get back to you soon!\n\n"
-        "📝 *You can ask about:*\n"
-        "• Product details and availability\n"
-        "• Sizing and measurements\n"
-        "• Shipping and delivery\n"
-        "• Returns and exchanges\n"
-        "• Payment options\n"
-        "• Any other queries\n\n"
-        "💡 *Just type your question in the chat below!*\n\n"
-        "⚠️ *Note:* Please be respectful and avoid spam."
-    )
-    
-    await query.edit_message_text(
-        message,
-        reply_markup=create_back_to_menu_keyboard(),
-        parse_mode='Markdown'
-    )
+    await renderer.screen('ask_question').edit(query)
 
-async def view_blogs(query) -> None:
+async def view_blogs(query, context) -> None:
     """Handle view blogs request"""
-    await query.edit_message_text(
-        f"{BRAND_LOGO} *📰 Fetching latest blog articles...*",
-        parse_mode='Markdown'
-    )
-    
-    articles = fetch_blog_articles(limit=3)
+    calls = {'articles': fetch_blog_articles(limit=BLOG_ARTICLES_LIMIT)}
+    if not catalog_cache.is_cached(CatalogCache.make_key("blogs/1/articles", limit=BLOG_ARTICLES_LIMIT)):
+        # Show the placeholder while the articles load, under one deadline
+        calls['placeholder'] = query.edit_message_text(
+            f"{BRAND_LOGO} *📰 Fetching latest blog articles...*",
+            parse_mode='Markdown'
+        )
+    results = await gather_with_deadline(calls, timeout=HANDLER_FETCH_DEADLINE)
+    articles = results['articles']
     
     if not articles:
         # Fallback to static blog articles based on your website
-        message = (
-            f"{BRAND_LOGO} *📰 Latest Blog Articles*\n\n"
-            f"{BRAND_LOGO} *1.* **Why Fast Fashion's Impact on the Environment is a Big Deal**\n"
-            "📅 July 9, 2025\n"
-            "In recent years, the fashion industry has come under significant scrutiny for its role in environmental degradation...\n"
-            "🔗 [Read More](https://maakaalicreations.in/blogs/news/why-fast-fashions-impact-on-the-environment-is-a-big-deal)\n\n"
-            
-            f"{BRAND_LOGO} *2.* **How to Identify Quality Fabrics for Your Wardrobe**\n"
-            "📅 June 30, 2025\n"
-            "Selecting the right fabrics for your wardrobe is not just an essential skill for fashion enthusiasts but also for anyone who desires durable and stylish clothing...\n"
-            "🔗 [Read More](https://maakaalicreations.in/blogs/news/how-to-identify-quality-fabrics-for-your-wardrobe)\n\n"
-            
-            f"{BRAND_LOGO} *3.* **The Art of Saree Draping: Traditional Techniques**\n"
-            "📅 June 15, 2025\n"
-            "Discover the beautiful art of saree draping with traditional techniques that have been passed down through generations...\n"
-            "🔗 [Read More](https://maakaalicreations.in/blogs/news/the-art-of-saree-draping)\n\n"
-            
-            f"*Visit our blog:* {STORE_URL}blogs/news"
-        )
-    else:
-        message = f"{BRAND_LOGO} *📰 Latest Blog Articles*\n\n"
-        for i, article in enumerate(articles, 1):
-            message += f"*{i}.* {format_blog_message(article)}\n"
+        static_fallbacks.inc('blogs')
+        await renderer.screen('fallback_blogs').edit(query)
+        return
     
-    await query.edit_message_text(
-        message,
+    message = MessageBuilder(header=f"{BRAND_LOGO} *📰 Latest Blog Articles*\n\n")
+    for i, article in enumerate(articles, 1):
+        message.add(f"*{i}.* {format_blog_message(article)}\n")
+    
+    await message.edit(
+        query,
         reply_markup=create_back_to_menu_keyboard(),
         parse_mode='Markdown',
         disable_web_page_preview=True
     )
 
-async def contact_us(query) -> None:
+async def contact_us(query, context) -> None:
     """Handle contact us request"""
-    message = (
-        f"{BRAND_LOGO} 📞 Contact Us\n\n"
-        "Get in touch with us through any of these channels:\n\n"
-        f"📱 Call: {CONTACT_INFO['phone']}\n"
-        f"💬 WhatsApp: {CONTACT_INFO['whatsapp']}\n"
-        f"📧 Email: {CONTACT_INFO['email']}\n"
-        f"🌐 Website: {CONTACT_INFO['website']}\n\n"
-        "📱 Social Media:\n"
-        f"• Instagram: {CONTACT_INFO['instagram']}\n"
-        f"• YouTube: {CONTACT_INFO['youtube']}\n"
-        f"• Facebook: {CONTACT_INFO['facebook']}\n"
-        f"• Twitter/X: {CONTACT_INFO['twitter']}\n"
-        f"• Pinterest: {CONTACT_INFO['pinterest']}\n"
-        f"• Threads: {CONTACT_INFO['threads']}\n\n"
-        "🕒 Business Hours:\n"
-        "24/7 Available - You can reach out to us anytime!\n\n"
-        "💝 We're here to help!"
-    )
-    
-    await query.edit_message_text(
-        message,
-        reply_markup=create_back_to_menu_keyboard(),
-        parse_mode=None,
-        disable_web_page_preview=True
-    )
+    await renderer.screen('contact_us').edit(query)
 
-async def follow_us(query) -> None:
+async def follow_us(query, context) -> None:
     """Handle follow us request"""
-    message = (
-        f"{BRAND_LOGO} 📱 Follow Us\n\n"
-        "Stay connected with us on social media for the latest updates, new arrivals, and exclusive offers!\n\n"
-        "🌟 Our Social Media:\n"
-        f"• Instagram: {CONTACT_INFO['instagram']}\n"
-        f"• YouTube: {CONTACT_INFO['youtube']}\n"
-        f"• Facebook: {CONTACT_INFO['facebook']}\n"
-        f"• Twitter/X: {CONTACT_INFO['twitter']}\n"
-        f"• Pinterest: {CONTACT_INFO['pinterest']}\n"
-        f"• Threads: {CONTACT_INFO['threads']}\n\n"
-        "🎯 Don't miss out on our latest updates!"
-    )
-    
-    await query.edit_message_text(
-        message,
-        reply_markup=create_back_to_menu_keyboard(),
-        parse_mode=None,
-        disable_web_page_preview=True
-    )
+    await renderer.screen('follow_us').edit(query)
+
+callback_router.add("back_to_menu", show_main_menu)
+callback_router.add("browse_collection", start_browsing)
+callback_router.add("browse_page", browse_collection, non_negative_int)
+callback_router.add("photo_cards", show_photo_cards, non_negative_int)
+callback_router.add("view_offers", view_offers)
+callback_router.add("place_order", place_order)
+callback_router.add("track_order", track_order)
+callback_router.add("ask_question", ask_question)
+callback_router.add("view_blogs", view_blogs)
+callback_router.add("contact_us", contact_us)
+callback_router.add("follow_us", follow_us)
 
 # =============================================================================
 # MESSAGE HANDLERS
 # =============================================================================
 
+@timed_handler
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle text messages from users"""
     # Validate user
@@ -654,7 +1522,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     # Check if user is waiting for a question
     if context.user_data.get('waiting_for_question'):
         # Check rate limiting
-        if not rate_limit_check(user.id, context):
+        if not rate_limit_check(user.id):
             await update.message.reply_text(
                 f"{BRAND_LOGO} *⚠️ Rate Limit Exceeded*\n\n"
                 "You've asked too many questions recently. Please wait a bit before asking another question.",
@@ -671,15 +1539,8 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             f"*Question:* {sanitized_text}"
         )
         
-        # Send to admin
-        try:
-            await context.bot.send_message(
-                chat_id=ADMIN_CHAT_ID,
-                text=admin_message,
-                parse_mode='Markdown'
-            )
-            
-            # Confirm to user
+        # Queue for the admin and confirm to the user right away
+        if admin_queue.enqueue(ADMIN_CHAT_ID, admin_message, digest=True, parse_mode='Markdown'):
             await update.message.reply_text(
                 f"{BRAND_LOGO} *✅ Question Received!*\n\n"
                 "Thank you for your question. We'll get back to you soon!\n\n"
@@ -687,8 +1548,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                 reply_markup=create_back_to_menu_keyboard(),
                 parse_mode='Markdown'
             )
-        except Exception as e:
-            logger.error(f"Error sending message to admin: {e}")
+        else:
             await update.message.reply_text(
                 f"{BRAND_LOGO} *❌ Error*\n\n"
                 "Sorry, there was an error sending your question. "
@@ -702,42 +1562,29 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     # Check if user is waiting for order number
     if context.user_data.get('waiting_for_order_number'):
-        admin_message = (
-            f"{BRAND_LOGO} *📦 Order Tracking Request*\n\n"
-            f"*User:* {user.first_name} (@{user.username})\n"
-            f"*User ID:* {user.id}\n"
-            f"*Order Number:* {sanitized_text}"
-        )
-        
-        # Send to admin
-        try:
-            await context.bot.send_message(
-                chat_id=ADMIN_CHAT_ID,
-                text=admin_message,
-                parse_mode='Markdown'
-            )
-            
-            # Confirm to user
+        if not rate_limit_check(user.id, 'order_lookup'):
             await update.message.reply_text(
-                f"{BRAND_LOGO} *✅ Order Number Received!*\n\n"
-                "We'll check your order status and get back to you soon!\n\n"
+                f"{BRAND_LOGO} *⚠️ Rate Limit Exceeded*\n\n"
+                "You've sent too many order numbers recently. Please wait a bit before trying again.\n\n"
                 f"You can also track your order directly: {TRACKING_URL}",
                 reply_markup=create_back_to_menu_keyboard(),
                 parse_mode='Markdown'
             )
-        except Exception as e:
-            logger.error(f"Error sending order number to admin: {e}")
-            await update.message.reply_text(
-                f"{BRAND_LOGO} *❌ Error*\n\n"
-                "Sorry, there was an error processing your order number. "
-                "Please try again later or contact us directly.",
-                reply_markup=create_back_to_menu_keyboard(),
-                parse_mode='Markdown'
-            )
+            context.user_data.pop('waiting_for_order_number', None)
+            return
+        
+        if not await reply_with_order_status(update.message, user, sanitized_text):
+            # Keep waiting so the user can resend in the right format
+            await renderer.screen('track_order').reply(update.message)
+            return
         
         context.user_data.pop('waiting_for_order_number', None)
         return
     
+    # Treat other text as a product search
+    if rate_limit_check(user.id, 'search') and await reply_with_search_results(update.message, sanitized_text):
+        return
+    
     # Default response for any other text
     await update.message.reply_text(
         f"{BRAND_LOGO} *🤖 Maa Kaali Creations Bot*\n\n"
@@ -747,39 +1594,215 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
 
 # =============================================================================
-# HEALTH CHECK SERVER
+# WEB SERVER (HEALTH CHECKS + TELEGRAM WEBHOOK)
 # =============================================================================
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/healthz':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(b"Bot is healthy!")
-        else:
-            self.send_response(404)
-            self.end_headers()
+async def note_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Record the update-processing heartbeat (runs before every other handler)"""
+    health_state['last_update'] = time.time()
 
-def start_health_server():
-    """Start a simple HTTP server for health checks"""
-    try:
-        port = int(os.getenv("PORT", 8080))
-        server = HTTPServer(('0.0.0.0', port), HealthCheckHandler)
-        print(f"🌐 Health check server running on port {port}")
-        server.serve_forever()
-    except OSError as e:
-        if "Address already in use" in str(e):
-            print(f"⚠️ Port {port} is already in use. Health server not started.")
-        else:
-            print(f"⚠️ Health server error: {e}")
-    except Exception as e:
-        print(f"⚠️ Health server error: {e}")
+def seconds_since(timestamp: Optional[float]) -> Optional[float]:
+    """Age of a health_state timestamp, rounded for display"""
+    return round(time.time() - timestamp, 1) if timestamp is not None else None
+
+def liveness_checks(application: Application) -> Dict[str, Dict[str, Any]]:
+    """Whether the bot is still processing updates (a failing check means restart it)"""
+    now = time.time()
+    queued = application.update_queue.qsize()
+    pending = update_processor.pending if update_processor is not None else 0  # Taken off the queue but not finished
+    last_update = health_state['last_update'] or health_state['started_at']
+    checks = {
+        'application': {'ok': application.running},
+        'updates': {
+            'ok': not (queued or pending) or now - last_update <= LIVENESS_MAX_QUEUE_WAIT,
+            'queued': queued,
+            'pending': pending,
+            'last_update_age': seconds_since(health_state['last_update']),
+        },
+        'event_loop': {'ok': True, 'lag': round(loop_lag.values.get((), 0.0), 3), 'stalls': stall_detector.counters['stalls']},
+    }
+    if BOT_RUN_MODE == 'polling':
+        last_poll = health_state['last_poll'] or health_state['started_at']
+        checks['polling'] = {
+            'ok': application.updater.running and now - last_poll <= LIVENESS_MAX_POLL_AGE,
+            'last_poll_age': seconds_since(health_state['last_poll']),
+        }
+    return checks
+
+def readiness_checks(application: Application) -> Dict[str, Dict[str, Any]]:
+    """Liveness plus whether the bot can serve users well (a failing check means route around it)"""
+    now = time.time()
+    checks = liveness_checks(application)
+    last_success = health_state['shopify_last_success']
+    last_failure = health_state['shopify_last_failure']
+    failing_since = last_success or health_state['started_at']
+    checks['shopify'] = {
+        'ok': not last_failure or (last_success or 0) > last_failure or now - failing_since <= READINESS_MAX_SHOPIFY_OUTAGE,
+        'last_success_age': seconds_since(last_success),
+        'last_failure_age': seconds_since(last_failure),
+    }
+    checks['admin_queue'] = {
+        'ok': len(admin_queue) < admin_queue.max_queued * READINESS_MAX_QUEUE_FILL,
+        'queued': len(admin_queue),
+    }
+    catalog_age = catalog_cache.age(CatalogCache.make_key("products_page", limit=FEATURED_PRODUCTS_LIMIT))
+    checks['catalog'] = {
+        'ok': catalog_age is not None and catalog_age <= CATALOG_CACHE_TTL + CATALOG_CACHE_MAX_STALE,
+        'age': round(catalog_age, 1) if catalog_age is not None else None,
+        'last_warmed_age': seconds_since(warmer_state['last_success']),
+    }
+    return checks
+
+def health_response(checks: Dict[str, Dict[str, Any]]) -> Response:
+    """200 with the checks if all pass, else 503"""
+    healthy = all(check['ok'] for check in checks.values())
+    return Response.json({'status': 'ok' if healthy else 'fail', 'checks': checks}, 200 if healthy else 503)
+
+def make_health_endpoints(application: Application):
+    """Create the liveness and readiness endpoints"""
+    async def livez(request: Request) -> Response:
+        return health_response(liveness_checks(application))
+    
+    async def readyz(request: Request) -> Response:
+        return health_response(readiness_checks(application))
+    
+    return livez, readyz
+
+async def stats(request: Request) -> Response:
+    """Cache and Shopify rate limiter statistics endpoint"""
+    data = {
+        'catalog_cache': catalog_cache.stats(),
+        'catalog_pager': catalog_pager.stats(),
+        'shopify': shopify.stats(),
+        'rate_limits': rate_limiter.stats(),
+        'admin_queue': admin_queue.stats(),
+        'photo_cards': photo_cards.stats(),
+        'callbacks': callback_router.stats(),
+        'event_loop_stalls': stall_detector.stats(),
+        'orders': {'indexed': len(order_index), 'lookup_cache': order_cache.stats()}
+    }
+    if persistence is not None:
+        data['persistence'] = persistence.stats()
+    if update_processor is not None:
+        data['updates'] = update_processor.stats()
+    return Response.json(data)
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus metrics endpoint"""
+    return Response(body=metrics.render().encode(), content_type=METRICS_CONTENT_TYPE)
+
+def make_telegram_webhook(application: Application):
+    """Create the endpoint Telegram posts updates to in webhook mode"""
+    async def telegram_webhook(request: Request) -> Response:
+        if WEBHOOK_SECRET_TOKEN and request.headers.get('x-telegram-bot-api-secret-token') != WEBHOOK_SECRET_TOKEN:
+            return Response.text("Forbidden", 403)
+        try:
+            update = Update.de_json(request.json(), application.bot)
+        except ValueError:
+            return Response.text("Bad Request", 400)
+        await application.update_queue.put(update)
+        return Response.text("OK")
+    return telegram_webhook
+
+def create_web_server(application: Application) -> WebServer:
+    """Create the web server with health, Shopify webhook and (in webhook mode) Telegram routes"""
+    server = WebServer(port=PORT)
+    livez, readyz = make_health_endpoints(application)
+    server.add_route('GET', '/healthz', livez)  # Kept for existing health checks
+    server.add_route('GET', '/livez', livez)
+    server.add_route('GET', '/readyz', readyz)
+    server.add_route('GET', '/stats', stats)
+    server.add_route('GET', '/metrics', metrics_endpoint)
+    if BOT_RUN_MODE == 'webhook':
+        server.add_route('POST', WEBHOOK_PATH, make_telegram_webhook(application))
+    if SHOPIFY_WEBHOOK_SECRET:
+        server.add_route('POST', SHOPIFY_WEBHOOK_PATH, shopify_webhook)
+    return server
 
 # =============================================================================
 # MAIN APPLICATION SETUP
 # =============================================================================
 
+# Admin notifications go out in the background, paced for Telegram's flood limits
+admin_queue = SendQueue(chat_interval=ADMIN_SEND_INTERVAL, digest_window=ADMIN_DIGEST_WINDOW)
+
+# Updates from different chats run concurrently; each chat's updates stay in order
+update_processor = (
+    ChatOrderedUpdateProcessor(concurrency=CONCURRENT_UPDATES, max_pending=MAX_PENDING_UPDATES)
+    if CONCURRENT_UPDATES > 1 else None
+)
+
+# user_data/bot_data (pending questions, rate limits) survive restarts in SQLite
+persistence = SQLitePersistence(PERSISTENCE_PATH, update_interval=PERSISTENCE_UPDATE_INTERVAL) if PERSISTENCE_PATH else None
+
+async def post_init(application: Application) -> None:
+    """Open shared resources once the Application is initialized"""
+    await shopify.start()
+    rate_limiter.load(application.bot_data.pop('rate_limits', None))
+    photo_cards.load(application.bot_data.pop('photo_file_ids', None))
+    load_logo_file_id()
+    restore_catalog_snapshot()
+    await admin_queue.start(application.bot)
+    await loop_lag_monitor.start()
+    if STALL_THRESHOLD > 0:
+        await stall_detector.start()
+
+async def post_shutdown(application: Application) -> None:
+    """Release shared resources when the Application shuts down"""
+    if update_processor is not None:
+        await update_processor.drain(UPDATE_DRAIN_TIMEOUT)  # Let running handlers finish before closing what they use
+    await stall_detector.stop()
+    await loop_lag_monitor.stop()
+    await admin_queue.stop()
+    await save_catalog_snapshot()
+    application.bot_data['rate_limits'] = rate_limiter.export()  # Written by the final persistence flush
+    application.bot_data['photo_file_ids'] = photo_cards.export()
+    await photo_cards.close()
+    await shopify.close()
+
+async def run_bot(application: Application) -> None:
+    """Run the bot and the web server on one event loop until SIGINT/SIGTERM"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    
+    server = create_web_server(application)
+    await application.initialize()
+    await post_init(application)
+    try:
+        try:
+            await server.start()
+            print(f"🌐 Web server running on port {PORT}")
+        except OSError as e:
+            if BOT_RUN_MODE == 'webhook':
+                raise
+            print(f"⚠️ Web server not started: {e}")
+        
+        await application.start()
+        if BOT_RUN_MODE == 'webhook':
+            await application.bot.set_webhook(
+                url=WEBHOOK_URL.rstrip('/') + WEBHOOK_PATH,
+                secret_token=WEBHOOK_SECRET_TOKEN or None,
+                allowed_updates=Update.ALL_TYPES
+            )
+            print(f"🔗 Receiving updates via webhook at {WEBHOOK_PATH}")
+        else:
+            await application.updater.start_polling()
+            print("🔄 Receiving updates via long polling")
+        print("📱 Bot is now running. Press Ctrl+C to stop.")
+        
+        await stop_event.wait()
+    finally:
+        print("🛑 Shutting down...")
+        if application.updater.running:
+            await application.updater.stop()
+        if application.running:
+            await application.stop()
+        await server.stop()
+        await post_shutdown(application)
+        await application.shutdown()
+
 def main() -> None:
     """Start the bot"""
     # Validate environment variables
@@ -795,17 +1818,38 @@ def main() -> None:
         print("❌ Error: SHOPIFY_API_ACCESS_TOKEN not set. Please set the SHOPIFY_API_ACCESS_TOKEN environment variable.")
         return
     
+    if BOT_RUN_MODE not in ('polling', 'webhook'):
+        print(f"❌ Error: BOT_RUN_MODE must be 'polling' or 'webhook', not '{BOT_RUN_MODE}'.")
+        return
+    
+    if BOT_RUN_MODE == 'webhook' and not WEBHOOK_URL:
+        print("❌ Error: WEBHOOK_URL not set. Please set the WEBHOOK_URL environment variable for webhook mode.")
+        return
+    
     try:
-        # Start health check server in background
-        health_thread = threading.Thread(target=start_health_server, daemon=True)
-        health_thread.start()
-        
         # Create the Application
-        application = Application.builder().token(BOT_TOKEN).build()
+        builder = (
+            Application.builder().token(BOT_TOKEN)
+            .request(InstrumentedRequest(connection_pool_size=256))
+            .get_updates_request(InstrumentedRequest())
+        )
+        if persistence is not None:
+            builder.persistence(persistence)
+        if update_processor is not None:
+            builder.concurrent_updates(update_processor)
+        application = builder.build()
+        
+        # Record the update-processing heartbeat for /livez before any other handler runs
+        application.add_handler(TypeHandler(Update, note_update), group=-1)
         
         # Add command handlers
         application.add_handler(CommandHandler("start", start_command))
         application.add_handler(CommandHandler("help", help_command))
+        application.add_handler(CommandHandler("search", search_command))
+        application.add_handler(CommandHandler("order", order_command))
+        
+        # Add inline query handler for product search
+        application.add_handler(InlineQueryHandler(handle_inline_query))
         
         # Add callback query handler
         application.add_handler(CallbackQueryHandler(handle_callback_query))
@@ -813,12 +1857,16 @@ def main() -> None:
         # Add message handler for text messages
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
         
+        # Keep the catalog cache warm in the background
+        schedule_catalog_warmer(application)
+        schedule_product_sync(application)
+        schedule_order_sync(application)
+        if application.job_queue is not None:
+            application.job_queue.run_repeating(rate_limit_sweep_job, interval=RATE_LIMIT_SWEEP_INTERVAL, first=RATE_LIMIT_SWEEP_INTERVAL)
+        
         # Start the bot
         print("🤖 Maa Kaali Creations Bot is starting...")
-        print("📱 Bot is now running. Press Ctrl+C to stop.")
-        
-        # Use basic polling for Render
-        application.run_polling()
+        asyncio.run(run_bot(application))
         
     except Exception as e:
         print(f"❌ Error starting bot: {e}")
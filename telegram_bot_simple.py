@@ -6,11 +6,12 @@ A fully functional bot for the Maa Kaali Creations Shopify store
 
 import os
 import logging
-import requests
 from typing import Dict, List, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 
+from shopify_client import ShopifyClient
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -58,31 +59,13 @@ logger = logging.getLogger(__name__)
 # SHOPIFY API FUNCTIONS
 # =============================================================================
 
-def get_shopify_headers() -> Dict[str, str]:
-    """Get headers for Shopify API requests"""
-    return {
-        'X-Shopify-Access-Token': SHOPIFY_API_ACCESS_TOKEN,
-        'Content-Type': 'application/json'
-    }
-
-def get_shopify_api_url(endpoint: str) -> str:
-    """Generate Shopify API URL"""
-    return f"https://{SHOPIFY_STORE_DOMAIN}.myshopify.com/admin/api/2023-04/{endpoint}"
+# Shared async Shopify client, opened and closed with the Application
+shopify = ShopifyClient(SHOPIFY_STORE_DOMAIN, SHOPIFY_API_ACCESS_TOKEN)
 
-def fetch_products(limit: int = 5) -> List[Dict]:
+async def fetch_products(limit: int = 5) -> List[Dict]:
     """Fetch products from Shopify API"""
     try:
-        url = get_shopify_api_url("products.json")
-        params = {
-            'limit': limit,
-            'status': 'active'
-        }
-        
-        response = requests.get(url, headers=get_shopify_headers(), params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('products', [])
+        return await shopify.fetch_products(limit=limit)
     except Exception as e:
         logger.error(f"Error fetching products: {e}")
         return []
@@ -234,7 +217,7 @@ async def browse_collection(query) -> None:
         parse_mode='Markdown'
     )
     
-    products = fetch_products(limit=5)
+    products = await fetch_products(limit=5)
     
     if not products:
         # Fallback to static product list
@@ -488,6 +471,14 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
 # MAIN APPLICATION SETUP
 # =============================================================================
 
+async def post_init(application: Application) -> None:
+    """Open shared resources once the Application is initialized"""
+    await shopify.start()
+
+async def post_shutdown(application: Application) -> None:
+    """Release shared resources when the Application shuts down"""
+    await shopify.close()
+
 def main() -> None:
     """Start the bot"""
     # Validate environment variables
@@ -505,7 +496,13 @@ def main() -> None:
     
     try:
         # Create the Application
-        application = Application.builder().token(BOT_TOKEN).build()
+        application = (
+            Application.builder()
+            .token(BOT_TOKEN)
+            .post_init(post_init)
+            .post_shutdown(post_shutdown)
+            .build()
+        )
         
         # Add command handlers
         application.add_handler(CommandHandler("start", start_command))
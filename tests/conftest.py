@@ -0,0 +1,10 @@
+"""Make the bot's top-level modules importable and keep tests off the real state files"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('PERSISTENCE_PATH', '')
+os.environ.setdefault('CATALOG_SNAPSHOT_PATH', '')
+os.environ.setdefault('STALL_THRESHOLD', '0')
@@ -0,0 +1,110 @@
+"""Tests for callback_router.py and the inline button routes in telegram_bot.py"""
+
+import asyncio
+
+import pytest
+
+import telegram_bot
+from callback_router import MAX_CALLBACK_DATA, CallbackRouter, callback_data, non_negative_int
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+
+
+@pytest.fixture
+def router():
+    """A router with a no-payload route and a page route, recording handler calls and dispatches"""
+    calls, dispatched = [], []
+    router = CallbackRouter(on_dispatch=lambda prefix, seconds, failed: dispatched.append((prefix, failed)))
+
+    async def menu(query, context):
+        calls.append(('menu',))
+
+    async def page(query, context, number):
+        calls.append(('page', number))
+
+    async def broken(query, context):
+        raise RuntimeError("handler bug")
+
+    router.add("menu", menu)
+    router.add("page", page, non_negative_int)
+    router.add("broken", broken)
+    router.calls, router.dispatched = calls, dispatched
+    return router
+
+
+def dispatch(router, data):
+    return asyncio.run(router.dispatch(FakeQuery(data), None))
+
+
+def test_routes_convert_their_payload(router):
+    assert dispatch(router, "menu")
+    assert dispatch(router, "page:3")
+    assert router.calls == [('menu',), ('page', 3)]
+    assert router.dispatched == [('menu', False), ('page', False)]
+    assert router.stats()['routes']['page']['calls'] == 1
+
+
+@pytest.mark.parametrize('data', ["", "nosuchroute", "nosuchroute:1", "Menu", ":menu"])
+def test_unknown_prefixes_are_counted_and_not_dispatched(router, data):
+    assert not dispatch(router, data)
+    assert router.calls == []
+    assert router.counters == {'unknown': 1, 'bad_payload': 0}
+
+
+@pytest.mark.parametrize('data', ["page", "page:", "page:1:2", "menu:1", "menu:"])
+def test_wrong_field_count_is_a_bad_payload(router, data):
+    assert not dispatch(router, data)
+    assert router.calls == []
+    assert router.counters == {'unknown': 0, 'bad_payload': 1}
+
+
+@pytest.mark.parametrize('field', ["-1", "x", "1.5", " 1", "+1", "1_0", "１", "99999999999999999999x"])
+def test_negative_or_non_integer_pages_are_bad_payloads(router, field):
+    assert not dispatch(router, f"page:{field}")
+    assert router.calls == []
+    assert router.counters['bad_payload'] == 1
+
+
+def test_missing_callback_data_is_not_routed(router):
+    assert not dispatch(router, None)
+    assert router.counters['unknown'] == 1
+
+
+def test_handler_errors_are_counted_and_raised(router):
+    with pytest.raises(RuntimeError):
+        dispatch(router, "broken")
+    assert router.dispatched == [('broken', True)]
+    stats = router.stats()['routes']['broken']
+    assert (stats['calls'], stats['errors']) == (1, 1)
+
+
+def test_callback_data_is_limited_to_64_bytes():
+    assert callback_data("page", 12) == "page:12"
+    prefix = "p" * (MAX_CALLBACK_DATA - 2)
+    assert len(callback_data(prefix, 1).encode()) == MAX_CALLBACK_DATA
+    with pytest.raises(ValueError):
+        callback_data(prefix, 12)
+    with pytest.raises(ValueError):
+        callback_data("page", "🪔" * 16)  # 16 characters but 64 bytes plus the prefix
+
+
+def test_prefixes_must_be_unique_and_without_the_separator(router):
+    with pytest.raises(ValueError):
+        router.add("menu", None)
+    with pytest.raises(ValueError):
+        router.add("a:b", None)
+
+
+def test_every_bot_button_has_a_route():
+    keyboards = [
+        telegram_bot.create_main_menu_keyboard(),
+        telegram_bot.create_back_to_menu_keyboard(),
+        telegram_bot.create_browse_keyboard(2, has_next=True),
+    ]
+    for keyboard in keyboards:
+        for row in keyboard.inline_keyboard:
+            for button in row:
+                assert telegram_bot.callback_router.resolve(button.callback_data) is not None, button.callback_data
@@ -0,0 +1,70 @@
+"""Tests for catalog_snapshot.py and the snapshot saves in telegram_bot.py"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+import catalog_snapshot
+import telegram_bot
+from catalog_snapshot import load_snapshot, save_snapshot
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "catalog_snapshot.json.gz")
+    save_snapshot(path, {'products': [{'id': 1, 'title': 'Red Silk'}]})
+    snapshot = load_snapshot(path)
+    assert snapshot['version'] == catalog_snapshot.SNAPSHOT_VERSION
+    assert snapshot['products'] == [{'id': 1, 'title': 'Red Silk'}]
+
+
+def test_concurrent_saves_do_not_collide(tmp_path):
+    path = str(tmp_path / "catalog_snapshot.json.gz")
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(20):
+                save_snapshot(path, {'writer': n, 'round': i, 'products': [{'id': j} for j in range(200)]})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert load_snapshot(path)['round'] == 19
+    assert os.listdir(tmp_path) == ["catalog_snapshot.json.gz"]  # No temp files left behind
+
+
+def test_failed_save_removes_its_temp_file(tmp_path):
+    path = str(tmp_path / "catalog_snapshot.json.gz")
+    with pytest.raises(TypeError):
+        save_snapshot(path, {'products': [object()]})
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_catalog_snapshot_saves_run_one_at_a_time(tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog_snapshot.json.gz")
+    running = []
+    overlaps = []
+
+    def tracked_save(target, data):
+        running.append(1)
+        overlaps.append(len(running))
+        save_snapshot(target, data)
+        running.pop()
+
+    monkeypatch.setattr(telegram_bot, 'CATALOG_SNAPSHOT_PATH', path)
+    monkeypatch.setattr(telegram_bot, 'save_snapshot', tracked_save)
+    monkeypatch.setattr(telegram_bot, '_snapshot_lock', asyncio.Lock())  # Unbound to any earlier test's loop
+
+    async def main():
+        await asyncio.gather(*(telegram_bot.save_catalog_snapshot() for _ in range(5)))
+
+    asyncio.run(main())
+    assert overlaps == [1] * 5
+    assert load_snapshot(path) is not None
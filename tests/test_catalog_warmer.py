@@ -0,0 +1,50 @@
+"""Tests for the catalog warmer job in telegram_bot.py"""
+
+import asyncio
+
+import pytest
+
+import telegram_bot
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.scheduled = []
+
+    def run_once(self, callback, when, name=None):
+        self.scheduled.append((callback, when, name))
+
+
+class FakeContext:
+    def __init__(self):
+        self.job_queue = FakeJobQueue()
+
+
+def test_warmer_reschedules_when_snapshot_save_raises(monkeypatch):
+    async def warm():
+        pass
+
+    async def broken_save():
+        raise TypeError("Object of type set is not JSON serializable")
+
+    monkeypatch.setattr(telegram_bot, 'warm_catalog', warm)
+    monkeypatch.setattr(telegram_bot, 'save_catalog_snapshot', broken_save)
+    context = FakeContext()
+    with pytest.raises(TypeError):
+        asyncio.run(telegram_bot.catalog_warmer_job(context))
+    assert context.job_queue.scheduled == [
+        (telegram_bot.catalog_warmer_job, telegram_bot.CATALOG_WARM_INTERVAL, "catalog_warmer")
+    ]
+
+
+def test_warmer_backs_off_after_a_failed_warm(monkeypatch):
+    async def warm():
+        raise RuntimeError("Shopify unreachable")
+
+    monkeypatch.setattr(telegram_bot, 'warm_catalog', warm)
+    monkeypatch.setitem(telegram_bot.warmer_state, 'failures', 0)
+    context = FakeContext()
+    asyncio.run(telegram_bot.catalog_warmer_job(context))
+    [(_, delay, _)] = context.job_queue.scheduled
+    assert delay == telegram_bot.CATALOG_WARM_INTERVAL * 2
+    assert telegram_bot.warmer_state['failures'] == 1
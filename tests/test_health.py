@@ -0,0 +1,81 @@
+"""Tests for the /livez liveness checks in telegram_bot.py"""
+
+import asyncio
+import time
+
+import pytest
+
+import telegram_bot
+from update_processor import ChatOrderedUpdateProcessor
+from test_update_processor import message_update
+
+
+class FakeApplication:
+    """Just what liveness_checks reads: a running flag and an (empty) update queue"""
+
+    def __init__(self):
+        self.running = True
+        self.update_queue = asyncio.Queue()
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """A two-slot update processor standing in for the bot's, with the last update long ago"""
+    processor = ChatOrderedUpdateProcessor(concurrency=2, max_pending=100)
+    monkeypatch.setattr(telegram_bot, 'update_processor', processor)
+    monkeypatch.setattr(telegram_bot, 'BOT_RUN_MODE', 'webhook')
+    monkeypatch.setitem(telegram_bot.health_state, 'last_update', time.time() - telegram_bot.LIVENESS_MAX_QUEUE_WAIT - 1)
+    return processor
+
+
+async def livez(application):
+    endpoint, _ = telegram_bot.make_health_endpoints(application)
+    return await endpoint(None)
+
+
+def test_idle_bot_is_alive_however_long_since_the_last_update(processor):
+    assert asyncio.run(livez(FakeApplication())).status == 200
+
+
+def test_stuck_handlers_fail_liveness_with_an_empty_update_queue(processor):
+    async def main():
+        application = FakeApplication()
+        release = asyncio.Event()
+
+        async def stuck():
+            await release.wait()
+
+        for update_id in range(5):  # Both slots stuck, three updates waiting behind them
+            await processor.process_update(message_update(update_id, update_id), stuck())
+        await asyncio.sleep(0)
+        checks = telegram_bot.liveness_checks(application)
+        response = await livez(application)
+        release.set()
+        assert await processor.drain(timeout=5)
+        return checks, response
+
+    checks, response = asyncio.run(main())
+    assert checks['updates']['queued'] == 0
+    assert checks['updates']['pending'] == 5
+    assert not checks['updates']['ok']
+    assert response.status == 503
+
+
+def test_pending_updates_are_fine_while_updates_are_still_being_handled(processor):
+    telegram_bot.health_state['last_update'] = time.time()
+
+    async def main():
+        release = asyncio.Event()
+
+        async def busy():
+            await release.wait()
+
+        await processor.process_update(message_update(1, 1), busy())
+        checks = telegram_bot.liveness_checks(FakeApplication())
+        release.set()
+        assert await processor.drain(timeout=5)
+        return checks
+
+    checks = asyncio.run(main())
+    assert checks['updates']['pending'] == 1
+    assert checks['updates']['ok']
@@ -0,0 +1,148 @@
+"""Tests for message_builder.py"""
+
+import asyncio
+import re
+
+import pytest
+
+import telegram_bot
+from message_builder import (
+    MAX_MESSAGE_LENGTH,
+    TRUNCATION_MARK,
+    MessageBuilder,
+    markdown_bold,
+    message_length,
+)
+
+_ESCAPED = re.compile(r"\\[_*`\[]")
+_LINK = re.compile(r"\[[^\]]*\]\([^)]*\)")
+
+
+def markdown_balanced(text: str) -> bool:
+    """Whether legacy Markdown entities in text all close (what Telegram's parser needs)"""
+    text = _LINK.sub("", _ESCAPED.sub("", text))
+    return "[" not in text and all(text.count(mark) % 2 == 0 for mark in "*_`")
+
+
+class FakeMessage:
+    def __init__(self):
+        self.sent = []
+
+    async def reply_text(self, text, reply_markup=None, **options):
+        self.sent.append((text, reply_markup, options))
+
+
+class FakeQuery:
+    def __init__(self):
+        self.message = FakeMessage()
+        self.edits = []
+
+    async def edit_message_text(self, text, reply_markup=None, **options):
+        self.edits.append((text, reply_markup, options))
+
+
+def filled(count: int, item: str = "item {}\n", **kwargs) -> MessageBuilder:
+    builder = MessageBuilder(**kwargs)
+    for i in range(count):
+        builder.add(item.format(i))
+    return builder
+
+
+def test_message_length_counts_utf16_units():
+    assert message_length("abc") == 3
+    assert message_length("₹") == 1
+    assert message_length("🪔") == 2
+
+
+@pytest.mark.parametrize('item', ["product {} — silk saree\n", "🪔 product {} 🛍 saree 💰\n"])
+def test_messages_stay_within_the_limit_and_keep_every_item(item):
+    builder = filled(2000, item, header="HEADER\n", footer="FOOTER")
+    messages = builder.build()
+    assert len(messages) > 1
+    assert all(message_length(message) <= MAX_MESSAGE_LENGTH for message in messages)
+    assert "".join(messages) == "HEADER\n" + "".join(builder.items) + "FOOTER"
+    assert messages[0].startswith("HEADER\n")
+    assert messages[-1].endswith("FOOTER")
+
+
+def test_items_are_never_cut_between_messages():
+    builder = filled(300, "line one of {}\nline two\n", limit=100)
+    for message in builder.build():
+        assert message_length(message) <= 100
+        # Every message is a whole number of items
+        assert re.fullmatch(r"(line one of \d+\nline two\n)+", message)
+
+
+def test_footer_moves_to_its_own_message_when_it_does_not_fit():
+    builder = filled(10, "x" * 9 + "\n", footer="F" * 10, limit=100)
+    assert builder.build() == ["".join(builder.items), "F" * 10]
+
+
+def test_oversized_item_is_truncated_at_a_line_boundary():
+    builder = MessageBuilder(limit=50)
+    builder.add("first line\n" + "y" * 100)
+    [message] = builder.build()
+    assert message == "first line\n" + TRUNCATION_MARK
+    assert message_length(message) <= 50
+
+
+def test_markdown_bold_escapes_metacharacters_outside_bold_runs():
+    assert markdown_bold("Silk Saree") == "*Silk Saree*"
+    assert markdown_bold("Silk_Saree *New* [Sale] `x`") == (
+        "*Silk*\\_*Saree *\\**New*\\** *\\[*Sale] *\\`*x*\\`"
+    )
+    assert markdown_bold("_") == "\\_"
+    assert markdown_bold("") == ""
+
+
+def test_hundreds_of_products_with_metacharacter_titles():
+    titles = ["Silk_Saree", "*Bestseller* Organza", "Net [New]", "`Code` Crepe", "Kanjeevaram_*_[`"]
+    builder = MessageBuilder(header=f"{telegram_bot.BRAND_LOGO} *🛍 Our Saree Collection*\n\n", footer="\n*View all*")
+    for i in range(500):
+        product = {'title': f"{titles[i % len(titles)]} {i}", 'handle': f"saree_{i}", 'variants': [{'price': '1499.00'}]}
+        builder.add(f"*{i + 1}.* {telegram_bot.format_product_message(product)}\n")
+    messages = builder.build()
+    assert len(messages) > 1
+    for message in messages:
+        assert message_length(message) <= MAX_MESSAGE_LENGTH
+        assert markdown_balanced(message), message[:200]
+    assert "".join(messages).count("[View Product]") == 500
+
+
+def test_edit_puts_the_keyboard_on_the_last_message_only():
+    query = FakeQuery()
+    keyboard = object()
+    asyncio.run(filled(50, limit=100).edit(query, reply_markup=keyboard, parse_mode='Markdown'))
+    assert query.edits[0][1] is None
+    markups = [markup for _, markup, _ in query.message.sent]
+    assert markups[-1] is keyboard
+    assert all(markup is None for markup in markups[:-1])
+    assert all(options == {'parse_mode': 'Markdown'} for _, _, options in query.edits + query.message.sent)
+
+
+def test_single_message_edit_keeps_the_keyboard():
+    query = FakeQuery()
+    keyboard = object()
+    asyncio.run(filled(3).edit(query, reply_markup=keyboard))
+    assert query.edits == [("item 0\nitem 1\nitem 2\n", keyboard, {})]
+    assert query.message.sent == []
+
+
+def test_reply_puts_the_keyboard_on_the_last_message_only():
+    message = FakeMessage()
+    keyboard = object()
+    asyncio.run(filled(50, limit=100).reply(message, reply_markup=keyboard))
+    markups = [markup for _, markup, _ in message.sent]
+    assert len(markups) > 1
+    assert markups[-1] is keyboard
+    assert all(markup is None for markup in markups[:-1])
+
+
+def test_empty_builder_sends_nothing():
+    builder = MessageBuilder()
+    assert builder.build() == []
+    query = FakeQuery()
+    message = FakeMessage()
+    asyncio.run(builder.edit(query, reply_markup=object()))
+    asyncio.run(builder.reply(message))
+    assert query.edits == [] and query.message.sent == [] and message.sent == []
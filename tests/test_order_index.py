@@ -0,0 +1,250 @@
+"""Tests for order_index.py and the order status lookups and webhooks in telegram_bot.py"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+import httpx
+import pytest
+
+import telegram_bot
+from catalog_cache import CatalogCache
+from order_index import OrderIndex, order_matches_contact, parse_order_query, slim_order
+from shopify_client import ShopifyClient
+from web_server import Request
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'shopify_webhooks')
+SECRET = "webhook-test-secret"
+ORDER_ID = 5523814498557
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as fixture_file:
+        return fixture_file.read()
+
+
+def order(order_id, number, updated_at='2024-03-01T09:00:00+05:30', **fields):
+    return {'id': order_id, 'name': f"#{number}", 'order_number': number, 'updated_at': updated_at, **fields}
+
+
+def deliver(topic: str, body: bytes):
+    """Post a signed webhook body to the Shopify webhook endpoint"""
+    signature = base64.b64encode(hmac.new(SECRET.encode(), body, hashlib.sha256).digest()).decode()
+    headers = {'x-shopify-topic': topic, 'x-shopify-hmac-sha256': signature}
+    request = Request('POST', telegram_bot.SHOPIFY_WEBHOOK_PATH, {}, headers, body)
+    return asyncio.run(telegram_bot.shopify_webhook(request))
+
+
+class FakeOrders:
+    """Mock transport handler for orders.json?name=..., recording each request"""
+
+    def __init__(self, orders=(), status=200):
+        self.orders = list(orders)
+        self.status = status
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.status != 200:
+            return httpx.Response(self.status, json={'errors': "Internal Server Error"})
+        name = request.url.params['name'].lstrip('#')
+        return httpx.Response(
+            200,
+            json={'orders': [item for item in self.orders if item['name'].lstrip('#') == name]},
+            headers={'X-Shopify-Shop-Api-Call-Limit': '1/40'},
+        )
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+class FakeUser:
+    id = 42
+    first_name = "Priya"
+    username = "priya"
+
+
+class FakeQueue:
+    def __init__(self):
+        self.enqueued = []
+
+    def enqueue(self, chat_id, text, **kwargs):
+        self.enqueued.append(text)
+        return True
+
+
+@pytest.fixture
+def shopify(monkeypatch):
+    """An empty order index in front of a fake Shopify holding the fixture order"""
+    shopify = FakeOrders([json.loads(fixture('orders_updated.json'))])
+    client = ShopifyClient("test-store", "token", base_url="https://test-store.myshopify.com/admin/api/2023-04/")
+    client._session = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(shopify))
+    monkeypatch.setattr(telegram_bot, 'shopify', client)
+    monkeypatch.setattr(telegram_bot, 'order_index', OrderIndex(max_orders=100))
+    monkeypatch.setattr(telegram_bot, 'order_cache', CatalogCache(ttl=60, max_stale=0, max_entries=1000))
+    monkeypatch.setattr(telegram_bot, 'admin_queue', FakeQueue())
+    monkeypatch.setattr(telegram_bot, 'SHOPIFY_WEBHOOK_SECRET', SECRET)
+    return shopify
+
+
+def order_reply(text):
+    message = FakeMessage()
+    handled = asyncio.run(telegram_bot.reply_with_order_status(message, FakeUser(), text))
+    return handled, message.replies
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("#1042 priya.sharma@example.com", ("1042", "priya.sharma@example.com", "")),
+    ("Order 1042, email Priya.Sharma@Example.com", ("1042", "priya.sharma@example.com", "")),
+    ("1042 +91 98765 43210", ("1042", None, "9876543210")),
+    ("mkc1042 9876543210", ("mkc1042", None, "9876543210")),
+    ("9876543210 #1042", ("1042", None, "9876543210")),
+    ("where is my order", (None, None, "")),
+])
+def test_parse_order_query(text, expected):
+    assert parse_order_query(text) == expected
+
+
+def test_contact_matches_the_order_email_or_any_of_its_phones():
+    slim = slim_order(json.loads(fixture('orders_updated.json')))
+    assert order_matches_contact(slim, "priya.sharma@example.com", "")
+    assert order_matches_contact(slim, None, "9876543210")  # Customer phone
+    assert order_matches_contact(slim, None, "9831245678")  # Shipping address phone
+    assert not order_matches_contact(slim, "someone@example.com", "")
+    assert not order_matches_contact(slim, None, "9999999999")
+    assert not order_matches_contact(slim, None, "")
+
+
+def test_order_without_an_email_does_not_match_a_missing_email():
+    slim = slim_order(order(1, 1001))
+    assert slim['email'] == ""
+    assert not order_matches_contact(slim, None, "")
+    assert not order_matches_contact(slim, "", "")
+
+
+def test_index_finds_orders_by_name_and_number():
+    index = OrderIndex()
+    index.upsert(order(1, 1001))
+    index.upsert(dict(order(2, 1002), name="MKC1002"))
+    assert index.find("#1001")['id'] == 1
+    assert index.find("1001")['id'] == 1
+    assert index.find("mkc1002")['id'] == 2
+    assert index.find("1002")['id'] == 2
+    assert index.find("1003") is None
+
+
+def test_older_update_does_not_replace_a_newer_order():
+    index = OrderIndex()
+    index.upsert(order(1, 1001, updated_at='2024-03-05T10:00:00+05:30', financial_status='paid'))
+    index.upsert(order(1, 1001, updated_at='2024-03-04T10:00:00+05:30', financial_status='pending'))
+    assert index.find("1001")['financial_status'] == 'paid'
+
+
+def test_least_recently_updated_orders_are_evicted_with_their_numbers():
+    index = OrderIndex(max_orders=2)
+    for order_id in (1, 2, 3):
+        index.upsert(order(order_id, 1000 + order_id))
+    assert list(index.orders) == [2, 3]
+    assert index.find("1001") is None
+    assert "1001" not in index.by_number
+    index.upsert(order(2, 1002, updated_at='2024-03-02T09:00:00+05:30'))  # Updated: now the newest
+    index.upsert(order(4, 1004))
+    assert list(index.orders) == [2, 4]
+
+
+def test_fulfillment_updates_replace_by_id_and_skip_unknown_orders():
+    index = OrderIndex()
+    index.upsert(order(1, 1001, fulfillments=[{'id': 10, 'shipment_status': 'in_transit'}]))
+    assert index.update_fulfillment({'id': 10, 'order_id': 1, 'shipment_status': 'delivered'})
+    assert index.update_fulfillment({'id': 11, 'order_id': 1, 'shipment_status': 'confirmed'})
+    assert [(item['id'], item['shipment_status']) for item in index.find("1001")['fulfillments']] == [
+        (10, 'delivered'), (11, 'confirmed')
+    ]
+    assert not index.update_fulfillment({'id': 12, 'order_id': 99})
+
+
+def test_unindexed_order_is_fetched_once_and_indexed(shopify):
+    assert asyncio.run(telegram_bot.lookup_order("#1042"))['id'] == ORDER_ID
+    assert asyncio.run(telegram_bot.lookup_order("1042"))['id'] == ORDER_ID
+    assert len(shopify.requests) == 1
+    assert shopify.requests[0].url.params['status'] == 'any'
+    assert ORDER_ID in telegram_bot.order_index.orders
+
+
+def test_unknown_order_misses_are_cached(shopify):
+    assert asyncio.run(telegram_bot.lookup_order("9999")) is None
+    assert asyncio.run(telegram_bot.lookup_order("#9999")) is None
+    assert len(shopify.requests) == 1
+
+
+def test_indexed_order_needs_no_shopify_call(shopify):
+    telegram_bot.order_index.upsert(json.loads(fixture('orders_updated.json')))
+    assert asyncio.run(telegram_bot.lookup_order("1042"))['id'] == ORDER_ID
+    assert shopify.requests == []
+
+
+def test_matching_contact_gets_the_status_with_an_escaped_tracking_link(shopify):
+    handled, replies = order_reply("#1042 priya.sharma@example.com")
+    assert handled
+    assert "Order Status" in replies[0]
+    assert "Blue\\_Dart" in replies[0]
+    assert "(https://www.bluedart.com/tracking?awb=81234567890&note=gift%20%28wrapped%29)" in replies[0]
+
+
+@pytest.mark.parametrize('text', ["#1042 someone@example.com", "#1042 9999999999", "#9999 priya.sharma@example.com"])
+def test_wrong_contact_and_unknown_order_get_the_same_reply(shopify, text):
+    handled, replies = order_reply(text)
+    assert handled
+    assert "Order Not Found" in replies[0]
+    assert "1042" not in replies[0]
+    assert "Kolkata" not in replies[0]
+
+
+def test_message_without_a_contact_is_not_looked_up(shopify):
+    handled, replies = order_reply("#1042")
+    assert not handled
+    assert replies == []
+    assert shopify.requests == []
+
+
+def test_shopify_failure_hands_the_request_to_the_admin(shopify):
+    shopify.status = 500
+    handled, replies = order_reply("#1042 priya.sharma@example.com")
+    assert handled
+    assert "Order Number Received" in replies[0]
+    assert len(telegram_bot.admin_queue.enqueued) == 1
+
+
+def test_tracking_url_that_is_not_http_is_left_out():
+    slim = slim_order(order(1, 1001, fulfillments=[{'id': 10, 'tracking_url': "javascript:alert(1)"}]))
+    assert "Track Shipment" not in telegram_bot.format_order_status(slim)
+
+
+def test_order_and_fulfillment_webhooks_update_the_index(shopify):
+    assert deliver('orders/updated', fixture('orders_updated.json')).status == 200
+    assert telegram_bot.order_index.find("1042")['fulfillments'][0]['shipment_status'] == 'in_transit'
+
+    assert deliver('fulfillments/update', fixture('fulfillments_update.json')).status == 200
+    fulfillments = telegram_bot.order_index.find("1042")['fulfillments']
+    assert [(item['id'], item['shipment_status']) for item in fulfillments] == [(4870219612413, 'delivered')]
+    handled, replies = order_reply("1042 9876543210")
+    assert "Delivered" in replies[0]
+
+    assert deliver('orders/delete', fixture('orders_delete.json')).status == 200
+    assert telegram_bot.order_index.find("1042") is None
+    assert shopify.requests == []
+
+
+def test_unsigned_order_webhook_is_rejected(shopify):
+    body = fixture('orders_updated.json')
+    request = Request('POST', telegram_bot.SHOPIFY_WEBHOOK_PATH, {}, {'x-shopify-topic': 'orders/updated'}, body)
+    assert asyncio.run(telegram_bot.shopify_webhook(request)).status == 401
+    assert len(telegram_bot.order_index) == 0
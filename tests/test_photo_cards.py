@@ -0,0 +1,187 @@
+"""Tests for photo_cards.py against a mock image server and a stub Bot"""
+
+import asyncio
+
+import httpx
+import pytest
+from telegram.error import BadRequest
+
+from message_builder import message_length
+from photo_cards import MAX_CAPTION_LENGTH, PhotoCards
+
+IMAGE_BYTES = b"\xff\xd8\xff\xe0 fake jpeg " + b"x" * 2000
+
+
+class ImageServer:
+    """Mock transport handler serving an image for any path after a short delay, counting requests"""
+
+    def __init__(self, delay: float = 0.02, missing=()):
+        self.delay = delay
+        self.missing = set(missing)
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        if request.url.path in self.missing:
+            return httpx.Response(404)
+        return httpx.Response(200, content=IMAGE_BYTES, headers={'Content-Type': 'image/jpeg'})
+
+
+class StubPhotoSize:
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+
+class StubMessage:
+    def __init__(self, file_id):
+        self.photo = [StubPhotoSize(f"{file_id}-thumb"), StubPhotoSize(file_id)]
+
+
+class StubBot:
+    """send_photo/send_media_group that hand out file_ids for uploads and reject file_ids in `rejected`"""
+
+    def __init__(self):
+        self.rejected = set()
+        self.groups = []  # [(media or file_id, caption)] per call
+        self.uploads = 0
+
+    def _send(self, photo):
+        if isinstance(photo, str):
+            if photo in self.rejected:
+                raise BadRequest("Wrong file identifier/http url specified")
+            return StubMessage(photo)
+        self.uploads += 1
+        return StubMessage(f"file-{self.uploads}")
+
+    async def send_photo(self, chat_id, photo, caption=None, parse_mode=None):
+        await asyncio.sleep(0.001)
+        self.groups.append([(photo, caption)])
+        return self._send(photo)
+
+    async def send_media_group(self, chat_id, media):
+        await asyncio.sleep(0.001)
+        assert 2 <= len(media) <= 10
+        self.groups.append([(item.media, item.caption) for item in media])
+        return [self._send(item.media) for item in media]
+
+
+def make_cards(server):
+    cards = PhotoCards(max_entries=100)
+    cards._session = httpx.AsyncClient(transport=httpx.MockTransport(server), follow_redirects=True)
+    return cards
+
+
+def product(n, updated_at='2024-03-01T09:00:00+05:30'):
+    return {
+        'id': n,
+        'title': f"Saree {n}",
+        'image': {'id': 100 + n, 'src': f"https://cdn.shopify.com/s/files/saree-{n}.jpg", 'updated_at': updated_at},
+    }
+
+
+def captions(products):
+    return [f"*{n}.* *{item['title']}*" for n, item in enumerate(products, 1)]
+
+
+def send(cards, bot, products, chat_id=7):
+    return asyncio.run(cards.send(bot, chat_id, products, captions(products)))
+
+
+def file_ids_sent(bot):
+    return [media for media, _ in bot.groups[-1] if isinstance(media, str)]
+
+
+def test_second_view_downloads_nothing():
+    server, bot = ImageServer(), StubBot()
+    cards = make_cards(server)
+    products = [product(n) for n in range(3)]
+    assert send(cards, bot, products) == 3
+    assert len(server.requests) == 3
+    assert server.requests[0].url.params['width'] == '1024'
+    assert bot.uploads == 3
+
+    assert send(cards, bot, products) == 3
+    assert len(server.requests) == 3
+    assert bot.uploads == 3
+    assert file_ids_sent(bot) == ["file-1", "file-2", "file-3"]
+    assert cards.stats()['file_id_hits'] == 3
+
+
+def test_concurrent_first_views_download_each_image_once():
+    server, bot = ImageServer(delay=0.05), StubBot()
+    cards = make_cards(server)
+    products = [product(n) for n in range(4)]
+
+    async def main():
+        return await asyncio.gather(*(cards.send(bot, chat_id, products, captions(products)) for chat_id in range(5)))
+
+    assert asyncio.run(main()) == [4] * 5
+    assert len(server.requests) == 4
+    assert cards.stats()['downloads'] == 4
+
+
+def test_rejected_file_id_is_uploaded_again():
+    server, bot = ImageServer(), StubBot()
+    cards = make_cards(server)
+    products = [product(n) for n in range(2)]
+    send(cards, bot, products)
+    bot.rejected = {"file-1"}  # E.g. the bot token changed
+
+    assert send(cards, bot, products) == 2
+    assert len(server.requests) == 4
+    assert file_ids_sent(bot) == []  # The retried group uploaded both
+    assert cards.stats()['stale_file_ids'] == 2
+    assert "file-1" not in cards.file_ids.values()
+    assert send(cards, bot, products) == 2
+    assert len(server.requests) == 4  # The new file_ids are used from then on
+
+
+def test_rejected_upload_is_not_retried():
+    server, bot = ImageServer(), StubBot()
+    cards = make_cards(server)
+
+    async def broken(chat_id, media):
+        raise BadRequest("Photo_invalid_dimensions")
+
+    bot.send_media_group = broken
+    with pytest.raises(BadRequest):
+        send(cards, bot, [product(n) for n in range(2)])
+    assert len(server.requests) == 2
+
+
+def test_replaced_image_is_downloaded_again():
+    server, bot = ImageServer(), StubBot()
+    cards = make_cards(server)
+    send(cards, bot, [product(1)])
+    send(cards, bot, [product(1, updated_at='2024-03-09T10:00:00+05:30')])
+    assert len(server.requests) == 2
+
+
+def test_single_card_uses_send_photo_and_products_without_images_are_skipped():
+    server, bot = ImageServer(), StubBot()
+    cards = make_cards(server)
+    assert send(cards, bot, [product(1), {'id': 2, 'title': "No Photo", 'image': None}]) == 1
+    assert len(bot.groups[-1]) == 1
+
+
+def test_failed_download_leaves_the_card_out():
+    server = ImageServer(missing={"/s/files/saree-1.jpg"})
+    bot = StubBot()
+    cards = make_cards(server)
+    assert send(cards, bot, [product(n) for n in range(3)]) == 2
+    assert cards.stats()['download_errors'] == 1
+
+
+def test_long_caption_is_cut_at_a_line_within_the_utf16_limit():
+    server, bot = ImageServer(), StubBot()
+    cards = make_cards(server)
+    caption = "*1.* *Diya Saree*\n" + "".join(f"🪔🪔🪔🪔 *Festive* pick {n}\n" for n in range(42))
+    assert len(caption) <= MAX_CAPTION_LENGTH < message_length(caption)  # Fits in characters, not in UTF-16
+    asyncio.run(cards.send(bot, 7, [product(1)], [caption]))
+    sent = bot.groups[-1][0][1]
+    assert message_length(sent) <= MAX_CAPTION_LENGTH
+    assert sent.endswith("…\n")
+    body = sent[:-len("…\n")]
+    assert caption.startswith(body) and body.endswith("\n")
+    assert body.count("*") % 2 == 0
@@ -0,0 +1,101 @@
+"""Tests for the product search index sync in telegram_bot.py"""
+
+import asyncio
+import threading
+
+import pytest
+
+import telegram_bot
+from product_search import ProductSearchIndex
+
+
+class FakeCatalog:
+    """Stands in for shopify.fetch_all_products, recording full listings and deltas"""
+
+    def __init__(self, products):
+        self.products = {product['id']: product for product in products}
+        self.calls = []
+
+    async def fetch_all_products(self, filters=None):
+        self.calls.append('delta' if filters and 'updated_at_min' in filters else 'full')
+        if filters and 'updated_at_min' in filters:
+            return []  # Shopify lists changed products; deleted ones simply vanish
+        return list(self.products.values())
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalog = FakeCatalog([
+        {'id': 1, 'title': 'Red Kanjeevaram Silk'},
+        {'id': 2, 'title': 'Blue Banarasi Silk'},
+    ])
+    monkeypatch.setattr(telegram_bot, 'product_index', ProductSearchIndex())
+    monkeypatch.setattr(telegram_bot.shopify, 'fetch_all_products', catalog.fetch_all_products)
+    return catalog
+
+
+def titles(query):
+    return [product['title'] for product in telegram_bot.product_index.search(query)]
+
+
+def test_first_sync_is_a_full_rebuild_then_deltas(catalog):
+    asyncio.run(telegram_bot.sync_product_index())
+    asyncio.run(telegram_bot.sync_product_index())
+    assert catalog.calls == ['full', 'delta']
+    assert len(telegram_bot.product_index) == 2
+
+
+def test_periodic_full_rebuild_drops_deleted_products(catalog, monkeypatch):
+    asyncio.run(telegram_bot.sync_product_index())
+    del catalog.products[2]
+    asyncio.run(telegram_bot.sync_product_index())
+    assert titles('banarasi') == ['Blue Banarasi Silk']  # A delta can't see the deletion
+
+    telegram_bot.product_index.rebuilt_at -= telegram_bot.PRODUCT_FULL_SYNC_INTERVAL
+    asyncio.run(telegram_bot.sync_product_index())
+    assert catalog.calls == ['full', 'delta', 'full']
+    assert titles('banarasi') == []
+    assert titles('silk') == ['Red Kanjeevaram Silk']
+
+
+def test_webhooks_during_a_full_rebuild_are_not_lost(catalog, monkeypatch):
+    fetch = catalog.fetch_all_products
+
+    async def fetch_then_webhooks(filters=None):
+        products = await fetch(filters)  # Listed before the webhooks below
+        telegram_bot.apply_catalog_event('products/update', {'id': 2, 'title': 'Blue Banarasi Organza', 'updated_at': '2026-10-18T10:00:00Z'})
+        telegram_bot.apply_catalog_event('products/delete', {'id': 1})
+        telegram_bot.apply_catalog_event('products/create', {'id': 3, 'title': 'Peach Chanderi', 'updated_at': '2026-10-18T10:00:00Z'})
+        return products
+
+    monkeypatch.setattr(telegram_bot.shopify, 'fetch_all_products', fetch_then_webhooks)
+    asyncio.run(telegram_bot.sync_product_index())
+    assert sorted(telegram_bot.product_index.products) == [2, 3]
+    assert titles('organza') == ['Blue Banarasi Organza']
+    assert titles('kanjeevaram') == []
+    assert telegram_bot.product_rebuild_state['events'] is None
+
+
+def test_searches_use_the_old_index_while_the_new_one_builds(catalog, monkeypatch):
+    telegram_bot.product_index.rebuild([{'id': 9, 'title': 'Old Tussar Silk'}])
+    building, searched = threading.Event(), threading.Event()
+    build = ProductSearchIndex.build
+
+    def slow_build(products):
+        building.set()
+        assert searched.wait(5)
+        return build(products)
+
+    monkeypatch.setattr(ProductSearchIndex, 'build', slow_build)
+
+    async def main():
+        sync = asyncio.create_task(telegram_bot.sync_product_index())
+        while not building.is_set():
+            await asyncio.sleep(0.001)
+        during = titles('silk')
+        searched.set()
+        await sync
+        return during
+
+    assert asyncio.run(main()) == ['Old Tussar Silk']
+    assert sorted(titles('silk')) == ['Blue Banarasi Silk', 'Red Kanjeevaram Silk']
@@ -0,0 +1,191 @@
+"""Tests for send_queue.py against a fake Bot that enforces Telegram-like limits"""
+
+import asyncio
+import time
+
+import pytest
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+import send_queue
+from message_builder import MAX_MESSAGE_LENGTH, message_length
+from send_queue import DIGEST_SEPARATOR, SendQueue
+
+
+class FakeBot:
+    """send_message with Telegram's limits, scaled down 10x in time so tests run fast.
+
+    Raises RetryAfter when a chat gets messages closer than chat_interval
+    or more than global_rate go out in a second, BadRequest for text over
+    4096 UTF-16 units or unbalanced Markdown, and any errors queued in
+    `failures` before anything else.
+    """
+
+    def __init__(self, chat_interval: float = 0.1, global_rate: int = 300, latency: float = 0.001):
+        self.chat_interval = chat_interval
+        self.latency = latency
+        self.global_rate = global_rate
+        self.sent = []  # (chat_id, text, kwargs)
+        self.calls = 0
+        self.floods = 0
+        self.failures = []  # Exceptions raised by the next calls, in order
+        self._last_sent = {}
+        self._window = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.failures:
+            raise self.failures.pop(0)
+        if message_length(text) > MAX_MESSAGE_LENGTH:
+            raise BadRequest("Message is too long")
+        if kwargs.get('parse_mode') == 'Markdown' and (text.count('*') % 2 or text.count('_') % 2):
+            raise BadRequest("Can't parse entities: can't find end of the entity")
+        now = time.monotonic()
+        self._window = [sent_at for sent_at in self._window if now - sent_at < 1.0]
+        wait = self._last_sent.get(chat_id, -1e9) + self.chat_interval - now
+        if wait > 0 or len(self._window) >= self.global_rate:
+            self.floods += 1
+            raise RetryAfter(max(wait, 0.05))
+        self._last_sent[chat_id] = now
+        self._window.append(now)
+        self.sent.append((chat_id, text, kwargs))
+
+
+async def run_queue(bot, queue, messages, timeout=10.0):
+    """Start the queue, enqueue (chat_id, text, options) tuples, and wait until all are handled"""
+    await queue.start(bot)
+    for chat_id, text, options in messages:
+        assert queue.enqueue(chat_id, text, **options)
+    await queue.stop(timeout=timeout)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(send_queue, 'RETRY_BACKOFF', 0.01)
+
+
+def test_paced_queue_never_trips_flood_limits():
+    bot = FakeBot()
+    queue = SendQueue(global_rate=250, chat_interval=0.12)  # Some margin, as requests reach Telegram with jitter
+    messages = [(chat, f"message {n} to {chat}", {}) for n in range(3) for chat in range(20)]
+    asyncio.run(run_queue(bot, queue, messages))
+    assert bot.floods == 0
+    assert len(bot.sent) == 60
+    for chat in range(20):
+        assert [text for chat_id, text, _ in bot.sent if chat_id == chat] == [f"message {n} to {chat}" for n in range(3)]
+
+
+def test_retry_after_requeues_in_order_and_pauses():
+    bot = FakeBot(chat_interval=0.005)
+    bot.failures = [RetryAfter(0.3)]
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+
+    async def main():
+        started = time.monotonic()
+        await run_queue(bot, queue, [('admin', f"question {n}", {}) for n in range(3)])
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(main())
+    assert [text for _, text, _ in bot.sent] == ["question 0", "question 1", "question 2"]
+    assert elapsed >= 0.3
+    stats = queue.stats()
+    assert stats['retry_after'] == 1
+    assert stats['sent'] == 3
+    assert stats['dropped'] == 0
+
+
+def test_flood_waits_do_not_use_up_attempts():
+    bot = FakeBot(chat_interval=0.005)
+    bot.failures = [RetryAfter(0.01)] * (send_queue.MAX_SEND_ATTEMPTS + 2)
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+    asyncio.run(run_queue(bot, queue, [('admin', "question", {})]))
+    assert [text for _, text, _ in bot.sent] == ["question"]
+
+
+def test_network_errors_are_retried():
+    bot = FakeBot(chat_interval=0.005)
+    bot.failures = [TimedOut(), TimedOut()]
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+    asyncio.run(run_queue(bot, queue, [('admin', "question", {})]))
+    assert [text for _, text, _ in bot.sent] == ["question"]
+    assert queue.stats()['retries'] == 2
+
+
+def test_message_is_dropped_after_max_attempts():
+    bot = FakeBot(chat_interval=0.005)
+    bot.failures = [TimedOut()] * send_queue.MAX_SEND_ATTEMPTS
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+    asyncio.run(run_queue(bot, queue, [('admin', "lost", {}), ('admin', "delivered", {})]))
+    assert bot.calls == send_queue.MAX_SEND_ATTEMPTS + 1
+    assert [text for _, text, _ in bot.sent] == ["delivered"]
+    stats = queue.stats()
+    assert stats['dropped'] == 1
+    assert stats['retries'] == send_queue.MAX_SEND_ATTEMPTS - 1
+
+
+def test_bad_markdown_is_resent_as_plain_text():
+    bot = FakeBot(chat_interval=0.005)
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+    messages = [
+        ('admin', "*Question from* user_name: where is my order?", {'parse_mode': 'Markdown'}),
+        ('admin', "*Question from* alice: ok", {'parse_mode': 'Markdown'}),
+    ]
+    asyncio.run(run_queue(bot, queue, messages))
+    assert bot.sent == [
+        ('admin', "*Question from* user_name: where is my order?", {}),
+        ('admin', "*Question from* alice: ok", {'parse_mode': 'Markdown'}),
+    ]
+
+
+def test_stop_waits_for_the_send_in_flight():
+    bot = FakeBot(chat_interval=0.005, latency=0.3)
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+    asyncio.run(run_queue(bot, queue, [('admin', "last words", {})]))
+    assert [text for _, text, _ in bot.sent] == ["last words"]
+    assert queue.stats()['sent'] == 1
+
+
+def test_other_bad_requests_are_dropped():
+    bot = FakeBot(chat_interval=0.005)
+    queue = SendQueue(global_rate=250, chat_interval=0.01)
+    asyncio.run(run_queue(bot, queue, [('admin', "x" * (MAX_MESSAGE_LENGTH + 1), {})]))
+    assert bot.sent == []
+    assert queue.stats()['dropped'] == 1
+
+
+@pytest.mark.parametrize('unit', ["q", "🪔"])  # The diya counts as two UTF-16 units
+def test_digest_merges_up_to_the_message_limit(unit):
+    bot = FakeBot(chat_interval=0.005)
+    queue = SendQueue(global_rate=250, chat_interval=0.01, digest_window=0.1)
+    texts = [f"{n:03d} " + unit * 296 for n in range(60)]
+    asyncio.run(run_queue(bot, queue, [('admin', text, {'digest': True}) for text in texts]))
+    sent = [text for _, text, _ in bot.sent]
+    assert len(sent) < len(texts)
+    assert all(message_length(text) <= MAX_MESSAGE_LENGTH for text in sent)
+    assert DIGEST_SEPARATOR.join(sent) == DIGEST_SEPARATOR.join(texts)  # Everything, in order
+    stats = queue.stats()
+    assert stats['dropped'] == 0
+    assert stats['digested'] == len(texts) - len(sent)
+
+
+def test_digest_keeps_different_formatting_apart():
+    bot = FakeBot(chat_interval=0.005)
+    queue = SendQueue(global_rate=250, chat_interval=0.01, digest_window=0.1)
+    messages = [
+        ('admin', "*bold* one", {'digest': True, 'parse_mode': 'Markdown'}),
+        ('admin', "*bold* two", {'digest': True, 'parse_mode': 'Markdown'}),
+        ('admin', "plain", {'digest': True}),
+    ]
+    asyncio.run(run_queue(bot, queue, messages))
+    assert bot.sent == [
+        ('admin', f"*bold* one{DIGEST_SEPARATOR}*bold* two", {'parse_mode': 'Markdown'}),
+        ('admin', "plain", {}),
+    ]
+
+
+def test_full_queue_refuses_messages():
+    queue = SendQueue(max_queued=2)
+    assert queue.enqueue('admin', "one")
+    assert queue.enqueue('admin', "two")
+    assert not queue.enqueue('admin', "three")
+    assert queue.stats()['dropped'] == 1
@@ -0,0 +1,185 @@
+"""Tests for shopify_client.py: single-flight GETs and the client-side rate limiter"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from shopify_client import ShopifyClient, ShopifyRateLimiter
+
+
+def make_client(handler):
+    """A ShopifyClient whose session answers through handler instead of the network"""
+    client = ShopifyClient("test-store", "token", base_url="https://test-store.myshopify.com/admin/api/2023-04/")
+    client._session = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+class SlowShopify:
+    """Mock transport handler that counts requests and answers after a short delay"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(
+            200,
+            json={'products': [{'id': 1, 'title': 'Red Kanjeevaram Silk'}]},
+            headers={'X-Shopify-Shop-Api-Call-Limit': '1/40'},
+        )
+
+
+def test_concurrent_identical_calls_share_one_request():
+    shopify = SlowShopify()
+
+    async def main():
+        client = make_client(shopify)
+        try:
+            return await asyncio.gather(*(
+                client.get_json("products.json", {'limit': 5, 'status': 'active'}) for _ in range(50)
+            )), client.stats()
+        finally:
+            await client.close()
+
+    results, stats = asyncio.run(main())
+    assert len(shopify.requests) == 1
+    assert all(result == results[0] for result in results)
+    assert stats['calls'] == 50
+    assert stats['coalesced'] == 49
+    assert stats['in_flight'] == 0
+
+
+def test_parameter_order_does_not_split_calls():
+    shopify = SlowShopify()
+
+    async def main():
+        client = make_client(shopify)
+        try:
+            await asyncio.gather(
+                client.get_json("products.json", {'limit': 5, 'status': 'active'}),
+                client.get_json("products.json", {'status': 'active', 'limit': 5}),
+            )
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+    assert len(shopify.requests) == 1
+
+
+def test_different_calls_are_not_coalesced():
+    shopify = SlowShopify()
+
+    async def main():
+        client = make_client(shopify)
+        try:
+            await asyncio.gather(
+                client.get_json("products.json", {'limit': 5}),
+                client.get_json("products.json", {'limit': 10}),
+                client.get_json("collections.json"),
+            )
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+    assert len(shopify.requests) == 3
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    shopify = SlowShopify(delay=0.1)
+
+    async def main():
+        client = make_client(shopify)
+        try:
+            impatient = asyncio.create_task(client.get_json("products.json", {'limit': 5}))
+            patient = asyncio.create_task(client.get_json("products.json", {'limit': 5}))
+            await asyncio.sleep(0.02)
+            impatient.cancel()
+            result = await patient
+            with pytest.raises(asyncio.CancelledError):
+                await impatient
+            return result
+        finally:
+            await client.close()
+
+    result = asyncio.run(main())
+    assert result['products'][0]['title'] == 'Red Kanjeevaram Silk'
+    assert len(shopify.requests) == 1
+
+
+def test_call_finishes_when_every_caller_gives_up():
+    shopify = SlowShopify(delay=0.05)
+
+    async def main():
+        client = make_client(shopify)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.get_json("products.json"), 0.01)
+            await asyncio.sleep(0.1)
+            stats = client.stats()
+            # The next identical call starts a new request rather than joining a dead one
+            await client.get_json("products.json")
+            return stats
+        finally:
+            await client.close()
+
+    stats = asyncio.run(main())
+    assert stats['in_flight'] == 0
+    assert len(shopify.requests) == 2
+
+
+def test_errors_reach_every_waiting_caller():
+    async def failing(request):
+        await asyncio.sleep(0.02)
+        return httpx.Response(500)
+
+    async def main():
+        client = make_client(failing)
+        try:
+            return await asyncio.gather(
+                *(client.get_json("products.json") for _ in range(3)), return_exceptions=True
+            )
+        finally:
+            await client.close()
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+
+def test_call_limit_header_does_not_forget_requests_in_flight():
+    limiter = ShopifyRateLimiter(capacity=40, leak_rate=2.0, reserve=4)
+
+    async def main():
+        for _ in range(10):
+            await limiter.acquire()
+
+    asyncio.run(main())
+    limiter.observe("3/40")  # Counted by Shopify before the other 9 arrived
+    assert limiter.used >= 9.9
+    limiter.observe("30/40")  # Another app sharing the bucket
+    assert limiter.used == 30.0
+
+
+def test_only_bucket_waits_count_as_throttled():
+    limiter = ShopifyRateLimiter(capacity=10, leak_rate=50.0, reserve=0)
+
+    async def hold_lock():
+        async with limiter._lock:  # Like a request ahead of them sleeping on the bucket
+            await asyncio.sleep(0.05)
+
+    async def main():
+        holder = asyncio.create_task(hold_lock())
+        await asyncio.sleep(0)
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))  # Queued on the lock, then fit
+        await holder
+        queued = dict(limiter.counters)
+        await asyncio.gather(*(limiter.acquire() for _ in range(10)))  # The last 5 wait for the bucket to leak
+        return queued, limiter.counters
+
+    queued, counters = asyncio.run(main())
+    assert queued['max_queue_depth'] == 5
+    assert queued['throttled'] == 0
+    assert counters['throttled'] == 5
+    assert counters['throttle_wait_seconds'] > 0
@@ -0,0 +1,134 @@
+"""Tests for the Shopify catalog webhooks in telegram_bot.py"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+import pytest
+
+import telegram_bot
+from catalog_cache import CatalogCache
+from collection_index import CollectionIndex
+from product_search import ProductSearchIndex
+from web_server import Request
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'shopify_webhooks')
+SECRET = "webhook-test-secret"
+PRODUCT_ID = 7841229013245
+OFFERS_ID = 428173787389
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as fixture_file:
+        return fixture_file.read()
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def deliver(topic: str, body: bytes, signature=None):
+    """Post a webhook body to the endpoint, signed with the shared secret unless a signature is given"""
+    headers = {'x-shopify-topic': topic, 'x-shopify-hmac-sha256': sign(body) if signature is None else signature}
+    request = Request('POST', telegram_bot.SHOPIFY_WEBHOOK_PATH, {}, headers, body)
+    return asyncio.run(telegram_bot.shopify_webhook(request))
+
+
+def products_key():
+    return CatalogCache.make_key("products", str(OFFERS_ID), limit=telegram_bot.FEATURED_PRODUCTS_LIMIT)
+
+
+def page_key():
+    return CatalogCache.make_key("products_page", limit=telegram_bot.FEATURED_PRODUCTS_LIMIT)
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch):
+    """A catalog holding the fixture product under its old title, cached in a list and a page"""
+    monkeypatch.setattr(telegram_bot, 'SHOPIFY_WEBHOOK_SECRET', SECRET)
+    monkeypatch.setattr(telegram_bot, 'catalog_cache', CatalogCache(ttl=60, max_stale=60))
+    monkeypatch.setattr(telegram_bot, 'product_index', ProductSearchIndex())
+    monkeypatch.setattr(telegram_bot, 'collection_index', CollectionIndex())
+
+    old = {'id': PRODUCT_ID, 'title': 'Red Silk Saree', 'updated_at': '2024-03-01T09:00:00+05:30', 'status': 'active'}
+    other = {'id': 1, 'title': 'Blue Banarasi Silk', 'updated_at': '2024-03-01T09:00:00+05:30', 'status': 'active'}
+    telegram_bot.product_index.rebuild([old, other])
+    telegram_bot.catalog_cache.set(products_key(), [old, other])
+    telegram_bot.catalog_cache.set(page_key(), {'products': [other, old], 'next': 'cursor', 'previous': None})
+    collections = [{'id': OFFERS_ID, 'title': 'Big Offers', 'handle': 'offers'}, {'id': 5, 'title': 'Silk Sarees'}]
+    telegram_bot.catalog_cache.set(CatalogCache.make_key("collections"), collections)
+    telegram_bot.collection_index.rebuild(collections)
+
+
+def cached_titles(key):
+    value = telegram_bot.catalog_cache.peek(key)
+    products = value['products'] if isinstance(value, dict) else value
+    return [product['title'] for product in products]
+
+
+def test_hmac_accepts_the_shared_secret_signature():
+    body = fixture('products_update.json')
+    assert telegram_bot.verify_shopify_hmac(body, sign(body))
+
+
+@pytest.mark.parametrize('signature', ["", sign(b"{}"), sign(b"x", secret="other-secret"), "not base64"])
+def test_bad_signatures_are_rejected_without_changes(signature):
+    response = deliver('products/delete', fixture('products_delete.json'), signature=signature)
+    assert response.status == 401
+    assert PRODUCT_ID in telegram_bot.product_index.products
+
+
+def test_signature_over_a_tampered_body_is_rejected():
+    body = fixture('products_update.json')
+    tampered = body.replace(b'"6499.00"', b'"1.00"')
+    assert deliver('products/update', tampered, signature=sign(body)).status == 401
+
+
+def test_product_update_patches_index_and_cached_lists():
+    assert deliver('products/update', fixture('products_update.json')).status == 200
+    title = "Red Kanjeevaram Silk Saree with *Zari* Border"
+    assert telegram_bot.product_index.products[PRODUCT_ID]['title'] == title
+    assert [p['title'] for p in telegram_bot.product_index.search('kanjeevaram zari')] == [title]
+    assert cached_titles(products_key()) == [title, 'Blue Banarasi Silk']
+    assert cached_titles(page_key()) == ['Blue Banarasi Silk', title]
+    assert telegram_bot.catalog_cache.peek(page_key())['next'] == 'cursor'
+
+
+def test_out_of_order_update_is_ignored():
+    newer = json.loads(fixture('products_update.json'))
+    assert deliver('products/update', json.dumps(newer).encode()).status == 200
+    older = dict(newer, title="Stale Title", updated_at="2024-03-08T18:00:00+05:30")
+    assert deliver('products/update', json.dumps(older).encode()).status == 200
+    assert telegram_bot.product_index.products[PRODUCT_ID]['title'] == newer['title']
+    assert "Stale Title" not in cached_titles(products_key())
+
+
+def test_update_to_draft_drops_the_product():
+    draft = dict(json.loads(fixture('products_update.json')), status='draft')
+    assert deliver('products/update', json.dumps(draft).encode()).status == 200
+    assert PRODUCT_ID not in telegram_bot.product_index.products
+    assert cached_titles(products_key()) == ['Blue Banarasi Silk']
+
+
+def test_product_delete_drops_it_everywhere():
+    assert deliver('products/delete', fixture('products_delete.json')).status == 200
+    assert PRODUCT_ID not in telegram_bot.product_index.products
+    assert telegram_bot.product_index.search('red') == []
+    assert cached_titles(products_key()) == ['Blue Banarasi Silk']
+    assert cached_titles(page_key()) == ['Blue Banarasi Silk']
+
+
+def test_collection_update_patches_cache_and_index():
+    assert deliver('collections/update', fixture('collections_update.json')).status == 200
+    collections = telegram_bot.catalog_cache.peek(CatalogCache.make_key("collections"))
+    assert sorted(collection['title'] for collection in collections) == ['Diwali Offers', 'Silk Sarees']
+    assert telegram_bot.collection_index.find("diwali offers") == str(OFFERS_ID)
+    assert telegram_bot.collection_index.find("offers") == str(OFFERS_ID)
+    assert telegram_bot.collection_index.find("big offers") is None
+
+
+def test_invalid_json_is_a_bad_request():
+    assert deliver('products/update', b"{not json").status == 400
@@ -0,0 +1,71 @@
+"""Tests for StallDetector reading LoopLagMonitor's heartbeat"""
+
+import asyncio
+import time
+
+from metrics import Gauge, Histogram, LoopLagMonitor
+from stall_detector import StallDetector
+
+
+def make_detector(threshold=0.2):
+    monitor = LoopLagMonitor(Histogram("lag_seconds", "lag"), Gauge("lag", "lag"), interval=0.02)
+    stalls = []
+    detector = StallDetector(monitor, threshold=threshold, on_stall=lambda seconds, label: stalls.append((seconds, label)))
+    return monitor, detector, stalls
+
+
+def blocking_handler():
+    time.sleep(0.5)
+
+
+def test_blocking_call_is_reported_with_its_stack_and_handler():
+    monitor, detector, stalls = make_detector()
+
+    async def main():
+        await detector.start()
+        await asyncio.sleep(0.1)
+        with detector.track("handle_message/message"):
+            blocking_handler()
+        await asyncio.sleep(0.1)
+        await detector.stop()
+        await monitor.stop()
+
+    asyncio.run(main())
+    assert len(stalls) == 1
+    seconds, label = stalls[0]
+    assert label == "handle_message/message"
+    assert 0.2 <= seconds <= 0.6
+    assert "blocking_handler" in detector.last_stall['stack']
+    assert monitor.histogram.values[()][-1] >= 0.4  # The same wakeup fed the lag histogram
+
+
+def test_idle_loop_reports_no_stall():
+    monitor, detector, stalls = make_detector()
+
+    async def main():
+        await detector.start()
+        await asyncio.sleep(0.4)
+        await detector.stop()
+        await monitor.stop()
+
+    asyncio.run(main())
+    assert stalls == []
+    assert detector.counters['stalls'] == 0
+
+
+def test_detector_adds_no_sampling_task_of_its_own():
+    monitor, detector, _ = make_detector()
+
+    async def main():
+        before = len(asyncio.all_tasks())
+        await monitor.start()
+        with_monitor = len(asyncio.all_tasks())
+        await detector.start()
+        with_detector = len(asyncio.all_tasks())
+        await detector.stop()
+        await monitor.stop()
+        return before, with_monitor, with_detector
+
+    before, with_monitor, with_detector = asyncio.run(main())
+    assert with_monitor == before + 1
+    assert with_detector == with_monitor
@@ -0,0 +1,127 @@
+"""Load tests for ChatOrderedUpdateProcessor driven the way Application hands it updates"""
+
+import asyncio
+import random
+
+from telegram import Update
+
+from update_processor import ChatOrderedUpdateProcessor
+
+
+def message_update(update_id, chat_id):
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Load'},
+            'text': f"update {update_id}",
+        },
+    }, None)
+
+
+def interleaved(chats, per_chat, seed=3):
+    """(update, chat_id, sequence) for every chat, shuffled across chats but in order within each"""
+    rng = random.Random(seed)
+    remaining = {chat_id: per_chat for chat_id in range(chats)}
+    arrivals = []
+    while remaining:
+        chat_id = rng.choice(list(remaining))
+        sequence = per_chat - remaining[chat_id]
+        arrivals.append((message_update(len(arrivals), chat_id), chat_id, sequence))
+        remaining[chat_id] -= 1
+        if not remaining[chat_id]:
+            del remaining[chat_id]
+    return arrivals
+
+
+def test_many_chats_stay_ordered_within_concurrency_and_pending_limits():
+    chats, per_chat, concurrency, max_pending = 60, 25, 8, 50
+    arrivals = interleaved(chats, per_chat)
+    handled = {chat_id: [] for chat_id in range(chats)}
+    active = set()  # Chats with a handler running
+    running = [0, 0]  # Now, most seen
+    pending_seen = [0]
+    rng = random.Random(5)
+
+    async def main():
+        processor = ChatOrderedUpdateProcessor(concurrency=concurrency, max_pending=max_pending)
+
+        async def handler(chat_id, sequence, delay):
+            assert chat_id not in active, f"chat {chat_id} had two updates running at once"
+            active.add(chat_id)
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+            pending_seen[0] = max(pending_seen[0], processor.pending)
+            try:
+                await asyncio.sleep(delay)
+                handled[chat_id].append(sequence)
+            finally:
+                running[0] -= 1
+                active.discard(chat_id)
+
+        await processor.initialize()
+        for update, chat_id, sequence in arrivals:
+            assert processor.pending <= max_pending
+            await processor.process_update(update, handler(chat_id, sequence, rng.uniform(0, 0.003)))
+            assert processor.pending <= max_pending
+        assert await processor.drain(timeout=10)
+        await processor.shutdown()
+        return processor
+
+    processor = asyncio.run(main())
+    assert all(sequences == list(range(per_chat)) for sequences in handled.values())
+    assert running[1] <= concurrency
+    assert running[1] > 1  # Chats did run in parallel
+    assert pending_seen[0] <= max_pending
+    stats = processor.stats()
+    assert stats['errors'] == 0  # A failed assertion inside a handler is counted here
+    assert stats['max_running_seen'] <= concurrency
+    assert stats['max_pending_seen'] <= max_pending
+    assert stats['backpressure_waits'] > 0
+    assert stats['processed'] == chats * per_chat
+    assert stats['pending'] == 0
+    assert stats['running'] == 0
+    assert stats['chats'] == 0
+
+
+def test_failing_update_does_not_block_its_chat():
+    handled = []
+
+    async def handler(sequence):
+        if sequence == 1:
+            raise RuntimeError("handler bug")
+        handled.append(sequence)
+
+    async def main():
+        processor = ChatOrderedUpdateProcessor(concurrency=2, max_pending=10)
+        for sequence in range(3):
+            await processor.process_update(message_update(sequence, 42), handler(sequence))
+        assert await processor.drain(timeout=5)
+        return processor
+
+    processor = asyncio.run(main())
+    assert handled == [0, 2]
+    assert processor.stats()['errors'] == 1
+
+
+def test_drain_times_out_and_shutdown_discards_queued_updates():
+    started = []
+
+    async def handler(sequence):
+        started.append(sequence)
+        await asyncio.sleep(10)
+
+    async def main():
+        processor = ChatOrderedUpdateProcessor(concurrency=1, max_pending=10)
+        for sequence in range(3):
+            await processor.process_update(message_update(sequence, 7), handler(sequence))
+        drained = await processor.drain(timeout=0.05)
+        await processor.shutdown()
+        return processor, drained
+
+    processor, drained = asyncio.run(main())
+    assert not drained
+    assert started == [0]
+    assert processor.stats()['chats'] == 0
@@ -0,0 +1,96 @@
+"""Tests for the "Fetching..." placeholders of the catalog views in telegram_bot.py"""
+
+import asyncio
+
+import pytest
+
+import telegram_bot
+from catalog_cache import CatalogCache
+from collection_index import CollectionIndex
+
+
+class FakeMessage:
+    chat_id = 7
+
+
+class FakeQuery:
+    def __init__(self):
+        self.message = FakeMessage()
+        self.edits = []
+
+    async def edit_message_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog(monkeypatch):
+    monkeypatch.setattr(telegram_bot, 'catalog_cache', CatalogCache(ttl=60, max_stale=60))
+    monkeypatch.setattr(telegram_bot, 'collection_index', CollectionIndex())
+    telegram_bot.collection_index.rebuild([{'id': 11, 'title': 'Big Offers', 'handle': 'offers'}])
+
+
+def offers_key():
+    return CatalogCache.make_key("products", "11", limit=telegram_bot.FEATURED_PRODUCTS_LIMIT)
+
+
+def blogs_key():
+    return CatalogCache.make_key("blogs/1/articles", limit=telegram_bot.BLOG_ARTICLES_LIMIT)
+
+
+def test_cached_offers_are_shown_without_a_placeholder():
+    telegram_bot.catalog_cache.set(offers_key(), [{'title': 'Peach Organza', 'variants': [{'price': '999'}]}])
+    query = FakeQuery()
+    asyncio.run(telegram_bot.view_offers(query, None))
+    assert len(query.edits) == 1
+    assert "Peach Organza" in query.edits[0]
+
+
+def test_stale_but_servable_offers_skip_the_placeholder(monkeypatch):
+    async def no_refresh():
+        return []
+
+    monkeypatch.setattr(telegram_bot.shopify, 'fetch_products', lambda **kwargs: no_refresh())
+    telegram_bot.catalog_cache.set(offers_key(), [{'title': 'Peach Organza'}], age=90)
+    query = FakeQuery()
+    asyncio.run(telegram_bot.view_offers(query, None))
+    assert [edit for edit in query.edits if "Fetching" in edit] == []
+
+
+def test_uncached_offers_show_the_placeholder_first(monkeypatch):
+    async def fetch_products(**kwargs):
+        return [{'title': 'Peach Organza'}]
+
+    monkeypatch.setattr(telegram_bot.shopify, 'fetch_products', fetch_products)
+    query = FakeQuery()
+    asyncio.run(telegram_bot.view_offers(query, None))
+    assert "Fetching current offers" in query.edits[0]
+    assert "Peach Organza" in query.edits[-1]
+
+
+def test_cached_blogs_are_shown_without_a_placeholder():
+    telegram_bot.catalog_cache.set(blogs_key(), [{'title': 'Draping a Banarasi', 'handle': 'draping'}])
+    query = FakeQuery()
+    asyncio.run(telegram_bot.view_blogs(query, None))
+    assert len(query.edits) == 1
+    assert "Draping" in query.edits[0]
+
+
+def test_store_without_collections_builds_the_index_once(monkeypatch):
+    fetches = []
+
+    async def fetch_collections():
+        fetches.append(1)
+        return []
+
+    index = CollectionIndex()
+    rebuild = index.rebuild
+    rebuilds = []
+    monkeypatch.setattr(index, 'rebuild', lambda collections: rebuilds.append(1) or rebuild(collections))
+    monkeypatch.setattr(telegram_bot, 'collection_index', index)
+    monkeypatch.setattr(telegram_bot.shopify, 'fetch_collections', fetch_collections)
+    assert not telegram_bot.offer_products_cached()
+    for _ in range(3):
+        assert asyncio.run(telegram_bot.find_collection_by_title("offers")) is None
+    assert len(fetches) == 1
+    assert len(rebuilds) == 1
+    assert telegram_bot.offer_products_cached()  # No offers collection: nothing to fetch
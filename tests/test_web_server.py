@@ -0,0 +1,86 @@
+"""Tests for request parsing limits in web_server.py"""
+
+import asyncio
+
+import pytest
+
+import web_server
+from web_server import Response, WebServer
+
+
+async def echo(request):
+    return Response.text(request.body.decode())
+
+
+async def exchange(raw: bytes, close: bool = True) -> bytes:
+    """Send raw bytes to a fresh server and return everything it answers"""
+    server = WebServer(host="127.0.0.1", port=0)
+    server.add_route('POST', '/echo', echo)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(raw)
+        await writer.drain()
+        if close:
+            writer.write_eof()
+        return await asyncio.wait_for(reader.read(), 5)
+    finally:
+        writer.close()
+        await server.stop()
+
+
+def status_of(response: bytes) -> int:
+    return int(response.split(b" ", 2)[1])
+
+
+def test_body_is_read_by_content_length():
+    response = asyncio.run(exchange(b"POST /echo HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\nhello"))
+    assert status_of(response) == 200
+    assert response.endswith(b"\r\n\r\nhello")
+
+
+def test_negative_content_length_is_rejected():
+    response = asyncio.run(exchange(b"POST /echo HTTP/1.1\r\nContent-Length: -1\r\n\r\n"))
+    assert status_of(response) == 400
+
+
+def test_oversized_body_is_rejected():
+    length = web_server.MAX_BODY_SIZE + 1
+    response = asyncio.run(exchange(f"POST /echo HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()))
+    assert status_of(response) == 413
+
+
+def test_chunked_body_is_not_implemented():
+    raw = b"POST /echo HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n"
+    assert status_of(asyncio.run(exchange(raw))) == 501
+
+
+def test_too_many_headers_are_rejected():
+    headers = "".join(f"X-Header-{i}: {i}\r\n" for i in range(web_server.MAX_HEADERS + 1))
+    raw = f"POST /echo HTTP/1.1\r\n{headers}Content-Length: 0\r\n\r\n".encode()
+    assert status_of(asyncio.run(exchange(raw))) == 431
+
+
+def test_repeated_header_names_count_towards_the_limit():
+    headers = "X-Same: 1\r\n" * (web_server.MAX_HEADERS + 1)
+    raw = f"POST /echo HTTP/1.1\r\n{headers}\r\n".encode()
+    assert status_of(asyncio.run(exchange(raw))) == 431
+
+
+def test_slow_headers_time_out(monkeypatch):
+    monkeypatch.setattr(web_server, 'REQUEST_TIMEOUT', 0.2)
+    raw = b"POST /echo HTTP/1.1\r\nContent-Length: 5\r\n"  # Headers never finish
+    assert status_of(asyncio.run(exchange(raw, close=False))) == 408
+
+
+def test_slow_body_times_out(monkeypatch):
+    monkeypatch.setattr(web_server, 'REQUEST_TIMEOUT', 0.2)
+    raw = b"POST /echo HTTP/1.1\r\nContent-Length: 100\r\n\r\nonly part"
+    assert status_of(asyncio.run(exchange(raw, close=False))) == 408
+
+
+@pytest.mark.parametrize('method, path, status', [('GET', '/echo', 405), ('POST', '/missing', 404)])
+def test_unrouted_requests(method, path, status):
+    raw = f"{method} {path} HTTP/1.1\r\nConnection: close\r\n\r\n".encode()
+    assert status_of(asyncio.run(exchange(raw))) == status
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Update Processor
+Processes updates from different chats concurrently while keeping each chat's updates in order
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Hashable, Set
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_CONCURRENCY = 16  # Updates handled at once across chats
+DEFAULT_MAX_PENDING = 1000  # Accepted but unfinished updates before intake pauses
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def ordering_key(update: object) -> Hashable:
+    """Updates with the same key are processed in arrival order: the chat, else the user"""
+    if isinstance(update, Update):
+        if update.effective_chat is not None:
+            return ('chat', update.effective_chat.id)
+        if update.effective_user is not None:
+            return ('user', update.effective_user.id)  # Inline queries and other chat-less updates
+    return ('update', id(update))  # Nothing to order against
+
+# =============================================================================
+# UPDATE PROCESSOR
+# =============================================================================
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Concurrent update processing with per-chat ordering, a concurrency bound and backpressure.
+
+    Each chat gets a worker task that runs its updates one after another,
+    so conversation state in user_data is never raced; workers for
+    different chats run in parallel, at most `concurrency` at a time.
+    The processor reports a concurrency of 1 to python-telegram-bot so
+    the Application awaits each hand-off: hand-offs return at once until
+    max_pending updates are unfinished, then block, leaving further
+    updates in Application.update_queue until work drains.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, max_pending: int = DEFAULT_MAX_PENDING):
+        super().__init__(1)
+        if concurrency < 1 or max_pending < 1:
+            raise ValueError("concurrency and max_pending must be positive")
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(concurrency)
+        self._chats: Dict[Hashable, Deque[Awaitable[Any]]] = {}
+        self._workers: Set[asyncio.Task] = set()
+        self._pending = 0
+        self._running = 0
+        self._room = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.counters = {
+            'processed': 0,
+            'errors': 0,
+            'max_pending_seen': 0,
+            'max_running_seen': 0,
+            'backpressure_waits': 0,
+            'backpressure_seconds': 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Updates accepted and not finished (queued behind their chat or running)"""
+        return self._pending
+
+    async def initialize(self) -> None:
+        """Nothing to allocate; workers start with the first update of each chat"""
+
+    async def shutdown(self) -> None:
+        """Cancel workers that are still running and discard their queued updates"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for queue in self._chats.values():
+            for coroutine in queue:
+                coroutine.close()
+        self._chats.clear()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for accepted updates to finish; False if some are left"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Update processor stopped waiting with {self._pending} updates unfinished")
+            return False
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Queue an update behind earlier ones from its chat, waiting first if too many are unfinished"""
+        if self._pending >= self.max_pending:
+            self.counters['backpressure_waits'] += 1
+            started = time.monotonic()
+            while self._pending >= self.max_pending:
+                self._room.clear()
+                await self._room.wait()
+            self.counters['backpressure_seconds'] += time.monotonic() - started
+        self._pending += 1
+        self._idle.clear()
+        self.counters['max_pending_seen'] = max(self.counters['max_pending_seen'], self._pending)
+        key = ordering_key(update)
+        queue = self._chats.get(key)
+        if queue is not None:
+            queue.append(coroutine)  # The chat's worker picks it up after the updates before it
+            return
+        self._chats[key] = deque([coroutine])
+        worker = asyncio.create_task(self._run_chat(key), name=f"update-processor:{key[0]}")
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+    async def _run_chat(self, key: Hashable) -> None:
+        """Run one chat's updates in order, each under a concurrency slot"""
+        queue = self._chats[key]
+        while queue:
+            coroutine = queue[0]
+            async with self._slots:
+                self._running += 1
+                self.counters['max_running_seen'] = max(self.counters['max_running_seen'], self._running)
+                try:
+                    await coroutine
+                except Exception as e:
+                    # Application.process_update reports handler errors itself; this is a last resort
+                    self.counters['errors'] += 1
+                    logger.error(f"Error processing update: {e}")
+                finally:
+                    self._running -= 1
+            queue.popleft()
+            self._finish()
+        del self._chats[key]
+
+    def _finish(self) -> None:
+        """Account for a finished update and release any waiting hand-off"""
+        self._pending -= 1
+        self.counters['processed'] += 1
+        self._room.set()
+        if not self._pending:
+            self._idle.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return throughput counters and the current load"""
+        stats: Dict[str, Any] = dict(self.counters)
+        stats['backpressure_seconds'] = round(stats['backpressure_seconds'], 3)
+        stats['pending'] = self._pending
+        stats['running'] = self._running
+        stats['chats'] = len(self._chats)
+        stats['concurrency'] = self.concurrency
+        return stats
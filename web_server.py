@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Maa Kaali Creations - Web Server
+Minimal asyncio HTTP server for the Telegram webhook and health endpoints
+"""
+
+import asyncio
+import json
+import logging
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MAX_BODY_SIZE = 1024 * 1024  # Largest request body accepted (bytes)
+MAX_HEADERS = 100  # Most header lines accepted in one request
+KEEPALIVE_TIMEOUT = 75.0  # Seconds an idle keep-alive connection stays open
+REQUEST_TIMEOUT = 10.0  # Seconds to receive the headers and body once a request has started
+
+# =============================================================================
+# REQUEST / RESPONSE
+# =============================================================================
+
+class Request:
+    """A parsed HTTP request"""
+
+    def __init__(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers  # Lower-cased header names
+        self.body = body
+
+    def json(self) -> Any:
+        """Decode the request body as JSON"""
+        return json.loads(self.body)
+
+class Response:
+    """An HTTP response to send back"""
+
+    def __init__(
+        self,
+        status: int = 200,
+        body: bytes = b"",
+        content_type: str = "text/plain; charset=utf-8",
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers or {}
+
+    @classmethod
+    def text(cls, text: str, status: int = 200) -> "Response":
+        """Plain text response"""
+        return cls(status, text.encode())
+
+    @classmethod
+    def json(cls, data: Any, status: int = 200) -> "Response":
+        """JSON response"""
+        return cls(status, json.dumps(data).encode(), "application/json")
+
+    def encode(self, keep_alive: bool) -> bytes:
+        """Serialize status line, headers and body"""
+        reason = HTTPStatus(self.status).phrase
+        headers = {
+            'Content-Type': self.content_type,
+            'Content-Length': str(len(self.body)),
+            'Connection': 'keep-alive' if keep_alive else 'close',
+            **self.headers,
+        }
+        head = f"HTTP/1.1 {self.status} {reason}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        return head.encode('latin-1') + b"\r\n" + self.body
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+# =============================================================================
+# WEB SERVER
+# =============================================================================
+
+class WebServer:
+    """Route-table HTTP/1.1 server running on the bot's event loop"""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080):
+        self.host = host
+        self.port = port
+        self.routes: Dict[Tuple[str, str], Handler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    def add_route(self, method: str, path: str, handler: Handler) -> None:
+        """Register a handler for a method and exact path"""
+        self.routes[(method.upper(), path)] = handler
+
+    async def start(self) -> None:
+        """Start listening"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info(f"Web server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop listening and close open connections"""
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it closes"""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                if isinstance(request, Response):
+                    writer.write(request.encode(keep_alive=False))
+                    await writer.drain()
+                    break
+
+                response = await self._dispatch(request)
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown; end quietly (a cancelled connection task is logged as an error on Python 3.11)
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Any:
+        """Read one request; returns None on EOF or an error Response for bad input"""
+        request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split()
+        except ValueError:
+            return Response.text("Bad Request", 400)
+        try:
+            # A slow client must not hold the connection open indefinitely
+            return await asyncio.wait_for(self._read_rest(reader, method, target), REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            return Response.text("Request Timeout", 408)
+
+    async def _read_rest(self, reader: asyncio.StreamReader, method: str, target: str) -> Any:
+        """Read the headers and body after the request line.
+
+        Bodies must come with a Content-Length: Transfer-Encoding (chunked
+        uploads) is not supported and is answered with 501, which Telegram
+        and Shopify never send.
+        """
+        headers: Dict[str, str] = {}
+        header_lines = 0
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Line longer than the stream buffer
+                return Response.text("Request Header Fields Too Large", 431)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines += 1
+            if header_lines > MAX_HEADERS:
+                return Response.text("Request Header Fields Too Large", 431)
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            return Response.text("Not Implemented", 501)
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            return Response.text("Bad Request", 400)
+        if length < 0:
+            return Response.text("Bad Request", 400)
+        if length > MAX_BODY_SIZE:
+            return Response.text("Payload Too Large", 413)
+        body = await reader.readexactly(length) if length else b""
+
+        path, _, query_string = target.partition('?')
+        query = {key: values[-1] for key, values in parse_qs(query_string).items()}
+        return Request(method.upper(), path, query, headers, body)
+
+    async def _dispatch(self, request: Request) -> Response:
+        """Route a request to its handler"""
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self.routes):
+                return Response.text("Method Not Allowed", 405)
+            return Response.text("Not Found", 404)
+        try:
+            return await handler(request)
+        except Exception as e:
+            logger.error(f"Error handling {request.method} {request.path}: {e}")
+            return Response.text("Internal Server Error", 500)